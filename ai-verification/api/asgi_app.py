@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+AI Verification API - ASGI Serving Mode
+Serves the endpoints of verification_api.py from an asyncio event loop. Connections,
+request bodies and JSON parsing stay on the loop; /verify and /batch-verify hand
+their readings to the micro-batching scheduler and await its futures, so a waiting
+request holds no thread. With micro-batching disabled, inference runs on a bounded
+thread pool instead. /verify-stream scores an NDJSON upload in micro-batches while
+its body is still arriving. Every other endpoint is answered by the Flask app on a
+small thread pool. Thousands of idle keep-alive connections cost one coroutine each
+
+Usage (from the ai-verification/api directory):
+    python asgi_app.py
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import io
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import verification_api as api
+from models.fraud_detection import VerificationResult
+from models.inference_scheduler import SchedulerQueueFullError
+
+logger = logging.getLogger(__name__)
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Room for streamed batches of around 100k readings
+DEFAULT_MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Flask-CORS allows every origin on the Flask app; native routes answer the same way
+_RESPONSE_HEADERS = [(b'content-type', b'application/json'), (b'access-control-allow-origin', b'*')]
+_NDJSON_HEADERS = [(b'content-type', api.NDJSON_CONTENT_TYPE.encode('latin-1')), (b'access-control-allow-origin', b'*')]
+
+
+class RequestBodyTooLargeError(ValueError):
+    """Raised when a request body exceeds max_body_bytes"""
+
+
+class AsyncVerificationApp:
+    """ASGI application serving the verification API from an event loop"""
+
+    def __init__(self, wsgi_app: Callable = None, wsgi_workers: int = 8, inference_workers: int = None,
+                 max_pending_inference: int = 10000, max_body_bytes: int = DEFAULT_MAX_BODY_BYTES):
+        """
+        Initialize ASGI application
+
+        Args:
+            wsgi_app: WSGI application answering the non-inference endpoints (default: the Flask app)
+            wsgi_workers: Threads running the WSGI application
+            inference_workers: Threads verifying readings when micro-batching is disabled
+                (default: CPU count)
+            max_pending_inference: Readings waiting for those threads beyond which
+                requests are rejected with 503
+            max_body_bytes: Largest accepted request body
+        """
+        self.wsgi_app = wsgi_app or api.app.wsgi_app
+        self.wsgi_executor = ThreadPoolExecutor(max_workers=wsgi_workers, thread_name_prefix='asgi-wsgi')
+        self.inference_executor = ThreadPoolExecutor(max_workers=inference_workers or os.cpu_count() or 4,
+                                                     thread_name_prefix='asgi-inference')
+        self.max_pending_inference = max_pending_inference
+        self.max_body_bytes = max_body_bytes
+        self._pending_inference = 0
+        self.routes = {
+            ('POST', '/verify'): self.verify,
+            ('POST', '/batch-verify'): self.batch_verify,
+        }
+        # Routes that read the request and write the response concurrently
+        self.streaming_routes = {
+            ('POST', '/verify-stream'): self.verify_stream,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        streaming_handler = self.streaming_routes.get((scope['method'], scope['path']))
+        if streaming_handler is not None:
+            start_time = time.perf_counter()
+            status = await streaming_handler(scope, receive, send)
+            api.http_requests.inc(scope['path'], scope['method'], str(status))
+            api.http_latency.observe(time.perf_counter() - start_time, scope['path'], scope['method'])
+            return
+
+        handler = self.routes.get((scope['method'], scope['path']))
+        if handler is None:
+            await self._call_wsgi(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        try:
+            status, payload = await handler(scope, receive)
+        except RequestBodyTooLargeError:
+            status, payload = 413, {'error': f'Request body too large (max {self.max_body_bytes} bytes)'}
+        except Exception as e:
+            logger.error(f"Error in {scope['path']} endpoint: {e}")
+            status, payload = 500, {'error': 'Internal server error'}
+
+        if isinstance(payload, Iterator):
+            await self._send_ndjson(receive, send, status, payload)
+        else:
+            await send_json(send, status, payload)
+        api.http_requests.inc(scope['path'], scope['method'], str(status))
+        api.http_latency.observe(time.perf_counter() - start_time, scope['path'], scope['method'])
+
+    async def verify(self, scope: Scope, receive: Receive) -> Tuple[int, Dict]:
+        """POST /verify"""
+        start_time = time.time()
+        sensor_data = await self._read_json(receive)
+
+        rejection = api.check_verify_request(sensor_data)
+        if rejection:
+            payload, status = rejection
+            return status, payload
+
+        try:
+            results, timings = await self.verify_readings([sensor_data])
+        except SchedulerQueueFullError:
+            payload, status = api.scheduler_overloaded_payload()
+            return status, payload
+
+        detailed = parse_qs(scope['query_string'].decode('latin-1')).get('detailed') == ['true']
+        return 200, api.verify_response(sensor_data, results[0], start_time, timings[0], detailed)
+
+    async def batch_verify(self, scope: Scope, receive: Receive) -> Tuple[int, Any]:
+        """POST /batch-verify (NDJSON results are returned as an iterator of response parts)"""
+        start_time = time.time()
+        batch_data = await self._read_json(receive)
+        stream = api.streaming_requested(header(scope, b'accept'),
+                                         parse_qs(scope['query_string'].decode('latin-1')).get('stream', [None])[0])
+
+        rejection = api.check_batch_request(batch_data, stream)
+        if rejection:
+            payload, status = rejection
+            return status, payload
+
+        sensor_data_list = batch_data['sensor_data_list']
+        if stream:
+            return 200, api.stream_batch(sensor_data_list, start_time)
+        # Items that are not JSON objects are reported as errors, not scored
+        positions = api.reading_positions(sensor_data_list)
+        try:
+            verified, _ = await self.verify_readings([sensor_data_list[i] for i in positions])
+        except SchedulerQueueFullError:
+            payload, status = api.scheduler_overloaded_payload()
+            return status, payload
+
+        verified = api.align_results(len(sensor_data_list), positions, verified)
+        return 200, api.batch_response(sensor_data_list, verified, start_time)
+
+    async def verify_stream(self, scope: Scope, receive: Receive, send: Send) -> int:
+        """
+        POST /verify-stream
+
+        The next body message is only received once the results of the previous one
+        are sent, so a fast uploader is held back by the server's flow control instead
+        of filling memory. A partial micro-batch is scored when it is due even if the
+        upload pauses.
+
+        Returns:
+            Response status
+        """
+        if not api.verification_api.models_ready.is_set():
+            payload, status = api.models_unavailable_payload()
+            await send_json(send, status, payload)
+            return status
+
+        loop = asyncio.get_running_loop()
+        verifier = api.StreamVerifier(api.model_manager.active, time.time())
+        await send({'type': 'http.response.start', 'status': 200, 'headers': _NDJSON_HEADERS})
+
+        error = None
+        message = asyncio.ensure_future(receive())
+        while True:
+            done, _ = await asyncio.wait({message}, timeout=verifier.flush_due_in)
+            if not done:
+                part = await loop.run_in_executor(self.inference_executor, verifier.flush)
+                await send({'type': 'http.response.body', 'body': part.encode('utf-8'), 'more_body': True})
+                continue
+
+            received = message.result()
+            if received['type'] == 'http.disconnect':
+                return 200
+
+            try:
+                part = await loop.run_in_executor(self.inference_executor, verifier.feed, received.get('body', b''))
+            except api.StreamLineTooLongError as e:
+                error = f"{e}; upload aborted"
+                break
+            if part:
+                await send({'type': 'http.response.body', 'body': part.encode('utf-8'), 'more_body': True})
+
+            if not received.get('more_body', False):
+                break
+            message = asyncio.ensure_future(receive())
+
+        part = await loop.run_in_executor(self.inference_executor, verifier.close, error)
+        await send({'type': 'http.response.body', 'body': part.encode('utf-8')})
+        return 200
+
+    async def verify_readings(self, sensor_data_list: List[Dict]) -> Tuple[List[VerificationResult], List[Dict]]:
+        """
+        Verify readings without blocking the event loop
+
+        Returns:
+            Results and stage timings (ms) in input order
+
+        Raises:
+            SchedulerQueueFullError: If the scheduler queue or the inference pool is full
+        """
+        scheduler = api.inference_scheduler
+        if scheduler is not None:
+            futures = scheduler.submit_many(sensor_data_list)
+            results = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+            return list(results), [getattr(future, 'timings', {}) for future in futures]
+
+        if self._pending_inference + len(sensor_data_list) > self.max_pending_inference:
+            raise SchedulerQueueFullError(f"Inference pool is full ({self._pending_inference} readings pending)")
+
+        self._pending_inference += len(sensor_data_list)
+        try:
+            timings: List[Dict] = []
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.inference_executor, api.verify_readings, sensor_data_list, timings)
+            return results, timings
+        finally:
+            self._pending_inference -= len(sensor_data_list)
+
+    async def _read_json(self, receive: Receive) -> Optional[Any]:
+        """Read the request body and decode it as JSON (None for an empty or malformed body)"""
+        body = await self._read_body(receive)
+        try:
+            return json.loads(body) if body else None
+        except ValueError:
+            return None
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise RequestBodyTooLargeError(size)
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+    async def _call_wsgi(self, scope: Scope, receive: Receive, send: Send):
+        """Answer a request with the WSGI application on the WSGI thread pool"""
+        try:
+            body = await self._read_body(receive)
+        except RequestBodyTooLargeError:
+            await send_json(send, 413, {'error': f'Request body too large (max {self.max_body_bytes} bytes)'})
+            return
+
+        environ = wsgi_environ(scope, body)
+        status, headers, content = await asyncio.get_running_loop().run_in_executor(
+            self.wsgi_executor, run_wsgi, self.wsgi_app, environ)
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    async def _send_ndjson(self, receive: Receive, send: Send, status: int, parts: Iterator[str]):
+        """Stream response parts, producing each one on the inference pool, until the client goes away"""
+        loop = asyncio.get_running_loop()
+        # The body has been read, so the next message is the disconnect
+        disconnected = asyncio.ensure_future(receive())
+        try:
+            await send({'type': 'http.response.start', 'status': status, 'headers': _NDJSON_HEADERS})
+            while not disconnected.done():
+                part = await loop.run_in_executor(self.inference_executor, next, parts, None)
+                if part is None:
+                    break
+                await send({'type': 'http.response.body', 'body': part.encode('utf-8'), 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+
+    async def _lifespan(self, receive: Receive, send: Send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.wsgi_executor.shutdown(wait=False)
+                self.inference_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+async def send_json(send: Send, status: int, payload: Any):
+    """Send a complete JSON response"""
+    body = json.dumps(payload).encode('utf-8')
+    headers = _RESPONSE_HEADERS + [(b'content-length', str(len(body)).encode('latin-1'))]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def header(scope: Scope, name: bytes) -> Optional[str]:
+    """First value of a request header (name in lower case)"""
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def wsgi_environ(scope: Scope, body: bytes) -> Dict[str, Any]:
+    """WSGI environ of an ASGI HTTP request with a fully read body"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def run_wsgi(wsgi_app: Callable, environ: Dict[str, Any]) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    """Call a WSGI application and collect its status, headers and body"""
+    response: Dict[str, Any] = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        return response.setdefault('written', []).append
+
+    iterable = wsgi_app(environ, start_response)
+    try:
+        content = b''.join(response.get('written', [])) + b''.join(iterable)
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+    return response['status'], response['headers'], content
+
+
+app = AsyncVerificationApp(
+    wsgi_workers=int(os.getenv('ASGI_WSGI_WORKERS', '8')),
+    inference_workers=int(os.getenv('ASGI_INFERENCE_WORKERS', '0')) or None,
+    max_pending_inference=int(os.getenv('MICRO_BATCH_QUEUE_SIZE', '10000')),
+    max_body_bytes=int(os.getenv('MAX_REQUEST_BYTES', str(DEFAULT_MAX_BODY_BYTES))),
+)
+
+
+def main():
+    """Serve the ASGI application with uvicorn"""
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("The ASGI serving mode needs uvicorn (pip install uvicorn)")
+
+    host = os.getenv('AI_API_HOST', '0.0.0.0')
+    port = int(os.getenv('AI_API_PORT', 5000))
+    logger.info(f"ASGI API server starting on {host}:{port}")
+
+    uvicorn.run(
+        app, host=host, port=port,
+        backlog=int(os.getenv('ASGI_BACKLOG', '4096')),
+        timeout_keep_alive=int(os.getenv('ASGI_KEEP_ALIVE_SECONDS', '75')),
+        log_level=os.getenv('ASGI_LOG_LEVEL', 'info'),
+    )
+
+
+if __name__ == '__main__':
+    main()
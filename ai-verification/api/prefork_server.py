@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+AI Verification API - Multi-Process Serving Mode
+Runs the Flask API under gunicorn with worker processes forked from a parent that has
+already loaded the models. The parent loads the memory-mapped model bundle (tree
+ensembles, scaler and exported network weights) without starting a thread or
+importing TensorFlow, so forking is safe and every worker shares the same read-only
+pages. Each worker then starts its own micro-batching scheduler and follows the
+registry's current version. MQTT is owned by worker 0, or with MQTT_WORKERS=all every
+worker connects under its own client ID to a shared subscription the broker balances
+
+Usage (from the ai-verification/api directory):
+    SERVING_WORKERS=4 python prefork_server.py
+"""
+
+import gc
+import itertools
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict
+
+# Parallelism comes from the worker processes; one BLAS thread each avoids oversubscription
+for _variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+    os.environ.setdefault(_variable, '1')
+
+from gunicorn.app.base import BaseApplication
+
+# Import the API without starting its threads; workers start them after the fork
+os.environ['PREFORK_PARENT'] = 'true'
+import verification_api as api
+del os.environ['PREFORK_PARENT']
+
+from models.backends import BACKENDS
+
+logger = logging.getLogger(__name__)
+
+MQTT_SHARED_GROUP = 'ai-verification'
+
+
+class PreforkServer(BaseApplication):
+    """gunicorn application serving the Flask app loaded in the parent process"""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return api.app
+
+
+def pre_fork(server, worker):
+    """Give a new worker the lowest index no live worker holds (runs in the parent)"""
+    taken = {getattr(live, 'worker_index', None) for live in server.WORKERS.values()}
+    worker.worker_index = next(index for index in itertools.count() if index not in taken)
+
+
+def post_fork(server, worker):
+    """Start the worker's scheduler, registry sync and MQTT client"""
+    service = api.verification_api
+
+    if os.getenv('MQTT_WORKERS', 'one') == 'all':
+        service.mqtt_client_id = f"{service.mqtt_client_id}-{worker.worker_index}"
+        service.mqtt_shared_group = MQTT_SHARED_GROUP
+    else:
+        # A replacement for worker 0 inherits its index, so exactly one worker owns MQTT
+        service.mqtt_enabled = worker.worker_index == 0
+
+    service.start_services()
+
+    # Activations and retrains served by one worker reach the others through the registry
+    threading.Thread(target=service.follow_registry, args=(float(os.getenv('MODEL_SYNC_SECONDS', '5')),),
+                     name='model-sync', daemon=True).start()
+
+    logger.info(f"Worker {worker.worker_index} (pid {worker.pid}) serving model version "
+                f"{api.model_manager.active.model_version}" + (" with MQTT" if service.mqtt_enabled else ""))
+
+
+def worker_exit(server, worker):
+    """Disconnect the worker from MQTT and flush its scheduler"""
+    api.verification_api.stop_services()
+
+
+def main():
+    """Preload the models and serve them from forked gunicorn workers"""
+    api.verification_api.preload_models()
+
+    if BACKENDS.loaded('tensorflow') is not None:
+        sys.exit("TensorFlow was imported while loading the models and cannot be shared with forked workers; "
+                 "convert the model directory to a bundle first (python -m models.model_bundle <model path>)")
+
+    # Keep the preloaded objects out of garbage collection so workers do not copy their pages
+    gc.freeze()
+
+    host = os.getenv('AI_API_HOST', '0.0.0.0')
+    port = int(os.getenv('AI_API_PORT', 5000))
+    workers = int(os.getenv('SERVING_WORKERS', '0')) or os.cpu_count() or 1
+    logger.info(f"Multi-process API server starting on {host}:{port} with {workers} workers")
+
+    PreforkServer({
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': int(os.getenv('WORKER_THREADS', '8')),
+        'keepalive': int(os.getenv('KEEP_ALIVE_SECONDS', '75')),
+        'preload_app': True,
+        'pre_fork': pre_fork,
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+    }).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -9,17 +9,27 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import hashlib
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import paho.mqtt.client as mqtt
 from dotenv import load_dotenv
+import queue
 import threading
 import time
 
 # Import our fraud detection system
+from models.backends import BACKENDS
+from models.distillation import distill_student
 from models.fraud_detection import CarbonFraudDetector, VerificationResult
+from models.inference_scheduler import InferenceScheduler, SchedulerQueueFullError
+from models.model_manager import ModelImportError, ModelManager, RetrainInProgressError
+from models.model_names import STUDENT_MODEL
+from models.model_registry import ModelVersionNotFoundError
+from models.result_cache import ResultCacheTotals
+from models.service_metrics import CONTENT_TYPE, Counter, Gauge, MetricsRegistry, StaticMetric, histogram_sample
+from models.stage_timing import StageLatencyRecorder
 
 # Load environment variables
 load_dotenv()
@@ -36,7 +46,10 @@ app = Flask(__name__)
 CORS(app)
 
 # Global variables
-fraud_detector = None
+model_manager = None  # Holds the serving detector; handlers take model_manager.active once per request
+inference_scheduler = None  # Micro-batches readings from all entry points; None scores each call directly
+stage_latency = StageLatencyRecorder()  # Verification stage histograms, shared by every detector version
+result_cache_totals = ResultCacheTotals()  # Result cache counters, summed over every detector version
 mqtt_client = None
 verification_history = []
 api_stats = {
@@ -48,32 +61,164 @@ api_stats = {
     'start_time': datetime.utcnow().isoformat()
 }
 
+# /batch-verify limits; batches above the JSON limit are streamed back as NDJSON
+MAX_JSON_BATCH_ITEMS = 100
+MAX_STREAMED_BATCH_ITEMS = int(os.getenv('MAX_BATCH_ITEMS', '1000000'))
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '1000'))
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Batch items that are not JSON objects are reported, never scored from default features
+NOT_AN_OBJECT_ERROR = 'Sensor reading must be a JSON object'
+
+# /verify-stream micro-batches; a partial batch is scored once its oldest reading waited STREAM_MAX_WAIT_MS
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', '256'))
+STREAM_MAX_WAIT_MS = float(os.getenv('STREAM_MAX_WAIT_MS', '50'))
+MAX_STREAM_LINE_BYTES = 64 * 1024
+STREAM_READ_AHEAD_LINES = 64
+
+# Prometheus metrics; values owned by other components are read at scrape time
+metrics = MetricsRegistry()
+http_requests = metrics.counter('http_requests_total', 'HTTP requests by endpoint, method and status',
+                                ('endpoint', 'method', 'status'))
+http_latency = metrics.histogram('http_request_duration_seconds', 'HTTP request latency by endpoint',
+                                 ('endpoint', 'method'))
+mqtt_messages = metrics.counter('mqtt_messages_total', 'MQTT messages handled by topic type and status',
+                                ('topic_type', 'status'))
+mqtt_latency = metrics.histogram('mqtt_message_duration_seconds',
+                                 'Time from MQTT message receipt to completed verification', ('topic_type',))
+verification_requests = metrics.counter('verification_requests_total', 'Verified readings by source and status',
+                                        ('source', 'status'))
+verification_predictions = metrics.counter('verification_predictions_total', 'Verification results by predicted class',
+                                           ('prediction',))
+
 class VerificationAPI:
     """Main API class for verification service"""
     
-    def __init__(self):
-        """Initialize verification API"""
-        global fraud_detector
+    def __init__(self, start_services: bool = True):
+        """
+        Initialize verification API
+        
+        Args:
+            start_services: Start the scheduler, model loading and MQTT right away; a
+                preforking parent leaves this to its workers (see prefork_server.py)
+        """
+        global model_manager
         
-        # Initialize fraud detection models
         logger.info("Initializing AI fraud detection models...")
-        fraud_detector = CarbonFraudDetector(model_path='./models/')
+        model_manager = ModelManager(self.create_detector, warm_versions=int(os.getenv('WARM_MODEL_VERSIONS', '2')))
+        model_manager.swap(self.create_detector())
+        self.models_ready = threading.Event()
         
-        # Try to load pre-trained models, train if not available
-        try:
-            fraud_detector.load_models()
-            logger.info("Pre-trained models loaded successfully")
-        except Exception as e:
-            logger.warning(f"Could not load pre-trained models: {e}")
-            logger.info("Training new models...")
-            fraud_detector.train_models()
-            fraud_detector.save_models()
+        # MQTT identity; worker processes each get their own client ID or leave MQTT to one worker
+        self.mqtt_enabled = True
+        self.mqtt_client_id = 'ai_verification_service'
+        self.mqtt_shared_group = None  # Subscribe via $share/<group>/ so the broker delivers each message once
         
-        # Initialize MQTT client for receiving sensor data
-        self.setup_mqtt()
+        if start_services:
+            self.start_services()
         
         logger.info("Verification API initialized successfully")
     
+    def start_services(self):
+        """Start the micro-batching scheduler, then load models and connect to MQTT in the background"""
+        global inference_scheduler
+        
+        # Score concurrent readings together, flushing on batch size or deadline
+        if os.getenv('MICRO_BATCHING', 'true').lower() == 'true':
+            inference_scheduler = InferenceScheduler(
+                lambda: model_manager.active,
+                max_batch_size=int(os.getenv('MICRO_BATCH_SIZE', '64')),
+                max_wait_ms=float(os.getenv('MICRO_BATCH_WAIT_MS', '2')),
+                max_queue_size=int(os.getenv('MICRO_BATCH_QUEUE_SIZE', '10000'))
+            ).start()
+        
+        # Initialize fraud detection models in the background so the server starts immediately
+        threading.Thread(target=self.initialize_models, name='model-initializer', daemon=True).start()
+    
+    def stop_services(self):
+        """Disconnect from MQTT and flush the scheduler"""
+        if mqtt_client is not None:
+            mqtt_client.disconnect()
+            mqtt_client.loop_stop()
+        if inference_scheduler is not None:
+            inference_scheduler.stop()
+    
+    @staticmethod
+    def create_detector() -> CarbonFraudDetector:
+        """Create an empty detector configured from the environment"""
+        detector = CarbonFraudDetector(
+            model_path='./models/',
+            cache_size=int(os.getenv('RESULT_CACHE_SIZE', '10000')),
+            cache_ttl=float(os.getenv('RESULT_CACHE_TTL_SECONDS', '300'))
+        )
+        
+        if os.getenv('CASCADE_MODE', 'false').lower() == 'true':
+            detector.configure_cascade(True, margin=float(os.getenv('CASCADE_MARGIN', '0.05')))
+        
+        # 'student' serves the distilled student of versions that include one
+        detector.configure_serving_mode(os.getenv('SERVING_MODE', 'ensemble'))
+        
+        precision = os.getenv('INFERENCE_PRECISION', 'float64')
+        if precision != 'float64':
+            detector.configure_precision(precision)
+        
+        # Stage histograms and result cache counters survive model swaps
+        detector.stage_latency = stage_latency
+        detector.result_cache.totals = result_cache_totals
+        
+        return detector
+    
+    def initialize_models(self):
+        """Load (or train) models unless already preloaded, then start consuming sensor data over MQTT"""
+        if not self.models_ready.is_set():
+            # Try to load the current registered version, train if not available. The tree
+            # ensembles are served as soon as they are loaded; the neural network joins once it is ready
+            try:
+                if not model_manager.load_current(background_models=('neural_network',)):
+                    raise RuntimeError("no trained models found")
+                logger.info(f"Pre-trained models loaded successfully (version {model_manager.active.model_version})")
+            except ModelImportError as e:
+                # Existing models are never silently replaced by freshly trained ones
+                logger.error(f"{e}; not serving until the models are fixed or removed")
+                return
+            except Exception as e:
+                logger.warning(f"Could not load pre-trained models: {e}")
+                logger.info("Training new models...")
+                fraud_detector = self.create_detector()
+                fraud_detector.train_models()
+                if fraud_detector.serving_mode == 'student':
+                    distill_student(fraud_detector)
+                model_manager.publish(fraud_detector)
+            
+            self.models_ready.set()
+        
+        # Initialize MQTT client for receiving sensor data
+        if self.mqtt_enabled:
+            self.setup_mqtt()
+    
+    def preload_models(self):
+        """
+        Load models in the calling thread for a parent process that forks workers
+        
+        Nothing here starts a thread or imports TensorFlow: missing models are trained
+        in a separate process and the neural network is served from its exported weights.
+        """
+        if not model_manager.load_current():
+            logger.info("No trained models found; training new models in a separate process...")
+            model_manager.train_version(distill_student=model_manager.active.serving_mode == STUDENT_MODEL)
+        
+        logger.info(f"Models preloaded (version {model_manager.active.model_version})")
+        self.models_ready.set()
+    
+    def follow_registry(self, interval: float):
+        """Serve the registry's current version whenever another process changes it (runs forever)"""
+        while True:
+            time.sleep(interval)
+            try:
+                model_manager.sync_current()
+            except Exception as e:
+                logger.error(f"Error following the model registry: {e}")
+    
     def setup_mqtt(self):
         """Setup MQTT client for receiving sensor data"""
         global mqtt_client
@@ -86,7 +231,7 @@ class VerificationAPI:
                 'password': os.getenv('MQTT_PASSWORD', '')
             }
             
-            mqtt_client = mqtt.Client(client_id='ai_verification_service')
+            mqtt_client = mqtt.Client(client_id=self.mqtt_client_id)
             
             if mqtt_config['username'] and mqtt_config['password']:
                 mqtt_client.username_pw_set(mqtt_config['username'], mqtt_config['password'])
@@ -108,14 +253,16 @@ class VerificationAPI:
         """MQTT connection callback"""
         if rc == 0:
             # Subscribe to emission data and verification requests
-            client.subscribe("carbon-credits/emissions/+")
-            client.subscribe("carbon-credits/ai-verification/request")
+            prefix = f"$share/{self.mqtt_shared_group}/" if self.mqtt_shared_group else ''
+            client.subscribe(f"{prefix}carbon-credits/emissions/+")
+            client.subscribe(f"{prefix}carbon-credits/ai-verification/request")
             logger.info("Subscribed to MQTT topics for automatic verification")
         else:
             logger.error(f"Failed to connect to MQTT broker: {rc}")
     
     def on_mqtt_message(self, client, userdata, msg):
         """MQTT message callback for automatic verification"""
+        received_at = time.perf_counter()
         try:
             topic = msg.topic
             payload = json.loads(msg.payload.decode('utf-8'))
@@ -124,22 +271,55 @@ class VerificationAPI:
             
             if topic.startswith("carbon-credits/emissions/"):
                 # Automatic verification of sensor data
-                self.process_sensor_data(payload)
+                self.process_sensor_data(payload, received_at)
             elif topic == "carbon-credits/ai-verification/request":
                 # Manual verification request
-                self.process_verification_request(payload)
+                self.process_verification_request(payload, received_at)
                 
         except Exception as e:
             logger.error(f"Error processing MQTT message: {e}")
+            mqtt_messages.inc('unknown', 'error')
     
-    def process_sensor_data(self, sensor_data: Dict):
+    def process_sensor_data(self, sensor_data: Dict, received_at: float = None):
         """Process incoming sensor data for verification"""
+        received_at = received_at or time.perf_counter()
         try:
-            # Perform AI verification
-            result = fraud_detector.verify_sensor_data(sensor_data)
+            if inference_scheduler is None:
+                self.complete_sensor_verification(sensor_data, model_manager.active.verify_sensor_data(sensor_data))
+                self.record_mqtt_message('sensor_data', received_at, 'success')
+                return
+            
+            # Scored in the next micro-batch; the MQTT network thread does not wait for it
+            future = inference_scheduler.submit(sensor_data)
+            future.add_done_callback(lambda done: self.on_scheduled_result(
+                self.complete_sensor_verification, sensor_data, done, 'sensor_data', received_at))
             
+        except Exception as e:
+            logger.error(f"Error processing sensor data: {e}")
+            self.record_mqtt_message('sensor_data', received_at, 'error')
+    
+    def on_scheduled_result(self, handler, payload: Dict, future, topic_type: str, received_at: float):
+        """Scheduler callback: hand a finished verification to its MQTT handler"""
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Error verifying MQTT reading: {e}")
+            self.record_mqtt_message(topic_type, received_at, 'error')
+            return
+        handler(payload, result)
+        self.record_mqtt_message(topic_type, received_at, 'success')
+    
+    @staticmethod
+    def record_mqtt_message(topic_type: str, received_at: float, status: str):
+        """Count an MQTT message and observe its receipt-to-completion latency"""
+        mqtt_messages.inc(topic_type, status)
+        mqtt_latency.observe(time.perf_counter() - received_at, topic_type)
+    
+    def complete_sensor_verification(self, sensor_data: Dict, result: VerificationResult):
+        """Record a verified MQTT reading and route it by score"""
+        try:
             # Update statistics
-            self.update_stats(result)
+            self.update_stats(result, source='mqtt')
             
             # Store in history
             verification_record = {
@@ -165,15 +345,32 @@ class VerificationAPI:
         except Exception as e:
             logger.error(f"Error processing sensor data: {e}")
     
-    def process_verification_request(self, request_data: Dict):
+    def process_verification_request(self, request_data: Dict, received_at: float = None):
         """Process manual verification request"""
+        received_at = received_at or time.perf_counter()
         try:
             # Extract sensor data from request
             sensor_data = request_data.get('sensor_data', {})
-            request_id = request_data.get('request_id')
             
             # Perform verification
-            result = fraud_detector.verify_sensor_data(sensor_data)
+            if inference_scheduler is None:
+                self.complete_verification_request(request_data, model_manager.active.verify_sensor_data(sensor_data))
+                self.record_mqtt_message('verification_request', received_at, 'success')
+                return
+            
+            future = inference_scheduler.submit(sensor_data)
+            future.add_done_callback(lambda done: self.on_scheduled_result(
+                self.complete_verification_request, request_data, done, 'verification_request', received_at))
+            
+        except Exception as e:
+            logger.error(f"Error processing verification request: {e}")
+            self.record_mqtt_message('verification_request', received_at, 'error')
+    
+    def complete_verification_request(self, request_data: Dict, result: VerificationResult):
+        """Publish the result of a manual verification request"""
+        try:
+            request_id = request_data.get('request_id')
+            record_verification_metrics(result, 'mqtt_request')
             
             # Send result back via MQTT
             response = {
@@ -217,10 +414,12 @@ class VerificationAPI:
         except Exception as e:
             logger.error(f"Error forwarding to oracle: {e}")
     
-    def update_stats(self, result: VerificationResult):
+    def update_stats(self, result: VerificationResult, source: str = 'http'):
         """Update API statistics"""
         global api_stats
         
+        record_verification_metrics(result, source)
+        
         api_stats['total_verifications'] += 1
         
         if result.prediction == 'legitimate':
@@ -230,16 +429,531 @@ class VerificationAPI:
         else:
             api_stats['fraudulent_count'] += 1
 
-# Initialize API
-verification_api = VerificationAPI()
+def record_verification_metrics(result: VerificationResult, source: str):
+    """Count a verification result by source, status and predicted class"""
+    failed = 'verification_error' in result.anomaly_flags
+    verification_requests.inc(source, 'error' if failed else 'success')
+    verification_predictions.inc(result.prediction)
+
+def collect_runtime_metrics():
+    """Scrape-time metrics from the scheduler, detector, result cache and model manager"""
+    fraud_detector = model_manager.active
+    collected = []
+    
+    ready = Gauge('models_ready', 'Whether verification requests are being served (1) or models are loading (0)')
+    ready.set(1 if verification_api.models_ready.is_set() and fraud_detector.models_ready() else 0)
+    collected.append(ready)
+    
+    info = Gauge('model_info', 'Serving model version', ('model_version', 'standby_version'))
+    standby = model_manager.standby
+    info.set(1, fraud_detector.model_version or '', (standby.model_version if standby else None) or '')
+    collected.append(info)
+    
+    loaded = Gauge('model_loaded', 'Ensemble members available for inference by runtime', ('model', 'runtime', 'status'))
+    for name, state in fraud_detector.model_readiness().items():
+        loaded.set(1 if state['status'] == 'ready' else 0, name, str(state['runtime'] or ''), state['status'])
+    collected.append(loaded)
+    
+    warm = Gauge('model_warm_versions', 'Model versions kept loaded for instant activation')
+    warm.set(len(model_manager.warm_version_names()))
+    collected.append(warm)
+    
+    retraining = Gauge('model_retrain_in_progress', 'Whether a background retrain is running')
+    retraining.set(1 if model_manager.retrain_status.get('state') == 'running' else 0)
+    collected.append(retraining)
+    
+    # Totals over every detector served, so swaps and rollbacks never reset them
+    cache_totals = result_cache_totals.snapshot()
+    for counter in ('hits', 'misses', 'evictions'):
+        family = Counter(f'result_cache_{counter}_total', f'Result cache {counter} since the process started')
+        family.inc(amount=cache_totals[counter])
+        collected.append(family)
+    cache_stats = fraud_detector.result_cache.stats()
+    for gauge, documentation in (('hit_rate', 'Result cache hit ratio'), ('size', 'Cached verification results')):
+        family = Gauge(f'result_cache_{gauge}', documentation)
+        family.set(cache_stats[gauge])
+        collected.append(family)
+    
+    if inference_scheduler is not None:
+        scheduler_stats = inference_scheduler.stats()
+        depth = Gauge('inference_queue_depth', 'Readings waiting for the next micro-batch')
+        depth.set(scheduler_stats['queue_depth'])
+        collected.append(depth)
+        for counter, documentation in (('batches', 'Micro-batches scored'), ('items', 'Readings scored in micro-batches')):
+            family = Counter(f'inference_{counter}_total', documentation)
+            family.inc(amount=scheduler_stats[counter])
+            collected.append(family)
+    
+    # Stage histograms are kept in milliseconds; exported in seconds
+    samples = []
+    recorders = [stage_latency] + ([inference_scheduler.latency] if inference_scheduler else [])
+    for recorder in recorders:
+        for stage in recorder.stages():
+            buckets, count, total_ms = recorder.histogram(stage).cumulative()
+            samples.extend(histogram_sample('verification_stage_duration_seconds', ('stage',), (stage,), bound / 1000.0, cumulative)
+                           for bound, cumulative in buckets)
+            samples.append(f'verification_stage_duration_seconds_count{{stage="{stage}"}} {count}')
+            samples.append(f'verification_stage_duration_seconds_sum{{stage="{stage}"}} {total_ms / 1000.0}')
+    collected.append(StaticMetric('verification_stage_duration_seconds',
+                                  'Time spent in each verification stage per scored batch', 'histogram', samples))
+    
+    return collected
+
+# Initialize API; a preforking parent only preloads models and its workers start their own services
+verification_api = VerificationAPI(start_services=os.getenv('PREFORK_PARENT', 'false').lower() != 'true')
+metrics.add_collector(collect_runtime_metrics)
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started for the latency histogram"""
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and observe its latency by route"""
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    http_requests.inc(endpoint, request.method, str(response.status_code))
+    if 'request_start' in g:
+        http_latency.observe(time.perf_counter() - g.request_start, endpoint, request.method)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+def verify_readings(sensor_data_list: List[Dict], timings: Optional[List[Dict]] = None) -> List[VerificationResult]:
+    """
+    Verify readings through the micro-batching scheduler, or directly when it is disabled
+    
+    Args:
+        sensor_data_list: Raw sensor payloads
+        timings: Optional list extended with the stage timings (ms) of every reading
+    """
+    if inference_scheduler is not None:
+        return inference_scheduler.verify_many(sensor_data_list, timings=timings)
+    
+    batch_timings = {}
+    results = model_manager.active.verify_batch(sensor_data_list, timings=batch_timings)
+    if timings is not None:
+        timings.extend([batch_timings] * len(results))
+    return results
+
+def scheduler_overloaded_payload() -> Tuple[Dict, int]:
+    """Body and status of requests rejected because the inference queue is full"""
+    return {
+        'error': 'Inference queue is full, retry later',
+        'queue_depth': inference_scheduler.queue_depth() if inference_scheduler else 0
+    }, 503
+
+def models_unavailable_payload() -> Tuple[Dict, int]:
+    """Body and status of verification requests received while models are still loading"""
+    return {
+        'error': 'Models are still loading',
+        'models': model_manager.active.model_readiness()
+    }, 503
+
+def scheduler_overloaded():
+    """Response for requests rejected because the inference queue is full"""
+    payload, status = scheduler_overloaded_payload()
+    return jsonify(payload), status
+
+def models_unavailable():
+    """Response for verification requests received while models are still loading"""
+    payload, status = models_unavailable_payload()
+    return jsonify(payload), status
+
+# Request checks and response bodies shared by the Flask views and the ASGI app (asgi_app.py)
+def check_verify_request(sensor_data: Optional[Dict]) -> Optional[Tuple[Dict, int]]:
+    """Error body and status for an unusable /verify request, or None"""
+    if not sensor_data:
+        return {'error': 'No sensor data provided'}, 400
+    if not isinstance(sensor_data, dict):
+        return {'error': NOT_AN_OBJECT_ERROR}, 400
+    
+    # Validate required fields
+    required_fields = ['sensor_id', 'timestamp', 'measurements']
+    for field in required_fields:
+        if field not in sensor_data:
+            return {'error': f'Missing required field: {field}'}, 400
+    
+    if not verification_api.models_ready.is_set():
+        return models_unavailable_payload()
+    return None
+
+def verify_response(sensor_data: Dict, result: VerificationResult, start_time: float,
+                    timings: Dict[str, float], detailed: bool) -> Dict:
+    """Record a verified /verify reading and build its response body"""
+    # Calculate processing time
+    processing_time = time.time() - start_time
+    
+    # Update statistics
+    verification_api.update_stats(result)
+    
+    # Update average processing time
+    total_verifications = api_stats['total_verifications']
+    api_stats['avg_processing_time'] = (
+        (api_stats['avg_processing_time'] * (total_verifications - 1) + processing_time) / total_verifications
+    )
+    
+    # Prepare response
+    response = {
+        'verification_result': {
+            'score': result.score,
+            'prediction': result.prediction,
+            'confidence': result.confidence,
+            'anomaly_flags': result.anomaly_flags,
+            'risk_factors': result.risk_factors,
+            'timestamp': result.timestamp
+        },
+        'processing_time_ms': round(processing_time * 1000, 2),
+        'sensor_id': sensor_data.get('sensor_id'),
+        'model_version': result.model_version,
+        'api_version': '1.0.0'
+    }
+    
+    # Add detailed model outputs and stage timings if requested
+    if detailed:
+        response['model_outputs'] = result.model_outputs
+        response['timings_ms'] = {stage: round(value, 3) for stage, value in timings.items()}
+    
+    logger.info(f"Verified sensor data: {sensor_data.get('sensor_id')} - Score: {result.score:.1f}")
+    return response
+
+def streaming_requested(accept: Optional[str], stream_arg: Optional[str]) -> bool:
+    """Whether a /batch-verify client asked for NDJSON results (Accept header or ?stream=true)"""
+    return NDJSON_CONTENT_TYPE in (accept or '') or (stream_arg or '').lower() == 'true'
+
+def check_batch_request(batch_data: Optional[Dict], stream: bool = False) -> Optional[Tuple[Dict, int]]:
+    """Error body and status for an unusable /batch-verify request, or None"""
+    if not batch_data or 'sensor_data_list' not in batch_data:
+        return {'error': 'No sensor data list provided'}, 400
+    
+    # Limit batch size; only streamed results scale to large batches
+    if stream and len(batch_data['sensor_data_list']) > MAX_STREAMED_BATCH_ITEMS:
+        return {'error': f'Batch size too large (max {MAX_STREAMED_BATCH_ITEMS})'}, 400
+    if not stream and len(batch_data['sensor_data_list']) > MAX_JSON_BATCH_ITEMS:
+        return {'error': f'Batch size too large (max {MAX_JSON_BATCH_ITEMS}; request '
+                         f'{NDJSON_CONTENT_TYPE} results for up to {MAX_STREAMED_BATCH_ITEMS})'}, 400
+    
+    if not verification_api.models_ready.is_set():
+        return models_unavailable_payload()
+    return None
+
+def batch_item(index: int, sensor_data: Any, result: Optional[VerificationResult], source: str = 'batch') -> Dict:
+    """Record one verified batch reading and build its result entry (an error entry for unscored items)"""
+    if not isinstance(sensor_data, dict) or result is None:
+        return {'index': index, 'sensor_id': None, 'error': NOT_AN_OBJECT_ERROR}
+    
+    sensor_id = sensor_data.get('sensor_id')
+    try:
+        verification_api.update_stats(result, source=source)
+        
+        return {
+            'index': index,
+            'sensor_id': sensor_id,
+            'score': result.score,
+            'prediction': result.prediction,
+            'confidence': result.confidence,
+            'anomaly_flags': result.anomaly_flags
+        }
+        
+    except Exception as e:
+        logger.error(f"Error processing batch item {index}: {e}")
+        return {
+            'index': index,
+            'sensor_id': sensor_id,
+            'error': str(e)
+        }
+
+def batch_statistics(total_items: int, successful: int, failed: int, score_sum: float, start_time: float) -> Dict:
+    """Summary of a processed batch"""
+    return {
+        'total_items': total_items,
+        'successful': successful,
+        'failed': failed,
+        'avg_score': score_sum / successful if successful else 0,
+        'processing_time_ms': round((time.time() - start_time) * 1000, 2)
+    }
+
+def reading_positions(sensor_data_list: List[Any]) -> List[int]:
+    """Positions of the batch items that are JSON objects and can be scored"""
+    return [i for i, sensor_data in enumerate(sensor_data_list) if isinstance(sensor_data, dict)]
+
+def align_results(total_items: int, positions: List[int], results: List[Any]) -> List[Optional[Any]]:
+    """Spread results computed for the given positions over the whole batch (None elsewhere)"""
+    aligned: List[Optional[Any]] = [None] * total_items
+    for i, result in zip(positions, results):
+        aligned[i] = result
+    return aligned
+
+def verify_batch_readings(sensor_data_list: List[Any]) -> List[Optional[VerificationResult]]:
+    """Verify the JSON object items of a batch; other items get None"""
+    positions = reading_positions(sensor_data_list)
+    verified = verify_readings([sensor_data_list[i] for i in positions])
+    return align_results(len(sensor_data_list), positions, verified)
+
+def batch_response(sensor_data_list: List[Any], verified: List[Optional[VerificationResult]], start_time: float) -> Dict:
+    """Record verified /batch-verify readings and build the response body"""
+    # Process each sensor reading
+    results = [batch_item(i, sensor_data, result)
+               for i, (sensor_data, result) in enumerate(zip(sensor_data_list, verified))]
+    
+    # Calculate batch statistics
+    successful_verifications = [r for r in results if 'error' not in r]
+    batch_stats = batch_statistics(len(sensor_data_list), len(successful_verifications),
+                                   len(results) - len(successful_verifications),
+                                   sum(r['score'] for r in successful_verifications), start_time)
+    
+    return {
+        'batch_results': results,
+        'batch_statistics': batch_stats,
+        'model_version': next((result.model_version for result in reversed(verified) if result is not None),
+                              model_manager.active.model_version),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+def stream_batch(sensor_data_list: List[Any], start_time: float, chunk_size: int = BATCH_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Verify a large batch in vectorized chunks and yield it as NDJSON, one part per chunk
+    
+    Each part holds one line per reading, shaped like the entries of batch_results,
+    followed by a progress line. The last line holds the batch statistics. Every
+    chunk is scored by the detector that was active when the batch started.
+    """
+    fraud_detector = model_manager.active
+    total_items = len(sensor_data_list)
+    successful = failed = 0
+    score_sum = 0.0
+    
+    for offset in range(0, total_items, chunk_size):
+        chunk = sensor_data_list[offset:offset + chunk_size]
+        entries = verify_batch_chunk(fraud_detector, chunk, offset)
+        
+        for entry in entries:
+            if 'error' in entry:
+                failed += 1
+            else:
+                successful += 1
+                score_sum += entry['score']
+        
+        entries.append({'progress': {
+            'chunk': offset // chunk_size,
+            'processed': offset + len(chunk),
+            'total_items': total_items,
+            'successful': successful,
+            'failed': failed,
+            'elapsed_ms': round((time.time() - start_time) * 1000, 2)
+        }})
+        yield ''.join(json.dumps(entry) + '\n' for entry in entries)
+    
+    yield json.dumps({
+        'batch_statistics': batch_statistics(total_items, successful, failed, score_sum, start_time),
+        'model_version': fraud_detector.model_version,
+        'timestamp': datetime.utcnow().isoformat()
+    }) + '\n'
+
+def verify_batch_chunk(fraud_detector: CarbonFraudDetector, chunk: List[Any], offset: int,
+                       source: str = 'batch') -> List[Dict]:
+    """Verify one chunk of a streamed batch with a single vectorized call and build its entries"""
+    readings = reading_positions(chunk)
+    try:
+        verified = fraud_detector.verify_batch([chunk[i] for i in readings], raise_errors=True)
+    except Exception as e:
+        logger.error(f"Error verifying batch items {offset}-{offset + len(chunk) - 1}: {e}")
+        return [
+            {'index': offset + i, 'sensor_id': sensor_data.get('sensor_id'), 'error': str(e)}
+            if isinstance(sensor_data, dict) else batch_item(offset + i, sensor_data, None)
+            for i, sensor_data in enumerate(chunk)
+        ]
+    
+    verified = align_results(len(chunk), readings, verified)
+    return [batch_item(offset + i, sensor_data, result, source)
+            for i, (sensor_data, result) in enumerate(zip(chunk, verified))]
+
+class StreamLineTooLongError(ValueError):
+    """Raised when a /verify-stream line exceeds MAX_STREAM_LINE_BYTES"""
+
+class StreamVerifier:
+    """
+    Incremental NDJSON verification behind /verify-stream
+    
+    Received bytes are split into lines and scored in micro-batches as they complete,
+    so at most one partial line and one micro-batch are held whatever the upload size.
+    Result lines match the /batch-verify NDJSON entries, indexed by non-blank input line.
+    """
+    
+    def __init__(self, fraud_detector: CarbonFraudDetector, start_time: float,
+                 batch_size: int = STREAM_BATCH_SIZE, max_wait_ms: float = STREAM_MAX_WAIT_MS):
+        self.fraud_detector = fraud_detector
+        self.start_time = start_time
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.buffer = b''
+        self.pending: List[Any] = []
+        self.pending_errors: Dict[int, str] = {}  # Position in pending -> JSON error of that line
+        self.pending_since = 0.0
+        self.offset = 0
+        self.successful = self.failed = 0
+        self.score_sum = 0.0
+    
+    def feed(self, data: bytes) -> str:
+        """
+        Add received bytes
+        
+        Returns:
+            NDJSON results of the micro-batches completed by them (may be empty)
+        
+        Raises:
+            StreamLineTooLongError: If an unterminated line exceeds MAX_STREAM_LINE_BYTES
+        """
+        *lines, self.buffer = (self.buffer + data).split(b'\n')
+        if len(self.buffer) > MAX_STREAM_LINE_BYTES:
+            raise StreamLineTooLongError(f"Line {self.offset + len(self.pending)} exceeds {MAX_STREAM_LINE_BYTES} bytes")
+        
+        parts = []
+        for line in lines:
+            if not line.strip():
+                continue
+            if not self.pending:
+                self.pending_since = time.perf_counter()
+            try:
+                self.pending.append(json.loads(line))
+            except ValueError as e:
+                self.pending_errors[len(self.pending)] = f"Invalid JSON: {e}"
+                self.pending.append(None)
+            if len(self.pending) >= self.batch_size:
+                parts.append(self.flush())
+        
+        if self.pending and time.perf_counter() - self.pending_since >= self.max_wait:
+            parts.append(self.flush())
+        return ''.join(parts)
+    
+    @property
+    def flush_due_in(self) -> Optional[float]:
+        """Seconds until the pending micro-batch should be scored, or None if nothing is pending"""
+        if not self.pending:
+            return None
+        return max(0.0, self.pending_since + self.max_wait - time.perf_counter())
+    
+    def flush(self) -> str:
+        """Score the pending readings and return their NDJSON results"""
+        if not self.pending:
+            return ''
+        
+        entries = verify_batch_chunk(self.fraud_detector, self.pending, self.offset, source='stream')
+        for position, error in self.pending_errors.items():
+            entries[position] = {'index': self.offset + position, 'sensor_id': None, 'error': error}
+        
+        for entry in entries:
+            if 'error' in entry:
+                self.failed += 1
+            else:
+                self.successful += 1
+                self.score_sum += entry['score']
+        
+        self.offset += len(self.pending)
+        self.pending, self.pending_errors = [], {}
+        return ''.join(json.dumps(entry) + '\n' for entry in entries)
+    
+    def close(self, error: Optional[str] = None) -> str:
+        """Score the rest of the upload (including an unterminated last line) and add the statistics line"""
+        parts = []
+        if error is None:
+            parts.append(self.feed(b'\n'))
+        parts.append(self.flush())
+        
+        summary = {
+            'batch_statistics': batch_statistics(self.offset, self.successful, self.failed,
+                                                 self.score_sum, self.start_time),
+            'model_version': self.fraud_detector.model_version,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        if error is not None:
+            summary['error'] = error
+        parts.append(json.dumps(summary) + '\n')
+        return ''.join(parts)
+
+class StreamBodyReader:
+    """
+    Reads a request body line by line on a background thread
+    
+    The WSGI response generator waits on the received lines with a timeout, so a due
+    micro-batch is scored while the client pauses instead of on its next line. At most
+    STREAM_READ_AHEAD_LINES lines are buffered; beyond that the reader stops reading and
+    the client is held back by TCP flow control.
+    """
+    
+    def __init__(self, read_line: Callable[[], bytes], max_buffered: int = STREAM_READ_AHEAD_LINES):
+        self.lines: 'queue.Queue' = queue.Queue(maxsize=max_buffered)
+        self.closed = threading.Event()
+        threading.Thread(target=self._read, args=(read_line,), name='stream-reader', daemon=True).start()
+    
+    def _read(self, read_line: Callable[[], bytes]):
+        try:
+            for line in iter(read_line, b''):
+                if not self._put(line):
+                    return
+        except Exception as e:
+            logger.warning(f"Stream upload ended early: {e}")
+        self._put(b'')
+    
+    def _put(self, line: bytes) -> bool:
+        """Hand a line to the response generator; False once it has stopped reading"""
+        while not self.closed.is_set():
+            try:
+                self.lines.put(line, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def get(self, timeout: Optional[float]) -> Optional[bytes]:
+        """
+        Next received line, b'' at the end of the body, or None if timeout expired first
+        """
+        try:
+            return self.lines.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def close(self):
+        self.closed.set()
+
+def stream_verify(verifier: StreamVerifier, reader: StreamBodyReader) -> Iterator[str]:
+    """Feed received lines to a verifier and yield its results until the upload ends"""
+    try:
+        while True:
+            line = reader.get(verifier.flush_due_in)
+            if line is None:
+                # The pending micro-batch is due while the client pauses
+                part = verifier.flush()
+            elif not line:
+                break
+            else:
+                part = verifier.feed(line)
+            if part:
+                yield part
+    except StreamLineTooLongError as e:
+        yield verifier.close(f"{e}; upload aborted")
+        return
+    finally:
+        reader.close()
+    yield verifier.close()
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    fraud_detector = model_manager.active
+    ready = verification_api.models_ready.is_set() and fraud_detector.models_ready()
     return jsonify({
-        'status': 'healthy',
+        'status': 'healthy' if ready else 'starting',
         'timestamp': datetime.utcnow().isoformat(),
         'models_loaded': fraud_detector.is_trained if fraud_detector else False,
+        'ready': ready,
+        'models': fraud_detector.model_readiness(),
+        'model_version': fraud_detector.model_version,
+        'retrain': model_manager.retrain_status,
         'version': '1.0.0'
     })
 
@@ -250,54 +964,22 @@ def verify_sensor_data():
         start_time = time.time()
         
         # Get sensor data from request
-        sensor_data = request.get_json()
+        sensor_data = request.get_json(silent=True)
         
-        if not sensor_data:
-            return jsonify({'error': 'No sensor data provided'}), 400
-        
-        # Validate required fields
-        required_fields = ['sensor_id', 'timestamp', 'measurements']
-        for field in required_fields:
-            if field not in sensor_data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Perform AI verification
-        result = fraud_detector.verify_sensor_data(sensor_data)
-        
-        # Calculate processing time
-        processing_time = time.time() - start_time
-        
-        # Update statistics
-        verification_api.update_stats(result)
-        
-        # Update average processing time
-        total_verifications = api_stats['total_verifications']
-        api_stats['avg_processing_time'] = (
-            (api_stats['avg_processing_time'] * (total_verifications - 1) + processing_time) / total_verifications
-        )
+        rejection = check_verify_request(sensor_data)
+        if rejection:
+            payload, status = rejection
+            return jsonify(payload), status
         
-        # Prepare response
-        response = {
-            'verification_result': {
-                'score': result.score,
-                'prediction': result.prediction,
-                'confidence': result.confidence,
-                'anomaly_flags': result.anomaly_flags,
-                'risk_factors': result.risk_factors,
-                'timestamp': result.timestamp
-            },
-            'processing_time_ms': round(processing_time * 1000, 2),
-            'sensor_id': sensor_data.get('sensor_id'),
-            'api_version': '1.0.0'
-        }
-        
-        # Add detailed model outputs if requested
-        if request.args.get('detailed') == 'true':
-            response['model_outputs'] = result.model_outputs
-        
-        logger.info(f"Verified sensor data: {sensor_data.get('sensor_id')} - Score: {result.score:.1f}")
+        # Perform AI verification, batched with concurrent requests
+        timings = []
+        try:
+            result = verify_readings([sensor_data], timings)[0]
+        except SchedulerQueueFullError:
+            return scheduler_overloaded()
         
-        return jsonify(response)
+        return jsonify(verify_response(sensor_data, result, start_time, timings[0],
+                                       request.args.get('detailed') == 'true'))
         
     except Exception as e:
         logger.error(f"Error in verification endpoint: {e}")
@@ -310,62 +992,45 @@ def batch_verify():
         start_time = time.time()
         
         # Get batch data from request
-        batch_data = request.get_json()
+        batch_data = request.get_json(silent=True)
+        stream = streaming_requested(request.headers.get('Accept'), request.args.get('stream'))
         
-        if not batch_data or 'sensor_data_list' not in batch_data:
-            return jsonify({'error': 'No sensor data list provided'}), 400
+        rejection = check_batch_request(batch_data, stream)
+        if rejection:
+            payload, status = rejection
+            return jsonify(payload), status
         
         sensor_data_list = batch_data['sensor_data_list']
         
-        if len(sensor_data_list) > 100:  # Limit batch size
-            return jsonify({'error': 'Batch size too large (max 100)'}), 400
+        # Large batches are scored chunk by chunk while the results are written out
+        if stream:
+            return Response(stream_batch(sensor_data_list, start_time), mimetype=NDJSON_CONTENT_TYPE)
         
-        # Process each sensor reading
-        results = []
-        for i, sensor_data in enumerate(sensor_data_list):
-            try:
-                result = fraud_detector.verify_sensor_data(sensor_data)
-                verification_api.update_stats(result)
-                
-                results.append({
-                    'index': i,
-                    'sensor_id': sensor_data.get('sensor_id'),
-                    'score': result.score,
-                    'prediction': result.prediction,
-                    'confidence': result.confidence,
-                    'anomaly_flags': result.anomaly_flags
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing batch item {i}: {e}")
-                results.append({
-                    'index': i,
-                    'sensor_id': sensor_data.get('sensor_id'),
-                    'error': str(e)
-                })
-        
-        processing_time = time.time() - start_time
-        
-        # Calculate batch statistics
-        successful_verifications = [r for r in results if 'error' not in r]
-        batch_stats = {
-            'total_items': len(sensor_data_list),
-            'successful': len(successful_verifications),
-            'failed': len(results) - len(successful_verifications),
-            'avg_score': sum(r['score'] for r in successful_verifications) / len(successful_verifications) if successful_verifications else 0,
-            'processing_time_ms': round(processing_time * 1000, 2)
-        }
+        # Items join the scheduler's micro-batches alongside concurrent requests
+        try:
+            verified = verify_batch_readings(sensor_data_list)
+        except SchedulerQueueFullError:
+            return scheduler_overloaded()
         
-        return jsonify({
-            'batch_results': results,
-            'batch_statistics': batch_stats,
-            'timestamp': datetime.utcnow().isoformat()
-        })
+        return jsonify(batch_response(sensor_data_list, verified, start_time))
         
     except Exception as e:
         logger.error(f"Error in batch verification endpoint: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/verify-stream', methods=['POST'])
+def verify_stream():
+    """Verify an NDJSON upload of any size, writing results back while it is received"""
+    if not verification_api.models_ready.is_set():
+        return models_unavailable()
+    
+    # Lines are read as the client sends them; the response is written as batches complete
+    # or fall due, whichever comes first
+    verifier = StreamVerifier(model_manager.active, time.time())
+    body = request.stream
+    reader = StreamBodyReader(lambda: body.readline(MAX_STREAM_LINE_BYTES + 1))
+    return Response(stream_verify(verifier, reader), mimetype=NDJSON_CONTENT_TYPE)
+
 @app.route('/stats', methods=['GET'])
 def get_statistics():
     """Get API usage statistics"""
@@ -374,6 +1039,7 @@ def get_statistics():
         start_time = datetime.fromisoformat(api_stats['start_time'])
         uptime_seconds = (datetime.utcnow() - start_time).total_seconds()
         
+        fraud_detector = model_manager.active
         stats_response = api_stats.copy()
         stats_response.update({
             'uptime_seconds': round(uptime_seconds),
@@ -381,9 +1047,19 @@ def get_statistics():
             'verification_rate_per_hour': round(api_stats['total_verifications'] / max(uptime_seconds / 3600, 0.001), 2),
             'fraud_detection_rate': round(api_stats['fraudulent_count'] / max(api_stats['total_verifications'], 1) * 100, 2),
             'model_performance': {
-                'total_models': len(fraud_detector.models) if fraud_detector else 0,
-                'feature_count': len(fraud_detector._get_default_features()) if fraud_detector else 0,
-                'is_trained': fraud_detector.is_trained if fraud_detector else False
+                'total_models': len(fraud_detector.loaded_model_names()) if fraud_detector else 0,
+                'feature_count': len(fraud_detector.feature_schema) if fraud_detector else 0,
+                'is_trained': fraud_detector.is_trained if fraud_detector else False,
+                'model_version': fraud_detector.model_version if fraud_detector else None,
+                'inference_precision': fraud_detector.inference_dtype.name if fraud_detector else None,
+                'serving_mode': fraud_detector.serving_mode if fraud_detector else None
+            },
+            'result_cache': fraud_detector.result_cache.stats() if fraud_detector else {},
+            'cascade': fraud_detector.cascade_stats() if fraud_detector else {},
+            'inference_scheduler': inference_scheduler.stats() if inference_scheduler else {'running': False},
+            'stage_latency': {
+                **stage_latency.snapshot(),
+                **(inference_scheduler.latency.snapshot() if inference_scheduler else {})
             }
         })
         
@@ -425,20 +1101,28 @@ def get_verification_history():
 def get_model_info():
     """Get information about loaded AI models"""
     try:
+        fraud_detector = model_manager.active
         if not fraud_detector:
             return jsonify({'error': 'Models not initialized'}), 500
         
+        student = fraud_detector.serving_models.get(STUDENT_MODEL)
         model_info = {
-            'models_loaded': list(fraud_detector.models.keys()) if fraud_detector.models else [],
+            'models_loaded': fraud_detector.loaded_model_names(),
+            'model_version': fraud_detector.model_version,
+            'standby_version': model_manager.standby.model_version if model_manager.standby else None,
+            'warm_versions': model_manager.warm_version_names(),
+            'model_readiness': fraud_detector.model_readiness(),
             'is_trained': fraud_detector.is_trained,
+            'inference_precision': fraud_detector.inference_dtype.name,
+            'serving_mode': fraud_detector.serving_mode,
+            'student': student.metadata.get('distillation') if student is not None else None,
             'feature_importance': fraud_detector.feature_importance,
             'thresholds': fraud_detector.thresholds,
             'model_versions': {
                 'fraud_detector': '1.0.0',
-                'tensorflow': tf.__version__,
-                'sklearn': '1.7.1',
-                'xgboost': xgb.__version__
-            }
+                **{name: backend['version'] for name, backend in BACKENDS.status().items()}
+            },
+            'backends': BACKENDS.status()
         }
         
         return jsonify(model_info)
@@ -449,33 +1133,120 @@ def get_model_info():
 
 @app.route('/retrain', methods=['POST'])
 def retrain_models():
-    """Retrain models with new data (admin endpoint)"""
+    """Retrain models with new data in the background (admin endpoint)"""
     try:
         # This would typically require authentication
         # For demo purposes, we'll allow it
         
-        request_data = request.get_json()
+        request_data = request.get_json(silent=True)
         sample_size = request_data.get('sample_size', 10000) if request_data else 10000
         
-        logger.info(f"Starting model retraining with {sample_size} samples...")
+        if not verification_api.models_ready.is_set():
+            return models_unavailable()
+        
+        # Fit the ensemble members in separate worker processes unless disabled
+        parallel = request_data.get('parallel') if request_data and 'parallel' in request_data else \
+            os.getenv('PARALLEL_TRAINING', 'false').lower() == 'true'
         
-        # Retrain models
-        fraud_detector.train_models()
-        fraud_detector.save_models()
+        # Stream from historical shards when a directory is given
+        shard_directory = request_data.get('shard_directory') if request_data else None
         
-        logger.info("Model retraining completed successfully")
+        # Distill a student from the new ensemble (by default when serving students)
+        distill = request_data.get('distill_student') if request_data and 'distill_student' in request_data else \
+            model_manager.active.serving_mode == 'student'
+        
+        logger.info(f"Starting background model retraining with {sample_size} samples...")
+        
+        # Train in a worker process; the new models are swapped in when complete
+        try:
+            status = model_manager.start_retrain(parallel=parallel, shard_directory=shard_directory,
+                                                 distill_student=distill)
+        except RetrainInProgressError:
+            return jsonify({'error': 'Retrain already in progress', 'retrain': model_manager.retrain_status}), 409
         
         return jsonify({
-            'message': 'Models retrained successfully',
+            'message': 'Model retraining started',
             'sample_size': sample_size,
+            'parallel': parallel,
+            'shard_directory': shard_directory,
+            'distill_student': distill,
             'timestamp': datetime.utcnow().isoformat(),
-            'models_updated': list(fraud_detector.models.keys())
-        })
+            'model_version': model_manager.active.model_version,
+            'retrain': status
+        }), 202
         
     except Exception as e:
         logger.error(f"Error retraining models: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/retrain/status', methods=['GET'])
+def retrain_status():
+    """Get the state of the most recent background retrain"""
+    return jsonify({
+        'retrain': model_manager.retrain_status,
+        'model_version': model_manager.active.model_version,
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@app.route('/model-versions', methods=['GET'])
+def list_model_versions():
+    """List registered model versions with their metadata"""
+    registry = model_manager.registry
+    return jsonify({
+        'versions': registry.list_versions(),
+        'current_version': registry.current_version(),
+        'active_version': model_manager.active.model_version,
+        'warm_versions': model_manager.warm_version_names(),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@app.route('/model-versions/activate', methods=['POST'])
+def activate_model_version():
+    """Serve a registered model version (admin endpoint)"""
+    request_data = request.get_json(silent=True) or {}
+    version = request_data.get('version')
+    if not version:
+        return jsonify({'error': 'version is required'}), 400
+    
+    try:
+        activation = model_manager.activate(version)
+    except ModelVersionNotFoundError:
+        return jsonify({'error': f'Unknown model version {version}'}), 404
+    except Exception as e:
+        logger.error(f"Error activating model version {version}: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+    
+    return jsonify({**activation, 'timestamp': datetime.utcnow().isoformat()})
+
+@app.route('/model-versions/rollback', methods=['POST'])
+def rollback_model_version():
+    """Serve the version registered before the active one (admin endpoint)"""
+    try:
+        activation = model_manager.rollback()
+    except ModelVersionNotFoundError:
+        return jsonify({'error': 'No earlier model version to roll back to'}), 409
+    except Exception as e:
+        logger.error(f"Error rolling back model version: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+    
+    return jsonify({**activation, 'timestamp': datetime.utcnow().isoformat()})
+
+@app.route('/model-versions/preload', methods=['POST'])
+def preload_model_versions():
+    """Keep the newest N model versions loaded for instant activation (admin endpoint)"""
+    request_data = request.get_json(silent=True) or {}
+    try:
+        count = int(request_data.get('count', model_manager.warm_versions))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'count must be an integer'}), 400
+    
+    warm_versions = model_manager.preload(count)
+    return jsonify({
+        'warm_versions': warm_versions,
+        'count': model_manager.warm_versions,
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
@@ -487,13 +1258,8 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
-    # Import required modules
-    import tensorflow as tf
-    import xgboost as xgb
-    
+    # ML frameworks are imported on first use, not at startup
     logger.info("Starting AI Verification API Service...")
-    logger.info(f"TensorFlow version: {tf.__version__}")
-    logger.info(f"XGBoost version: {xgb.__version__}")
     
     # Get configuration from environment
     host = os.getenv('AI_API_HOST', '0.0.0.0')
@@ -504,11 +1270,13 @@ if __name__ == '__main__':
     logger.info("Available endpoints:")
     logger.info("  POST /verify - Verify single sensor reading")
     logger.info("  POST /batch-verify - Verify multiple sensor readings")
+    logger.info("  POST /verify-stream - Verify an NDJSON upload, streaming results back")
     logger.info("  GET  /stats - Get API statistics")
     logger.info("  GET  /history - Get verification history")
     logger.info("  GET  /model-info - Get AI model information")
     logger.info("  GET  /health - Health check")
-    logger.info("  POST /retrain - Retrain models (admin)")
+    logger.info("  POST /retrain - Retrain models in the background (admin)")
+    logger.info("  GET  /retrain/status - Background retrain status")
     
     # Start the Flask app
     app.run(host=host, port=port, debug=debug, threaded=True)
\ No newline at end of file
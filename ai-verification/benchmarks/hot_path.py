@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Fraud Detection Hot Path Benchmark
+Times each inference stage of CarbonFraudDetector separately on synthetic sensor
+readings: feature extraction, scaling, every ensemble member, anomaly flagging,
+risk factors, the full verify_batch pipeline and single verify_sensor_data calls.
+Reports p50/p95/p99 latency and row throughput per batch size as JSON, and flags
+regressions against a previous run
+
+Usage (from the ai-verification directory):
+    python -m benchmarks.hot_path --output bench.json
+    python -m benchmarks.hot_path --baseline bench.json --fail-on-regression
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from models.backends import BACKENDS
+from models.feature_extraction import RAW_FIELDS
+from models.feature_schema import DAY_OF_MONTH, HAS_DATA_HASH, HOUR_OF_DAY, MONTH_OF_YEAR
+from models.fraud_detection import CarbonFraudDetector
+from models.model_registry import ModelRegistry
+from models.synthetic_data import SyntheticDataGenerator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZES = (1, 10, 100, 1000, 10000)
+RESULT_FORMAT_VERSION = 1
+
+
+def generate_sensor_readings(num_readings: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build raw sensor payloads from a synthetic feature matrix
+
+    Raw fields and timestamps come from the generator's columns, so the readings
+    have the same legitimate/fraudulent mix as the training data.
+    """
+    features, _ = SyntheticDataGenerator(seed).generate(num_readings)
+    base_time = datetime(2024, 1, 1)
+
+    readings = []
+    for i, row in enumerate(features):
+        reading: Dict[str, Any] = {'sensor_id': f"bench-{i % 500:03d}", 'reading_id': i}
+        for column, section, key, _ in RAW_FIELDS:
+            reading.setdefault(section, {})[key] = float(row[column])
+
+        month = int(row[MONTH_OF_YEAR])
+        day = min(int(row[DAY_OF_MONTH]), 28)
+        reading['timestamp'] = (base_time.replace(month=month, day=day)
+                                + timedelta(hours=int(row[HOUR_OF_DAY]))).isoformat()
+        if row[HAS_DATA_HASH]:
+            reading['data_hash'] = f"{i:064x}"
+        readings.append(reading)
+
+    return readings
+
+
+def time_stage(fn: Callable[[], Any], rows: int, repeats: int, max_seconds: float) -> Dict[str, float]:
+    """
+    Time repeated calls of fn after one warm-up call
+
+    Stops after `repeats` calls or once max_seconds have been spent (at least three calls).
+    """
+    fn()
+
+    timings = []
+    budget_start = time.perf_counter()
+    while len(timings) < repeats and (len(timings) < 3 or time.perf_counter() - budget_start < max_seconds):
+        start_time = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start_time)
+
+    timings_ms = np.array(timings) * 1000.0
+    p50, p95, p99 = np.percentile(timings_ms, [50, 95, 99])
+    return {
+        'iterations': len(timings),
+        'mean_ms': round(float(timings_ms.mean()), 4),
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        # None when calls were below the timer resolution; JSON has no infinity
+        'throughput_rows_per_s': round(rows / (float(p50) / 1000.0), 1) if p50 > 0 else None,
+    }
+
+
+def load_detector(model_path: str, train_samples: int) -> CarbonFraudDetector:
+    """Load the registry's current version (or a flat model directory), training one if none exists"""
+    registry = ModelRegistry(model_path)
+    version = registry.current_version()
+    path = registry.version_path(version) if version else model_path
+
+    # The result cache would turn repeated timings into cache hits
+    detector = CarbonFraudDetector(model_path=path, cache_size=0)
+    detector.load_models(path)
+    if version:
+        detector.model_version = version
+
+    if not detector.is_trained:
+        logger.info(f"No trained models in {model_path}; training on {train_samples} synthetic samples")
+        detector.train_models(*detector.generate_training_data(train_samples, seed=42))
+
+    return detector
+
+
+def build_stages(detector: CarbonFraudDetector) -> Dict[str, Callable[[List[Dict], np.ndarray], Any]]:
+    """Benchmark stages, each taking (readings, feature matrix)"""
+    stages = {
+        'feature_extraction': lambda readings, matrix: detector.create_feature_matrix(readings),
+    }
+
+    try:
+        scaler = detector._require_scaler()
+        stages['scaling'] = lambda readings, matrix: scaler.transform(matrix)
+    except Exception as e:
+        logger.warning(f"Skipping scaling stage, no scaler available: {e}")
+
+    for name in detector.ensemble_weights:
+        if detector._model_available(name):
+            stages[f"model.{name}"] = lambda readings, matrix, name=name: detector._predict_model(name, matrix)
+
+    if detector._model_available('isolation_forest'):
+        stages['identify_anomalies'] = lambda readings, matrix: detector._identify_anomalies(
+            matrix, detector._predict_model('isolation_forest', matrix))
+
+    stages['calculate_risk_factors'] = lambda readings, matrix: detector._calculate_risk_factors(matrix)
+    stages['verify_batch'] = lambda readings, matrix: detector.verify_batch(readings)
+    return stages
+
+
+def run_benchmark(detector: CarbonFraudDetector, batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+                  repeats: int = 50, max_seconds: float = 2.0, seed: int = 0) -> Dict[str, Any]:
+    """
+    Run every stage at every batch size
+
+    Returns:
+        Results by stage and batch size, plus run metadata
+    """
+    readings = generate_sensor_readings(max(batch_sizes), seed)
+    matrix = detector.create_feature_matrix(readings)
+    stages = build_stages(detector)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for stage, fn in stages.items():
+        results[stage] = {}
+        for batch_size in batch_sizes:
+            batch_readings, batch_matrix = readings[:batch_size], matrix[:batch_size]
+            results[stage][str(batch_size)] = time_stage(
+                lambda: fn(batch_readings, batch_matrix), batch_size, repeats, max_seconds)
+        logger.info(f"{stage}: " + ", ".join(
+            f"{size}={timing['p50_ms']:.3f}ms" for size, timing in results[stage].items()))
+
+    # The per-request entry point, one reading per call
+    results['verify_sensor_data'] = {
+        '1': time_stage(lambda: detector.verify_sensor_data(readings[0]), 1, repeats, max_seconds)
+    }
+
+    return {
+        'format_version': RESULT_FORMAT_VERSION,
+        'metadata': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'model_version': detector.model_version,
+            'models': detector.loaded_model_names(),
+            'cascade_enabled': detector.cascade_enabled,
+            'batch_sizes': list(batch_sizes),
+            'repeats': repeats,
+            'seed': seed,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'backends': {name: backend['version'] for name, backend in BACKENDS.status().items()},
+        },
+        'results': results,
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1,
+                    metric: str = 'p50_ms') -> List[Dict[str, Any]]:
+    """
+    Find stages and batch sizes that got slower than the baseline
+
+    Args:
+        current: Result of run_benchmark
+        baseline: Result of an earlier run
+        threshold: Relative slowdown that counts as a regression (0.1 = 10%)
+        metric: Latency statistic to compare
+
+    Returns:
+        Regressions, worst first
+    """
+    regressions = []
+    for stage, sizes in current['results'].items():
+        for batch_size, timing in sizes.items():
+            previous = baseline.get('results', {}).get(stage, {}).get(batch_size)
+            if not previous or not previous.get(metric):
+                continue
+
+            change = timing[metric] / previous[metric] - 1.0
+            if change > threshold:
+                regressions.append({
+                    'stage': stage,
+                    'batch_size': int(batch_size),
+                    'metric': metric,
+                    'baseline': previous[metric],
+                    'current': timing[metric],
+                    'change': round(change, 4),
+                })
+
+    return sorted(regressions, key=lambda regression: regression['change'], reverse=True)
+
+
+def print_summary(report: Dict[str, Any]):
+    """Print a p50/p99 table of the results"""
+    batch_sizes = report['metadata']['batch_sizes']
+    print(f"{'stage (p50/p99 ms)':<28}" + "".join(f"{size:>20}" for size in batch_sizes))
+    for stage, sizes in report['results'].items():
+        cells = []
+        for size in batch_sizes:
+            timing = sizes.get(str(size))
+            cells.append(f"{timing['p50_ms']:.3f}/{timing['p99_ms']:.3f}" if timing else '-')
+        print(f"{stage:<28}" + "".join(f"{cell:>20}" for cell in cells))
+
+    for regression in report.get('regressions', []):
+        print(f"REGRESSION {regression['stage']} @ {regression['batch_size']}: "
+              f"{regression['baseline']:.3f} -> {regression['current']:.3f} ms ({regression['change']:+.1%})")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the fraud detection inference stages")
+    parser.add_argument('--model-path', default='./models/', help="Model registry or directory to load")
+    parser.add_argument('--batch-sizes', default=','.join(map(str, DEFAULT_BATCH_SIZES)),
+                        help="Comma-separated batch sizes")
+    parser.add_argument('--repeats', type=int, default=50, help="Timed calls per stage and batch size")
+    parser.add_argument('--max-seconds', type=float, default=2.0, help="Time budget per stage and batch size")
+    parser.add_argument('--train-samples', type=int, default=5000, help="Training size if no models are found")
+    parser.add_argument('--cascade', action='store_true', help="Benchmark with the model cascade enabled")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic readings")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--baseline', help="Earlier JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Relative slowdown flagged as a regression")
+    parser.add_argument('--metric', default='p50_ms', choices=('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'),
+                        help="Latency statistic compared with the baseline")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on regressions")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    detector = load_detector(args.model_path, args.train_samples)
+    if args.cascade:
+        detector.configure_cascade(True)
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',') if size]
+    report = run_benchmark(detector, batch_sizes, args.repeats, args.max_seconds, args.seed)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['baseline'] = {'path': args.baseline, 'timestamp': baseline.get('metadata', {}).get('timestamp'),
+                              'threshold': args.threshold, 'metric': args.metric}
+        report['regressions'] = compare_results(report, baseline, args.threshold, args.metric)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, allow_nan=False)
+        logger.info(f"Wrote benchmark report to {args.output}")
+
+    print_summary(report)
+    return 1 if args.fail_on_regression and report.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
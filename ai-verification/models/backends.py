@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Lazy ML Backend Registry
+Heavy frameworks (TensorFlow, XGBoost, scikit-learn, pandas, joblib, pyarrow) are imported on
+first use instead of at module load, so the verification service can start serving
+from the framework-free runtimes before any of them are needed
+"""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackendRegistry:
+    """Registry of optional ML frameworks imported on demand"""
+
+    def __init__(self):
+        self._packages: Dict[str, str] = {}
+        self._import_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, package: str):
+        """
+        Register a backend
+
+        Args:
+            name: Backend name used by callers
+            package: Top-level importable package
+        """
+        self._packages[name] = package
+
+    def get(self, name: str, submodule: Optional[str] = None) -> Any:
+        """
+        Import (once) and return a backend package or one of its submodules
+
+        Args:
+            name: Registered backend name
+            submodule: Optional dotted submodule path, e.g. 'ensemble' for sklearn.ensemble
+        """
+        package = self._packages[name]
+
+        if package not in sys.modules:
+            with self._lock:
+                if package not in sys.modules:
+                    logger.info(f"Importing {name} backend...")
+                    start_time = time.perf_counter()
+                    importlib.import_module(package)
+                    self._import_seconds[name] = time.perf_counter() - start_time
+                    logger.info(f"{name} backend imported in {self._import_seconds[name]:.2f}s")
+
+        if submodule:
+            return importlib.import_module(f"{package}.{submodule}")
+        return sys.modules[package]
+
+    def loaded(self, name: str) -> Optional[Any]:
+        """Return the backend package if it has already been imported, without importing it"""
+        return sys.modules.get(self._packages[name])
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Import state and version of every registered backend"""
+        status = {}
+        for name in self._packages:
+            module = self.loaded(name)
+            status[name] = {
+                'loaded': module is not None,
+                'version': getattr(module, '__version__', None) if module is not None else None,
+                'import_seconds': round(self._import_seconds[name], 3) if name in self._import_seconds else None,
+            }
+        return status
+
+
+BACKENDS = BackendRegistry()
+BACKENDS.register('tensorflow', 'tensorflow')
+BACKENDS.register('xgboost', 'xgboost')
+BACKENDS.register('sklearn', 'sklearn')
+BACKENDS.register('pandas', 'pandas')
+BACKENDS.register('joblib', 'joblib')
+BACKENDS.register('pyarrow', 'pyarrow')
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Ensemble Distillation into a Compact Student
+Fits a shallow gradient boosted regressor with a capped tree count to the weighted
+ensemble_score of the RandomForest, XGBoost and neural network, compiles it into the
+framework-free tree evaluator and reports its fidelity to the ensemble together with
+the latency and memory saved. A detector serves the student in place of the
+supervised ensemble with configure_serving_mode('student'); the isolation forest
+still scores every reading for the anomaly flags
+
+Usage (from the ai-verification directory):
+    python -m models.distillation --model-path ./models/ --activate
+"""
+
+import argparse
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from models.backends import BACKENDS
+from models.fraud_detection import CarbonFraudDetector
+from models.model_registry import ModelRegistry, write_version_metadata
+from models.tree_compiler import CompiledTreeEnsemble, compile_gradient_boosting, max_deviation
+
+logger = logging.getLogger(__name__)
+
+# Hard cap on student size, whatever the requested parameters
+MAX_STUDENT_TREES = 100
+MAX_STUDENT_DEPTH = 4
+
+DEFAULT_STUDENT_PARAMS = {
+    'n_estimators': 60,
+    'max_depth': 3,
+    'learning_rate': 0.15,
+    'subsample': 0.8,
+    'random_state': 42,
+}
+
+# Transfer rows inside the decision band (plus this margin) are weighted up, since
+# errors there change the prediction category
+DECISION_BAND_MARGIN = 0.1
+DECISION_BAND_WEIGHT = 4.0
+
+
+def distill_student(detector: CarbonFraudDetector, X: np.ndarray = None, y: np.ndarray = None,
+                    num_samples: int = 20000, params: Dict[str, Any] = None,
+                    holdout_fraction: float = 0.2) -> Dict[str, Any]:
+    """
+    Train a student on the detector's ensemble score and install it on the detector
+
+    Args:
+        detector: Trained detector (the teacher)
+        X: Unscaled transfer feature matrix (synthetic data if omitted)
+        y: Optional labels (1 = legitimate) for label accuracy in the report
+        num_samples: Synthetic transfer rows generated when X is omitted
+        params: GradientBoostingRegressor parameters overriding DEFAULT_STUDENT_PARAMS
+        holdout_fraction: Share of the transfer set held out for the fidelity report
+
+    Returns:
+        Distillation report (also stored in the student's metadata)
+    """
+    if X is None:
+        X, y = detector.generate_training_data(num_samples, seed=11)
+
+    sklearn_ensemble = BACKENDS.get('sklearn', 'ensemble')
+    sklearn_model_selection = BACKENDS.get('sklearn', 'model_selection')
+
+    params = {**DEFAULT_STUDENT_PARAMS, **(params or {})}
+    params['n_estimators'] = min(params['n_estimators'], MAX_STUDENT_TREES)
+    params['max_depth'] = min(params['max_depth'], MAX_STUDENT_DEPTH)
+
+    # The student learns the ensemble score, not the labels
+    teacher_scores = detector.ensemble_scores(X)
+    split = sklearn_model_selection.train_test_split(
+        *((X, teacher_scores) if y is None else (X, teacher_scores, y)),
+        test_size=holdout_fraction, random_state=42
+    )
+    X_train, X_test, scores_train, scores_test = split[:4]
+    y_test = split[5] if y is not None else None
+
+    low, high = detector.thresholds['low_confidence'], detector.thresholds['high_confidence']
+    in_band = (scores_train > low - DECISION_BAND_MARGIN) & (scores_train < high + DECISION_BAND_MARGIN)
+    sample_weight = np.where(in_band, DECISION_BAND_WEIGHT, 1.0)
+
+    logger.info(f"Distilling a {params['n_estimators']}-tree, depth {params['max_depth']} student "
+                f"on {X_train.shape[0]} transfer rows")
+    start_time = time.perf_counter()
+    model = sklearn_ensemble.GradientBoostingRegressor(loss='squared_error', **params)
+    model.fit(X_train, scores_train, sample_weight=sample_weight)
+    training_seconds = time.perf_counter() - start_time
+
+    student = compile_gradient_boosting(model)
+    deviation = max_deviation(student, np.clip(model.predict(X_test), 0.0, 1.0), X_test)
+    if deviation > detector.compiled_tolerance:
+        raise RuntimeError(f"Compiled student deviates from the fitted model by {deviation:.2e}")
+
+    report = evaluate_student(detector, student, X_test, y_test)
+    report.update({
+        'params': params,
+        'transfer_rows': int(X_train.shape[0]),
+        'training_seconds': round(training_seconds, 2),
+        'teacher_version': detector.model_version,
+        'distilled_at': datetime.utcnow().isoformat(),
+    })
+    student.metadata['distillation'] = report
+    detector.set_student(student)
+
+    fidelity = report['fidelity']
+    logger.info(f"Student fidelity: MAE {fidelity['mean_abs_error']:.4f}, "
+                f"{fidelity['prediction_agreement']:.2%} prediction agreement; "
+                f"{report['memory']['reduction']:.1f}x smaller, "
+                f"{report['latency']['speedup']['batch_1000']:.1f}x faster at 1000 rows")
+    return report
+
+
+def evaluate_student(detector: CarbonFraudDetector, student: CompiledTreeEnsemble, X: np.ndarray,
+                     y: Optional[np.ndarray] = None, batch_sizes: Sequence[int] = (1, 100, 1000),
+                     repeats: int = 20) -> Dict[str, Any]:
+    """
+    Compare a student against the detector's ensemble on held-out rows
+
+    Returns:
+        Report with score fidelity and prediction agreement, label accuracy when y is
+        given, scoring latency and runtime parameter memory of both
+    """
+    teacher_scores = detector.ensemble_scores(X)
+    student_scores = student.predict(X)
+    errors = np.abs(student_scores - teacher_scores)
+
+    teacher_predictions = detector._prediction_categories(teacher_scores)
+    student_predictions = detector._prediction_categories(student_scores)
+    categories = ('legitimate', 'suspicious', 'fraudulent')
+
+    residual = np.sum((student_scores - teacher_scores) ** 2)
+    total = np.sum((teacher_scores - teacher_scores.mean()) ** 2)
+    report: Dict[str, Any] = {
+        'holdout_rows': int(X.shape[0]),
+        'fidelity': {
+            'mean_abs_error': float(errors.mean()),
+            'max_abs_error': float(errors.max(initial=0.0)),
+            'p99_abs_error': float(np.percentile(errors, 99)),
+            'r2': float(1.0 - residual / total) if total > 0 else 1.0,
+            'prediction_agreement': float((student_predictions == teacher_predictions).mean()),
+            # Teacher category -> student category counts
+            'confusion': {
+                teacher: {
+                    student_category: int(((teacher_predictions == teacher)
+                                           & (student_predictions == student_category)).sum())
+                    for student_category in categories
+                }
+                for teacher in categories
+            },
+        },
+    }
+
+    if y is not None:
+        report['label_accuracy'] = {
+            'ensemble': float(((teacher_scores > 0.5) == (y == 1)).mean()),
+            'student': float(((student_scores > 0.5) == (y == 1)).mean()),
+        }
+
+    teacher_runtimes = [name for name in detector.ensemble_weights if detector._model_available(name)]
+    teacher_latency, student_latency, speedup = {}, {}, {}
+    for batch_size in batch_sizes:
+        rows = np.resize(X, (batch_size, X.shape[1]))
+        key = f"batch_{batch_size}"
+        teacher_latency[key] = _median_ms(lambda: detector.ensemble_scores(rows), repeats)
+        student_latency[key] = _median_ms(lambda: student.predict(rows), repeats)
+        speedup[key] = round(teacher_latency[key] / max(student_latency[key], 1e-6), 2)
+    report['latency'] = {'ensemble_ms': teacher_latency, 'student_ms': student_latency, 'speedup': speedup}
+
+    teacher_bytes = sum(_runtime_bytes(detector.serving_models[name])
+                        for name in teacher_runtimes if name in detector.serving_models)
+    student_bytes = _runtime_bytes(student)
+    report['memory'] = {
+        'ensemble_bytes': int(teacher_bytes),
+        'student_bytes': int(student_bytes),
+        'reduction': round(teacher_bytes / max(student_bytes, 1), 2),
+        'student_trees': student.num_trees,
+        'student_nodes': student.num_nodes,
+    }
+    return report
+
+
+def _median_ms(fn, repeats: int) -> float:
+    fn()  # Warm-up
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start_time) * 1000)
+    return round(float(np.median(timings)), 4)
+
+
+def _runtime_bytes(runtime: Any) -> int:
+    """Bytes of the numeric arrays of a serving runtime"""
+    return sum(array.nbytes for array in runtime.to_state()[0].values())
+
+
+def distill_version(model_path: str, activate: bool = False, num_samples: int = 20000,
+                    params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Distill the current registry version and register the result as a new version
+
+    The new version holds the teacher's artifacts plus the student, so it can serve
+    in either mode.
+
+    Returns:
+        New version, the teacher version and the distillation report
+    """
+    registry = ModelRegistry(model_path)
+    teacher_version = registry.current_version()
+    if teacher_version is None:
+        raise RuntimeError(f"No current model version in {model_path}")
+
+    path = registry.version_path(teacher_version)
+    detector = CarbonFraudDetector(model_path=path, cache_size=0)
+    detector.load_models(path)
+    if not detector.is_trained:
+        raise RuntimeError(f"Model version {teacher_version} could not be loaded")
+    detector.model_version = teacher_version
+
+    report = distill_student(detector, num_samples=num_samples, params=params)
+
+    staging_path = registry.create_staging()
+    detector.model_version = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+    detector.save_models(staging_path)
+    write_version_metadata(staging_path, detector, {'distilled_from': teacher_version})
+    version = registry.register(staging_path)
+    if activate:
+        registry.set_current(version)
+
+    return {'model_version': version, 'teacher_version': teacher_version, 'activated': activate,
+            'distillation': report}
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Distill the serving ensemble into a compact student model")
+    parser.add_argument('--model-path', default='./models/', help="Model registry to distill the current version of")
+    parser.add_argument('--samples', type=int, default=20000, help="Synthetic transfer rows")
+    parser.add_argument('--trees', type=int, default=DEFAULT_STUDENT_PARAMS['n_estimators'],
+                        help=f"Student trees (at most {MAX_STUDENT_TREES})")
+    parser.add_argument('--max-depth', type=int, default=DEFAULT_STUDENT_PARAMS['max_depth'],
+                        help=f"Student tree depth (at most {MAX_STUDENT_DEPTH})")
+    parser.add_argument('--activate', action='store_true', help="Point `current` at the new version")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    result = distill_version(args.model_path, args.activate, args.samples,
+                             {'n_estimators': args.trees, 'max_depth': args.max_depth})
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Ensemble Member Training
+Fits each ensemble member from its hyperparameters under an explicit CPU budget.
+Sequential training runs the members in-process one after another; parallel training
+fits them concurrently, each in its own spawned worker process, and returns the same
+models for the same seeds
+"""
+
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from models.backends import BACKENDS
+
+if TYPE_CHECKING:
+    from tensorflow import keras
+
+logger = logging.getLogger(__name__)
+
+# Environment variables honoured by the native thread pools of the ML frameworks
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS')
+
+# Share of the available CPUs given to each member when no budget is specified
+DEFAULT_CPU_SHARES = {'random_forest': 0.35, 'xgboost': 0.35, 'neural_network': 0.2, 'isolation_forest': 0.1}
+
+
+def default_cpu_budget(total_cpus: int = None) -> Dict[str, int]:
+    """Split the available CPUs between the ensemble members (at least one each)"""
+    total_cpus = total_cpus or os.cpu_count() or 1
+    return {name: max(1, int(total_cpus * share)) for name, share in DEFAULT_CPU_SHARES.items()}
+
+
+def build_neural_network(input_dim: int) -> 'keras.Model':
+    """Build neural network for fraud detection"""
+    keras = BACKENDS.get('tensorflow', 'keras')
+    layers = keras.layers
+
+    model = keras.Sequential([
+        layers.Dense(128, activation='relu', input_shape=(input_dim,)),
+        layers.Dropout(0.3),
+        layers.Dense(64, activation='relu'),
+        layers.Dropout(0.2),
+        layers.Dense(32, activation='relu'),
+        layers.Dense(1, activation='sigmoid')
+    ])
+
+    model.compile(
+        optimizer='adam',
+        loss='binary_crossentropy',
+        metrics=['accuracy', 'precision', 'recall']
+    )
+
+    return model
+
+
+def fit_member(name: str, params: Dict[str, Any], X: np.ndarray, y: Optional[np.ndarray] = None,
+               validation_data: Tuple[np.ndarray, np.ndarray] = None, cpu_budget: int = None) -> Any:
+    """
+    Fit one ensemble member
+
+    Args:
+        name: Ensemble member ('random_forest', 'xgboost', 'neural_network', 'isolation_forest')
+        params: Model hyperparameters; the network takes epochs, batch_size and seed
+        X: Training features (scaled for the network and isolation forest)
+        y: Training labels (unused by the isolation forest)
+        validation_data: Optional (X, y) monitored while training the network
+        cpu_budget: Threads the model may use (framework default if None)
+
+    Returns:
+        Fitted model
+    """
+    start_time = time.perf_counter()
+
+    if name == 'random_forest':
+        model = BACKENDS.get('sklearn', 'ensemble').RandomForestClassifier(**params, n_jobs=cpu_budget)
+        model.fit(X, y)
+    elif name == 'xgboost':
+        model = BACKENDS.get('xgboost').XGBClassifier(**params, n_jobs=cpu_budget)
+        model.fit(X, y)
+    elif name == 'isolation_forest':
+        model = BACKENDS.get('sklearn', 'ensemble').IsolationForest(**params, n_jobs=cpu_budget)
+        model.fit(X)
+    elif name == 'neural_network':
+        model = _fit_neural_network(params, X, y, validation_data, cpu_budget)
+    else:
+        raise ValueError(f"Unknown ensemble member: {name}")
+
+    logger.info(f"Trained {name} in {time.perf_counter() - start_time:.1f}s"
+                + (f" ({cpu_budget} CPUs)" if cpu_budget else ""))
+    return model
+
+
+def _fit_neural_network(params: Dict[str, Any], X: np.ndarray, y: np.ndarray,
+                        validation_data: Optional[Tuple[np.ndarray, np.ndarray]], cpu_budget: Optional[int]) -> 'keras.Model':
+    """Fit the network with seeded weight initialisation, dropout and shuffling"""
+    tf = BACKENDS.get('tensorflow')
+
+    if cpu_budget:
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(cpu_budget)
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+        except RuntimeError:
+            # Thread pools can only be sized before TensorFlow initialises
+            logger.debug("TensorFlow already initialised; keeping its thread pools")
+
+    with keras_seed(params['seed']):
+        model = build_neural_network(X.shape[1])
+        model.fit(
+            X, y,
+            epochs=params['epochs'],
+            batch_size=params['batch_size'],
+            validation_data=validation_data,
+            verbose=0
+        )
+
+    return model
+
+
+@contextmanager
+def keras_seed(seed: int):
+    """Seed Keras weight initialisation, dropout and shuffling"""
+    keras = BACKENDS.get('tensorflow', 'keras')
+
+    # Keras seeds Python, NumPy and TensorFlow globally; keep the caller's global RNG state
+    python_state, numpy_state = random.getstate(), np.random.get_state()
+    try:
+        keras.utils.set_random_seed(seed)
+        yield
+    finally:
+        random.setstate(python_state)
+        np.random.set_state(numpy_state)
+
+
+def _limit_threads(cpu_budget: int):
+    """Worker initializer: cap native thread pools before any framework is imported"""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(cpu_budget)
+
+
+def _fit_in_worker(name: str, params: Dict[str, Any], X: np.ndarray, y: Optional[np.ndarray],
+                   validation_data: Optional[Tuple[np.ndarray, np.ndarray]], cpu_budget: int) -> Any:
+    """Fit a member in a worker process and return a picklable result"""
+    logging.basicConfig(level=logging.INFO)
+    model = fit_member(name, params, X, y, validation_data, cpu_budget)
+    if name == 'neural_network':
+        return {'input_dim': X.shape[1], 'weights': model.get_weights()}
+    return model
+
+
+def _restore_member(name: str, result: Any) -> Any:
+    """Rebuild a member returned by a worker process"""
+    if name == 'neural_network':
+        model = build_neural_network(result['input_dim'])
+        model.set_weights(result['weights'])
+        return model
+    return result
+
+
+def train_members_parallel(tasks: Dict[str, Dict[str, Any]], cpu_budget: Dict[str, int] = None) -> Dict[str, Any]:
+    """
+    Fit ensemble members concurrently, one spawned worker process per member
+
+    Args:
+        tasks: Keyword arguments of fit_member (params, X, y, validation_data) per member
+        cpu_budget: Threads granted to each member (see default_cpu_budget)
+
+    Returns:
+        Fitted models by member name
+    """
+    cpu_budget = {**default_cpu_budget(), **(cpu_budget or {})}
+
+    # Spawned workers do not inherit framework state (TensorFlow is not fork-safe)
+    context = get_context('spawn')
+    executors, futures = [], {}
+    try:
+        for name, task in tasks.items():
+            executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=context, initializer=_limit_threads, initargs=(cpu_budget[name],)
+            )
+            executors.append(executor)
+            futures[name] = executor.submit(
+                _fit_in_worker, name, task['params'], task['X'], task.get('y'),
+                task.get('validation_data'), cpu_budget[name]
+            )
+
+        logger.info(f"Training {len(futures)} models in parallel with CPU budget {cpu_budget}")
+        return {name: _restore_member(name, future.result()) for name, future in futures.items()}
+
+    finally:
+        for executor in executors:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Feature Schema for Carbon Credit Fraud Detection
+Single source of truth for feature column positions, dtypes and defaults
+Training, inference, scaling and importance reporting all index feature matrices by
+the column constants defined here, and the schema is persisted with model artifacts
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Fixed column indices of the feature matrix
+(
+    CO2_PPM, TEMPERATURE, HUMIDITY, PRESSURE,
+    BATTERY_LEVEL, SIGNAL_STRENGTH, ERROR_RATE, TOTAL_READINGS,
+    ACCURACY_SCORE, CONFIDENCE_INTERVAL, ANOMALY_SCORE,
+    HOUR_OF_DAY, DAY_OF_WEEK, DAY_OF_MONTH, MONTH_OF_YEAR,
+    LATITUDE, LONGITUDE, ALTITUDE,
+    CO2_DEVIATION, TEMP_HUMIDITY_RATIO, PRESSURE_ALTITUDE_CONSISTENCY, SENSOR_RELIABILITY,
+    HAS_DATA_HASH, DATA_COMPLETENESS, READING_FREQUENCY,
+) = range(25)
+
+
+class FeatureSchemaMismatchError(ValueError):
+    """Raised when model artifacts were trained against a different feature schema"""
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """Definition of a single feature column"""
+    name: str
+    index: int
+    dtype: str  # Logical type: 'float', 'int' or 'bool'
+    default: float  # Value used when a reading cannot be parsed
+
+
+class FeatureSchema:
+    """Ordered, versioned set of feature columns"""
+
+    def __init__(self, version: str, features: Tuple[FeatureSpec, ...]):
+        """
+        Initialize feature schema
+
+        Args:
+            version: Schema version persisted with trained models
+            features: Feature specifications in column order
+        """
+        for position, spec in enumerate(features):
+            if spec.index != position:
+                raise ValueError(f"Feature '{spec.name}' declared at index {spec.index} but listed at {position}")
+
+        self.version = version
+        self.features = features
+        self.names = tuple(spec.name for spec in features)
+        self.defaults = np.array([spec.default for spec in features], dtype=np.float64)
+        self.defaults.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def default_row(self, dtype: type = np.float64) -> np.ndarray:
+        """Feature row holding the default value of every column"""
+        return self.defaults.astype(dtype)
+
+    def empty_matrix(self, num_rows: int, dtype: type = np.float64) -> np.ndarray:
+        """Preallocate an uninitialized feature matrix"""
+        return np.empty((num_rows, len(self.features)), dtype=dtype)
+
+    def to_dict(self) -> Dict:
+        """Serializable description stored alongside model artifacts"""
+        return {
+            'version': self.version,
+            'features': [
+                {'name': spec.name, 'index': spec.index, 'dtype': spec.dtype, 'default': spec.default}
+                for spec in self.features
+            ]
+        }
+
+    def check_compatible(self, stored: Optional[Dict]):
+        """
+        Verify that stored model artifacts use this schema
+
+        Args:
+            stored: Schema description saved with the artifacts (see to_dict); None for
+                artifacts saved before the schema was persisted, which use LEGACY_SCHEMA
+
+        Raises:
+            FeatureSchemaMismatchError: If the artifacts were built for another column layout
+        """
+        if stored is None:
+            stored = LEGACY_SCHEMA
+        if not stored:
+            raise FeatureSchemaMismatchError(
+                f"Model artifacts have no feature schema; expected version {self.version}"
+            )
+
+        stored_names = tuple(feature['name'] for feature in stored.get('features', []))
+        if stored.get('version') != self.version or stored_names != self.names:
+            raise FeatureSchemaMismatchError(
+                f"Model artifacts use feature schema version {stored.get('version')} "
+                f"({len(stored_names)} features); expected version {self.version} ({len(self.names)} features)"
+            )
+
+
+FEATURE_SCHEMA = FeatureSchema(version='1.0', features=(
+    FeatureSpec('co2_ppm', CO2_PPM, 'float', 400),
+    FeatureSpec('temperature', TEMPERATURE, 'float', 20),
+    FeatureSpec('humidity', HUMIDITY, 'float', 50),
+    FeatureSpec('pressure', PRESSURE, 'float', 1013),
+    FeatureSpec('battery_level', BATTERY_LEVEL, 'float', 100),
+    FeatureSpec('signal_strength', SIGNAL_STRENGTH, 'float', 50),
+    FeatureSpec('error_rate', ERROR_RATE, 'float', 0),
+    FeatureSpec('total_readings', TOTAL_READINGS, 'int', 0),
+    FeatureSpec('accuracy_score', ACCURACY_SCORE, 'float', 0.95),
+    FeatureSpec('confidence_interval', CONFIDENCE_INTERVAL, 'float', 0.05),
+    FeatureSpec('anomaly_score', ANOMALY_SCORE, 'float', 0.02),
+    FeatureSpec('hour_of_day', HOUR_OF_DAY, 'int', 12),
+    FeatureSpec('day_of_week', DAY_OF_WEEK, 'int', 0),
+    FeatureSpec('day_of_month', DAY_OF_MONTH, 'int', 1),
+    FeatureSpec('month_of_year', MONTH_OF_YEAR, 'int', 1),
+    FeatureSpec('latitude', LATITUDE, 'float', 0),
+    FeatureSpec('longitude', LONGITUDE, 'float', 0),
+    FeatureSpec('altitude', ALTITUDE, 'float', 0),
+    FeatureSpec('co2_deviation', CO2_DEVIATION, 'float', 0),
+    FeatureSpec('temp_humidity_ratio', TEMP_HUMIDITY_RATIO, 'float', 0.4),
+    FeatureSpec('pressure_altitude_consistency', PRESSURE_ALTITUDE_CONSISTENCY, 'float', 1),
+    FeatureSpec('sensor_reliability', SENSOR_RELIABILITY, 'float', 1),
+    FeatureSpec('has_data_hash', HAS_DATA_HASH, 'bool', 1),
+    FeatureSpec('data_completeness', DATA_COMPLETENESS, 'float', 1),
+    FeatureSpec('reading_frequency', READING_FREQUENCY, 'float', 1),
+))
+
+# Artifacts saved before the schema was persisted carry no description; they were
+# built with the original column order, which schema version 1.0 keeps exactly
+LEGACY_SCHEMA = {
+    'version': '1.0',
+    'features': [{'name': name} for name in (
+        'co2_ppm', 'temperature', 'humidity', 'pressure',
+        'battery_level', 'signal_strength', 'error_rate', 'total_readings',
+        'accuracy_score', 'confidence_interval', 'anomaly_score',
+        'hour_of_day', 'day_of_week', 'day_of_month', 'month_of_year',
+        'latitude', 'longitude', 'altitude',
+        'co2_deviation', 'temp_humidity_ratio', 'pressure_altitude_consistency', 'sensor_reliability',
+        'has_data_hash', 'data_completeness', 'reading_frequency',
+    )],
+}
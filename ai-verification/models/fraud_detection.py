@@ -5,22 +5,41 @@ Implements XGBoost, Random Forest, and Neural Network models for detecting fraud
 Based on research findings showing 90% accuracy improvements in carbon verification
 """
 
+import copy
 import numpy as np
-import pandas as pd
+import os
 import pickle
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+import threading
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, Any, Union
 from datetime import datetime
-from dataclasses import dataclass
-from sklearn.ensemble import RandomForestClassifier, IsolationForest
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report
-import xgboost as xgb
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras import layers
-import joblib
+from dataclasses import dataclass, replace
+
+from models.backends import BACKENDS
+from models.ensemble_training import build_neural_network, fit_member, train_members_parallel
+from models.feature_extraction import FeatureExtractor
+from models.model_bundle import BUNDLE_FILENAME, read_bundle, write_bundle
+from models.model_names import MODEL_BACKENDS, SERVING_MODES, STUDENT_MODEL, TREE_MODELS
+from models.numpy_network import NumpyDenseNetwork
+from models.result_cache import ResultCache, feature_digest
+from models.stage_timing import StageClock, StageLatencyRecorder
+from models.streaming_training import ShardedDataset, StreamingTrainer
+from models.synthetic_data import SyntheticDataGenerator
+from models.timestamps import Clock
+from models.tree_compiler import (
+    CompiledTreeEnsemble, compile_random_forest, compile_xgboost, compile_isolation_forest, max_deviation
+)
+from models.feature_schema import (
+    FEATURE_SCHEMA, FeatureSchemaMismatchError,
+    CO2_PPM, ERROR_RATE, ACCURACY_SCORE, CO2_DEVIATION,
+    PRESSURE_ALTITUDE_CONSISTENCY, SENSOR_RELIABILITY, HAS_DATA_HASH, DATA_COMPLETENESS,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from tensorflow import keras
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -36,22 +55,47 @@ class VerificationResult:
     model_outputs: Dict[str, float]  # Individual model scores
     risk_factors: Dict[str, float]  # Identified risk factors
     timestamp: str
+    model_version: Optional[str] = None  # Trained model set that produced the result
+    
+    def copy(self, timestamp: Optional[str] = None) -> 'VerificationResult':
+        """Copy with its own flag list and score dicts, optionally re-timestamped"""
+        return replace(
+            self,
+            anomaly_flags=list(self.anomaly_flags),
+            model_outputs=dict(self.model_outputs),
+            risk_factors=dict(self.risk_factors),
+            timestamp=self.timestamp if timestamp is None else timestamp,
+        )
 
 class CarbonFraudDetector:
     """AI-powered fraud detection system for carbon credits"""
     
-    def __init__(self, model_path: str = './models/'):
+    def __init__(self, model_path: str = './models/', cache_size: int = 10000, cache_ttl: float = 300.0,
+                 clock: Clock = None):
         """
         Initialize fraud detection system
         
         Args:
             model_path: Directory path for saving/loading trained models
+            cache_size: Maximum number of cached verification results (0 disables the cache)
+            cache_ttl: Seconds a cached verification result stays valid
+            clock: Current UTC time used for feature extraction (default: system clock);
+                a fixed clock makes rescoring historical readings deterministic
         """
         self.model_path = model_path
         self.models = {}
+        self.serving_models = {}  # Framework-free runtimes used for inference
         self.scalers = {}
+        
+        # Framework artifacts deserialized on first use, and models loading in the background
+        self._deferred_loaders = {}
+        self._loading_models = set()
+        self._model_errors = {}
+        self._background_loads = []
+        self._load_lock = threading.RLock()
         self.encoders = {}
         self.is_trained = False
+        self.model_version = None  # Identifies the trained model set in every response
         
         # Model hyperparameters
         self.rf_params = {
@@ -71,6 +115,18 @@ class CarbonFraudDetector:
             'random_state': 42
         }
         
+        self.nn_params = {
+            'epochs': 50,
+            'batch_size': 32,
+            'seed': 42
+        }
+        
+        self.iforest_params = {
+            'contamination': 0.1,
+            'random_state': 42,
+            'n_estimators': 100
+        }
+        
         # Anomaly detection thresholds
         self.thresholds = {
             'high_confidence': 0.90,  # Auto-approve above 90%
@@ -78,8 +134,40 @@ class CarbonFraudDetector:
             'anomaly_threshold': -0.5  # Isolation Forest threshold
         }
         
-        # Feature importance tracking
+        # Maximum score deviation accepted from a compiled tree ensemble
+        self.compiled_tolerance = 1e-5
+        
+        # Ensemble weights for the supervised models
+        self.ensemble_weights = {'random_forest': 0.3, 'xgboost': 0.4, 'neural_network': 0.3}
+        
+        # Early-exit cascade: score with the cheapest model first and skip the rest of the
+        # ensemble when it lands at least cascade_margin outside the decision band
+        self.cascade_enabled = False
+        self.cascade_model = 'neural_network'
+        self.cascade_margin = 0.05
+        self.cascade_counters = {'evaluated': 0, 'exit_legitimate': 0, 'exit_fraudulent': 0, 'escalated': 0}
+        self._cascade_lock = threading.Lock()
+        
+        # 'student' replaces the supervised ensemble with the distilled student when one is loaded
+        self.serving_mode = 'ensemble'
+        
+        # Feature importance tracking and hold-out metrics of the last training run
         self.feature_importance = {}
+        self.evaluation_metrics = {}
+        
+        # Feature column layout and columnar extraction shared by training and inference
+        self.feature_schema = FEATURE_SCHEMA
+        self.feature_extractor = FeatureExtractor(self.feature_schema, clock=clock)
+        
+        # Floating point type of served feature matrices and runtimes (see configure_precision)
+        self.inference_dtype = np.dtype(np.float64)
+        self._reduced_runtimes = {}
+        
+        # Results of recently verified readings, dropped whenever the models change
+        self.result_cache = ResultCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        
+        # Rolling latency histograms of the verification stages
+        self.stage_latency = StageLatencyRecorder()
         
     def create_features(self, sensor_data: Dict) -> Dict[str, float]:
         """
@@ -91,243 +179,126 @@ class CarbonFraudDetector:
         Returns:
             Dictionary of engineered features
         """
-        try:
-            measurements = sensor_data.get('measurements', {})
-            sensor_status = sensor_data.get('sensor_status', {})
-            data_quality = sensor_data.get('data_quality', {})
-            
-            # Basic sensor readings
-            features = {
-                'co2_ppm': measurements.get('co2_ppm', 400),
-                'temperature': measurements.get('temperature', 20),
-                'humidity': measurements.get('humidity', 50),
-                'pressure': measurements.get('pressure', 1013),
-            }
-            
-            # Sensor health indicators
-            features.update({
-                'battery_level': sensor_status.get('battery_level', 100),
-                'signal_strength': abs(sensor_status.get('signal_strength', -50)),
-                'error_rate': sensor_status.get('error_rate', 0),
-                'total_readings': sensor_status.get('total_readings', 0),
-            })
-            
-            # Data quality metrics
-            features.update({
-                'accuracy_score': data_quality.get('accuracy_score', 0.95),
-                'confidence_interval': data_quality.get('confidence_interval', 0.05),
-                'anomaly_score': data_quality.get('anomaly_score', 0.02),
-            })
-            
-            # Temporal features
-            timestamp = datetime.fromisoformat(sensor_data.get('timestamp', datetime.utcnow().isoformat().replace('+00:00', '')))
-            features.update({
-                'hour_of_day': timestamp.hour,
-                'day_of_week': timestamp.weekday(),
-                'day_of_month': timestamp.day,
-                'month_of_year': timestamp.month,
-            })
-            
-            # Location-based features (if available)
-            location = sensor_data.get('location', {})
-            features.update({
-                'latitude': location.get('lat', 0),
-                'longitude': location.get('lon', 0),
-                'altitude': location.get('altitude', 0),
-            })
-            
-            # Derived features for anomaly detection
-            features.update({
-                'co2_deviation': abs(features['co2_ppm'] - 400),  # Deviation from normal atmospheric CO2
-                'temp_humidity_ratio': features['temperature'] / max(features['humidity'], 1),
-                'pressure_altitude_consistency': self._check_pressure_altitude_consistency(features['pressure'], features['altitude']),
-                'sensor_reliability': (features['battery_level'] / 100) * (1 - features['error_rate']),
-            })
-            
-            # Data integrity features
-            features.update({
-                'has_data_hash': 1 if sensor_data.get('data_hash') else 0,
-                'data_completeness': len([v for v in features.values() if v != 0]) / len(features),
-                'reading_frequency': min(features['total_readings'] / max(1, (datetime.utcnow() - timestamp).days), 100),
-            })
-            
-            return features
+        return dict(zip(self.feature_schema.names, self.feature_extractor.transform([sensor_data])[0].tolist()))
+    
+    def create_feature_matrix(self, sensor_data: Union[List[Dict], 'pd.DataFrame'],
+                              now: Union[datetime, str] = None) -> np.ndarray:
+        """
+        Create the feature matrix for a batch of sensor readings
+        
+        Args:
+            sensor_data: List of raw sensor data dictionaries or a DataFrame of flattened payloads
+            now: Optional reference time overriding the detector's clock
             
-        except Exception as e:
-            logger.error(f"Error creating features: {e}")
-            return self._get_default_features()
-    
-    def _check_pressure_altitude_consistency(self, pressure: float, altitude: float) -> float:
-        """Check consistency between pressure and altitude readings"""
-        # Standard atmospheric pressure formula
-        expected_pressure = 1013.25 * (1 - 0.0065 * altitude / 288.15) ** 5.257
-        deviation = abs(pressure - expected_pressure) / expected_pressure
-        return 1 - min(deviation, 1)  # Return consistency score (0-1)
-    
-    def _get_default_features(self) -> Dict[str, float]:
-        """Get default feature values for error cases"""
-        return {
-            'co2_ppm': 400, 'temperature': 20, 'humidity': 50, 'pressure': 1013,
-            'battery_level': 100, 'signal_strength': 50, 'error_rate': 0, 'total_readings': 0,
-            'accuracy_score': 0.95, 'confidence_interval': 0.05, 'anomaly_score': 0.02,
-            'hour_of_day': 12, 'day_of_week': 0, 'day_of_month': 1, 'month_of_year': 1,
-            'latitude': 0, 'longitude': 0, 'altitude': 0,
-            'co2_deviation': 0, 'temp_humidity_ratio': 0.4, 'pressure_altitude_consistency': 1,
-            'sensor_reliability': 1, 'has_data_hash': 1, 'data_completeness': 1, 'reading_frequency': 1
-        }
+        Returns:
+            Feature matrix with one row per reading
+        """
+        return self.feature_extractor.transform(sensor_data, now=now)
     
-    def generate_training_data(self, num_samples: int = 10000) -> Tuple[np.ndarray, np.ndarray]:
+    def generate_training_data(self, num_samples: int = 10000, seed: int = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Generate synthetic training data for model development
         In production, this would use real historical data
-        """
-        logger.info(f"Generating {num_samples} training samples...")
         
-        # Generate legitimate samples (80%)
-        legitimate_samples = int(num_samples * 0.8)
-        fraudulent_samples = num_samples - legitimate_samples
-        
-        data = []
-        labels = []
-        
-        # Generate legitimate data
-        for _ in range(legitimate_samples):
-            sample = self._generate_legitimate_sample()
-            data.append(list(sample.values()))
-            labels.append(1)  # 1 = legitimate
-        
-        # Generate fraudulent data
-        for _ in range(fraudulent_samples):
-            sample = self._generate_fraudulent_sample()
-            data.append(list(sample.values()))
-            labels.append(0)  # 0 = fraudulent
-        
-        return np.array(data), np.array(labels)
+        Args:
+            num_samples: Number of rows (80% legitimate, then 20% fraudulent)
+            seed: Seed for reproducible data (fresh entropy if omitted)
+            
+        Returns:
+            Tuple of (feature matrix, labels) with 1 = legitimate and 0 = fraudulent
+        """
+        return SyntheticDataGenerator(seed, schema=self.feature_schema).generate(num_samples)
     
-    def _generate_legitimate_sample(self) -> Dict[str, float]:
-        """Generate realistic legitimate sensor data"""
-        # Base legitimate readings with realistic variations
-        co2_base = np.random.normal(420, 50)  # Slightly elevated CO2 with variation
-        temp = np.random.normal(22, 5)
-        humidity = np.random.normal(50, 15)
-        pressure = np.random.normal(1013, 10)
+    def train_models(self, X: np.ndarray = None, y: np.ndarray = None, parallel: bool = False,
+                     cpu_budget: Dict[str, int] = None):
+        """
+        Train all fraud detection models
         
-        return {
-            'co2_ppm': max(300, min(600, co2_base)),
-            'temperature': max(0, min(50, temp)),
-            'humidity': max(20, min(90, humidity)),
-            'pressure': max(900, min(1100, pressure)),
-            'battery_level': np.random.normal(90, 10),
-            'signal_strength': np.random.normal(60, 15),
-            'error_rate': np.random.exponential(0.02),  # Low error rate
-            'total_readings': np.random.randint(100, 10000),
-            'accuracy_score': np.random.normal(0.95, 0.03),
-            'confidence_interval': np.random.normal(0.05, 0.02),
-            'anomaly_score': np.random.exponential(0.05),
-            'hour_of_day': np.random.randint(0, 24),
-            'day_of_week': np.random.randint(0, 7),
-            'day_of_month': np.random.randint(1, 32),
-            'month_of_year': np.random.randint(1, 13),
-            'latitude': np.random.uniform(-90, 90),
-            'longitude': np.random.uniform(-180, 180),
-            'altitude': np.random.exponential(100),
-            'co2_deviation': abs(co2_base - 400),
-            'temp_humidity_ratio': temp / max(humidity, 1),
-            'pressure_altitude_consistency': np.random.normal(0.9, 0.1),
-            'sensor_reliability': np.random.normal(0.9, 0.1),
-            'has_data_hash': 1,
-            'data_completeness': np.random.normal(0.95, 0.05),
-            'reading_frequency': np.random.exponential(10)
-        }
-    
-    def _generate_fraudulent_sample(self) -> Dict[str, float]:
-        """Generate fraudulent sensor data with suspicious patterns"""
-        fraud_type = np.random.choice(['extreme_values', 'inconsistent_data', 'poor_quality', 'fake_sensor'])
-        
-        if fraud_type == 'extreme_values':
-            # Impossible or extreme CO2 values
-            co2_base = np.random.choice([np.random.uniform(50, 200),  # Too low
-                                       np.random.uniform(2000, 5000)])  # Too high
-        elif fraud_type == 'inconsistent_data':
-            # Inconsistent environmental readings
-            co2_base = np.random.normal(420, 50)
-        elif fraud_type == 'poor_quality':
-            # Poor sensor quality indicators
-            co2_base = np.random.normal(420, 100)  # High variance
-        else:  # fake_sensor
-            # Fake sensor with perfect readings (suspicious)
-            co2_base = 400  # Exactly atmospheric
-        
-        # Generate suspicious features
-        features = self._generate_legitimate_sample()  # Start with base
-        
-        # Apply fraud patterns
-        if fraud_type == 'extreme_values':
-            features['co2_ppm'] = co2_base
-            features['co2_deviation'] = abs(co2_base - 400)
-        elif fraud_type == 'inconsistent_data':
-            features['pressure_altitude_consistency'] = np.random.uniform(0, 0.5)
-            features['temp_humidity_ratio'] = np.random.uniform(0, 0.1)  # Unrealistic
-        elif fraud_type == 'poor_quality':
-            features['accuracy_score'] = np.random.uniform(0.3, 0.7)
-            features['error_rate'] = np.random.uniform(0.1, 0.5)
-            features['anomaly_score'] = np.random.uniform(0.2, 0.8)
-            features['sensor_reliability'] = np.random.uniform(0.2, 0.6)
-        else:  # fake_sensor
-            features['co2_ppm'] = co2_base
-            features['temperature'] = 20.0  # Too perfect
-            features['humidity'] = 50.0
-            features['accuracy_score'] = 1.0  # Suspiciously perfect
-            features['anomaly_score'] = 0.0
-            features['has_data_hash'] = 0  # Missing integrity check
-        
-        return features
-    
-    def train_models(self, X: np.ndarray = None, y: np.ndarray = None):
-        """Train all fraud detection models"""
+        Args:
+            X: Unscaled feature matrix (synthetic data if omitted)
+            y: Labels (1 = legitimate, 0 = fraudulent)
+            parallel: Fit the ensemble members concurrently in separate worker processes
+            cpu_budget: Threads granted to each member, e.g. {'random_forest': 4}; parallel
+                training splits the available CPUs between members when omitted
+        """
         logger.info("Training fraud detection models...")
         
         # Generate training data if not provided
         if X is None or y is None:
             X, y = self.generate_training_data(10000)
         
+        sklearn_model_selection = BACKENDS.get('sklearn', 'model_selection')
+        sklearn_preprocessing = BACKENDS.get('sklearn', 'preprocessing')
+        
+        # Freshly trained models replace anything loaded from disk
+        with self._load_lock:
+            self._deferred_loaders.clear()
+            self._model_errors.clear()
+        
         # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        X_train, X_test, y_train, y_test = sklearn_model_selection.train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
         
         # Scale features
-        self.scalers['standard'] = StandardScaler()
+        self.scalers['standard'] = sklearn_preprocessing.StandardScaler()
         X_train_scaled = self.scalers['standard'].fit_transform(X_train)
         X_test_scaled = self.scalers['standard'].transform(X_test)
         
-        # Train Random Forest
-        logger.info("Training Random Forest model...")
-        self.models['random_forest'] = RandomForestClassifier(**self.rf_params)
-        self.models['random_forest'].fit(X_train, y_train)
-        
-        # Train XGBoost
-        logger.info("Training XGBoost model...")
-        self.models['xgboost'] = xgb.XGBClassifier(**self.xgb_params)
-        self.models['xgboost'].fit(X_train, y_train)
-        
-        # Train Neural Network
-        logger.info("Training Neural Network model...")
-        self.models['neural_network'] = self._build_neural_network(X_train.shape[1])
-        self.models['neural_network'].fit(
-            X_train_scaled, y_train,
-            epochs=50,
-            batch_size=32,
-            validation_data=(X_test_scaled, y_test),
-            verbose=0
-        )
+        # Tree models take raw features; the network and Isolation Forest take scaled features
+        tasks = {
+            'random_forest': {'params': self.rf_params, 'X': X_train, 'y': y_train},
+            'xgboost': {'params': self.xgb_params, 'X': X_train, 'y': y_train},
+            'neural_network': {'params': self.nn_params, 'X': X_train_scaled, 'y': y_train,
+                               'validation_data': (X_test_scaled, y_test)},
+            'isolation_forest': {'params': self.iforest_params, 'X': X_train_scaled},
+        }
         
-        # Train Isolation Forest for anomaly detection
-        logger.info("Training Isolation Forest for anomaly detection...")
-        self.models['isolation_forest'] = IsolationForest(
-            contamination=0.1,
-            random_state=42,
-            n_estimators=100
+        if parallel:
+            self.models.update(train_members_parallel(tasks, cpu_budget))
+        else:
+            cpu_budget = cpu_budget or {}
+            for name, task in tasks.items():
+                logger.info(f"Training {name} model...")
+                self.models[name] = fit_member(name, cpu_budget=cpu_budget.get(name), **task)
+        
+        self._finish_training(X_test, X_test_scaled, y_test)
+    
+    def train_from_shards(self, directory: str, label_column: str = 'label', chunk_rows: int = 100_000,
+                          sample_size: int = 200_000, holdout_size: int = 50_000, nn_epochs: int = 5):
+        """
+        Train all models out of core from a directory of CSV/Parquet shards
+        
+        Args:
+            directory: Directory of labelled historical reading shards
+            label_column: Label column (1 = legitimate, 0 = fraudulent)
+            chunk_rows: Rows read per chunk
+            sample_size: Reservoir size used for the Random Forest and Isolation Forest
+            holdout_size: Reservoir size of the validation sample
+            nn_epochs: Passes over the shards when training the network
+        """
+        logger.info(f"Training fraud detection models from shards in {directory}...")
+        
+        dataset = ShardedDataset(directory, self.feature_schema, label_column=label_column, chunk_rows=chunk_rows)
+        trainer = StreamingTrainer(
+            dataset, self.rf_params, self.xgb_params, self.nn_params, self.iforest_params,
+            sample_size=sample_size, holdout_size=holdout_size, nn_epochs=nn_epochs
         )
-        self.models['isolation_forest'].fit(X_train_scaled)
+        
+        # Freshly trained models replace anything loaded from disk
+        with self._load_lock:
+            self._deferred_loaders.clear()
+            self._model_errors.clear()
+        
+        models, self.scalers['standard'], (X_test, y_test) = trainer.train()
+        self.models.update(models)
+        
+        self._finish_training(X_test, self.scalers['standard'].transform(X_test), y_test)
+    
+    def _finish_training(self, X_test: np.ndarray, X_test_scaled: np.ndarray, y_test: np.ndarray):
+        """Export, evaluate and publish freshly trained models"""
+        # Export framework-free inference runtimes, validated on the test split
+        self.export_serving_models(X_test)
         
         # Evaluate models
         self._evaluate_models(X_test, X_test_scaled, y_test)
@@ -336,30 +307,126 @@ class CarbonFraudDetector:
         self._extract_feature_importance()
         
         self.is_trained = True
+        self.model_version = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+        self._models_changed()
         logger.info("Model training completed successfully!")
     
-    def _build_neural_network(self, input_dim: int) -> keras.Model:
+    def _build_neural_network(self, input_dim: int) -> 'keras.Model':
         """Build neural network for fraud detection"""
-        model = keras.Sequential([
-            layers.Dense(128, activation='relu', input_shape=(input_dim,)),
-            layers.Dropout(0.3),
-            layers.Dense(64, activation='relu'),
-            layers.Dropout(0.2),
-            layers.Dense(32, activation='relu'),
-            layers.Dense(1, activation='sigmoid')
-        ])
-        
-        model.compile(
-            optimizer='adam',
-            loss='binary_crossentropy',
-            metrics=['accuracy', 'precision', 'recall']
-        )
+        return build_neural_network(input_dim)
+    
+    def export_serving_models(self, X_validation: np.ndarray = None, names: Tuple[str, ...] = None):
+        """
+        Export trained models into framework-free runtimes used for inference
+        
+        Args:
+            X_validation: Optional unscaled feature matrix; compiled tree ensembles whose
+                scores deviate from the original model by more than compiled_tolerance are
+                discarded and inference falls back to the original model
+            names: Models to export (default: every available model)
+        """
+        names = names or tuple(MODEL_BACKENDS)
+        
+        if 'neural_network' in names and 'neural_network' in self.models:
+            self.serving_models['neural_network'] = NumpyDenseNetwork.from_keras(
+                self.models['neural_network'], self._require_scaler()
+            )
+        
+        compilers = {
+            'random_forest': lambda model: compile_random_forest(model),
+            'xgboost': lambda model: compile_xgboost(model),
+            'isolation_forest': lambda model: compile_isolation_forest(model, self._require_scaler()),
+        }
+        for name, compile_model in compilers.items():
+            if name not in names or not self._has_original_model(name):
+                continue
+            
+            compiled = compile_model(self._require_model(name))
+            if X_validation is not None:
+                deviation = max_deviation(compiled, self._predict_original(name, X_validation), X_validation)
+                if deviation > self.compiled_tolerance:
+                    logger.warning(f"Compiled {name} deviates by {deviation:.2e}; serving the original model")
+                    self.serving_models.pop(name, None)
+                    continue
+                logger.info(f"Compiled {name} validated (max deviation {deviation:.2e})")
+            
+            self.serving_models[name] = compiled
+    
+    def _has_original_model(self, name: str) -> bool:
+        """Whether the framework model is loaded or can be loaded on demand"""
+        return name in self.models or name in self._deferred_loaders
+    
+    def _require_model(self, name: str) -> Any:
+        """Return a framework model, deserializing it on first use"""
+        if name not in self.models:
+            with self._load_lock:
+                if name not in self.models:
+                    self.models[name] = self._deferred_loaders.pop(name)()
+        return self.models[name]
+    
+    def _require_scaler(self) -> Any:
+        """Return the fitted StandardScaler, deserializing it on first use"""
+        if 'standard' not in self.scalers:
+            with self._load_lock:
+                if 'standard' not in self.scalers:
+                    self.scalers['standard'] = self._deferred_loaders.pop('scaler')()
+        return self.scalers['standard']
+    
+    def _predict_original(self, name: str, feature_matrix: np.ndarray) -> np.ndarray:
+        """Score unscaled features with the original (framework) model"""
+        model = self._require_model(name)
+        if name == 'isolation_forest':
+            return model.decision_function(self._require_scaler().transform(feature_matrix))
+        if name == 'neural_network':
+            return model.predict(self._require_scaler().transform(feature_matrix), verbose=0)[:, 0]
+        return model.predict_proba(feature_matrix)[:, 1]
+    
+    def model_readiness(self) -> Dict[str, Dict[str, Any]]:
+        """Serving state of every ensemble member"""
+        readiness = {}
+        for name, backend in MODEL_BACKENDS.items():
+            if name in self.serving_models:
+                state, runtime = 'ready', type(self.serving_models[name]).__name__
+            elif self._has_original_model(name):
+                state, runtime = 'ready', backend
+            elif name in self._loading_models:
+                state, runtime = 'loading', None
+            elif name in self._model_errors:
+                state, runtime = 'failed', None
+            else:
+                state, runtime = 'not_loaded', None
+            
+            readiness[name] = {'status': state, 'runtime': runtime}
+            if name in self._model_errors:
+                readiness[name]['error'] = self._model_errors[name]
         
-        return model
+        return readiness
+    
+    def models_ready(self) -> bool:
+        """Whether enough models are available to serve (the network may still be loading)"""
+        return self.is_trained and all(
+            name in self.serving_models or self._has_original_model(name) for name in TREE_MODELS
+        )
+    
+    def wait_for_models(self, timeout: float = None):
+        """Block until background model loading has finished"""
+        for thread in list(self._background_loads):
+            thread.join(timeout)
+    
+    def _models_changed(self):
+        """Discard results computed by the previous set of serving models"""
+        self.result_cache.invalidate()
+    
+    def loaded_model_names(self) -> List[str]:
+        """Names of all models available for inference"""
+        return sorted(set(self.models) | set(self.serving_models))
     
     def _evaluate_models(self, X_test: np.ndarray, X_test_scaled: np.ndarray, y_test: np.ndarray):
         """Evaluate all trained models"""
         logger.info("Evaluating model performance...")
+        metrics = BACKENDS.get('sklearn', 'metrics')
+        accuracy_score, precision_score = metrics.accuracy_score, metrics.precision_score
+        recall_score, f1_score = metrics.recall_score, metrics.f1_score
         
         results = {}
         
@@ -381,8 +448,8 @@ class CarbonFraudDetector:
             'f1': f1_score(y_test, xgb_pred)
         }
         
-        # Neural Network
-        nn_pred = (self.models['neural_network'].predict(X_test_scaled) > 0.5).astype(int).flatten()
+        # Neural Network (exported runtime takes unscaled features)
+        nn_pred = (self.serving_models['neural_network'].predict(X_test) > 0.5).astype(int)
         results['neural_network'] = {
             'accuracy': accuracy_score(y_test, nn_pred),
             'precision': precision_score(y_test, nn_pred),
@@ -390,6 +457,11 @@ class CarbonFraudDetector:
             'f1': f1_score(y_test, nn_pred)
         }
         
+        self.evaluation_metrics = {
+            model_name: {name: float(value) for name, value in scores.items()}
+            for model_name, scores in results.items()
+        }
+        
         # Log results
         for model_name, metrics in results.items():
             logger.info(f"{model_name.upper()} - Accuracy: {metrics['accuracy']:.3f}, "
@@ -399,19 +471,18 @@ class CarbonFraudDetector:
     
     def _extract_feature_importance(self):
         """Extract and store feature importance from tree-based models"""
-        feature_names = list(self._get_default_features().keys())
+        feature_names = self.feature_schema.names
         
-        # Random Forest importance
-        if 'random_forest' in self.models:
-            self.feature_importance['random_forest'] = dict(
-                zip(feature_names, self.models['random_forest'].feature_importances_)
-            )
-        
-        # XGBoost importance
-        if 'xgboost' in self.models:
-            self.feature_importance['xgboost'] = dict(
-                zip(feature_names, self.models['xgboost'].feature_importances_)
-            )
+        for model_name in ('random_forest', 'xgboost'):
+            if model_name not in self.models:
+                continue
+            importances = np.asarray(self.models[model_name].feature_importances_, dtype=float)
+            if importances.shape[0] != len(feature_names):
+                raise FeatureSchemaMismatchError(
+                    f"{model_name} reports {importances.shape[0]} feature importances; "
+                    f"schema {self.feature_schema.version} defines {len(feature_names)} features"
+                )
+            self.feature_importance[model_name] = dict(zip(feature_names, importances.tolist()))
     
     def verify_sensor_data(self, sensor_data: Dict) -> VerificationResult:
         """
@@ -423,134 +494,525 @@ class CarbonFraudDetector:
         Returns:
             VerificationResult with confidence score and analysis
         """
+        return self.verify_batch([sensor_data])[0]
+    
+    def verify_batch(self, sensor_data_list: List[Dict], raise_errors: bool = False,
+                     timings: Optional[Dict[str, float]] = None) -> List[VerificationResult]:
+        """
+        Verify a batch of sensor readings with one model call per ensemble member
+        
+        Args:
+            sensor_data_list: List of raw sensor data dictionaries
+            raise_errors: Raise instead of returning conservative error results
+            timings: Optional dict filled with the milliseconds spent in each stage
+            
+        Returns:
+            List of VerificationResult objects in the same order as the input
+        """
+        if not sensor_data_list:
+            return []
+        
         if not self.is_trained:
             logger.warning("Models not trained yet. Training with synthetic data...")
             self.train_models()
         
+        clock = StageClock()
         try:
-            # Extract features
-            features = self.create_features(sensor_data)
-            feature_array = np.array(list(features.values())).reshape(1, -1)
-            feature_array_scaled = self.scalers['standard'].transform(feature_array)
-            
-            # Get predictions from all models
-            model_outputs = {}
-            
-            # Random Forest
-            rf_prob = self.models['random_forest'].predict_proba(feature_array)[0][1]
-            model_outputs['random_forest'] = rf_prob
-            
-            # XGBoost
-            xgb_prob = self.models['xgboost'].predict_proba(feature_array)[0][1]
-            model_outputs['xgboost'] = xgb_prob
-            
-            # Neural Network
-            nn_prob = self.models['neural_network'].predict(feature_array_scaled)[0][0]
-            model_outputs['neural_network'] = float(nn_prob)
-            
-            # Isolation Forest (anomaly detection)
-            anomaly_score = self.models['isolation_forest'].decision_function(feature_array_scaled)[0]
-            model_outputs['anomaly_score'] = float(anomaly_score)
-            
-            # Ensemble prediction (weighted average)
-            weights = {'random_forest': 0.3, 'xgboost': 0.4, 'neural_network': 0.3}
-            ensemble_score = sum(model_outputs[model] * weight for model, weight in weights.items())
-            
-            # Convert to 0-100 scale
-            confidence_score = ensemble_score * 100
-            
-            # Determine prediction category
-            if confidence_score >= self.thresholds['high_confidence'] * 100:
-                prediction = 'legitimate'
-                confidence = min(ensemble_score, 0.99)
-            elif confidence_score <= self.thresholds['low_confidence'] * 100:
-                prediction = 'fraudulent'
-                confidence = 1 - ensemble_score
-            else:
-                prediction = 'suspicious'
-                confidence = 0.5 + abs(0.75 - ensemble_score)  # Higher uncertainty
-            
-            # Identify anomaly flags
-            anomaly_flags = self._identify_anomalies(features, anomaly_score)
-            
-            # Calculate risk factors
-            risk_factors = self._calculate_risk_factors(features)
-            
-            return VerificationResult(
-                score=confidence_score,
-                prediction=prediction,
-                confidence=confidence,
-                anomaly_flags=anomaly_flags,
-                model_outputs=model_outputs,
-                risk_factors=risk_factors,
-                timestamp=datetime.utcnow().isoformat()
-            )
+            cache = self.result_cache
+            generation = cache.generation
+            results = [None] * len(sensor_data_list)
+            cache_keys = [None] * len(sensor_data_list)
+            
+            # Extract features into a single matrix
+            feature_matrix = self.create_feature_matrix(sensor_data_list)
+            clock.lap('feature_extraction')
+            pending = list(range(len(sensor_data_list)))
+            
+            # Results are keyed on the feature vector they were computed from; a
+            # client-supplied identifier such as data_hash never selects a verdict
+            if cache.enabled:
+                # The cache holds private copies; every hit gets its own, verified now
+                verified_at = datetime.utcnow().isoformat()
+                for i in pending:
+                    cache_keys[i] = ('features', feature_digest(feature_matrix[i]))
+                    cached = cache.get(cache_keys[i])
+                    results[i] = cached.copy(verified_at) if cached is not None else None
+                
+                pending = [i for i, result in enumerate(results) if result is None]
+                if len(pending) < len(sensor_data_list):
+                    feature_matrix = feature_matrix[pending]
+                clock.lap('cache_lookup')
+            
+            if pending:
+                for i, result in zip(pending, self._score_feature_matrix(feature_matrix, clock)):
+                    results[i] = result
+                    if cache_keys[i] is not None:
+                        cache.put(cache_keys[i], result.copy(), generation)
+                clock.lap('cache_store')
+            
+            return results
             
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error in verification process: {e}")
-            # Return conservative result in case of error
-            return VerificationResult(
-                score=50.0,
-                prediction='suspicious',
-                confidence=0.0,
-                anomaly_flags=['verification_error'],
-                model_outputs={},
-                risk_factors={'error': 1.0},
-                timestamp=datetime.utcnow().isoformat()
-            )
+            # Return conservative results in case of error
+            return [self._get_error_result() for _ in sensor_data_list]
+        
+        finally:
+            clock.timings['total'] = clock.elapsed_ms()
+            self.stage_latency.observe_many(clock.timings)
+            if timings is not None:
+                timings.update(clock.timings)
     
-    def _identify_anomalies(self, features: Dict[str, float], anomaly_score: float) -> List[str]:
-        """Identify specific anomalies in the data"""
-        flags = []
+    def _score_feature_matrix(self, feature_matrix: np.ndarray, clock: StageClock = None) -> List[VerificationResult]:
+        """Build verification results for every row of a feature matrix"""
+        clock = clock if clock is not None else StageClock()
         
-        # Check for extreme values
-        if features['co2_ppm'] < 250 or features['co2_ppm'] > 2000:
-            flags.append('extreme_co2_values')
+        # Get predictions from all models for the whole batch
+        batch_outputs = self._predict_batch(feature_matrix, clock)
         
-        if features['accuracy_score'] < 0.8:
-            flags.append('low_data_quality')
+        # Identify anomaly flags and risk factors for the whole batch
+        anomaly_flags = self._identify_anomalies(feature_matrix, batch_outputs['anomaly_score'])
+        clock.lap('identify_anomalies')
+        risk_factors = self._calculate_risk_factors(feature_matrix)
+        clock.lap('calculate_risk_factors')
         
-        if features['error_rate'] > 0.1:
-            flags.append('high_error_rate')
+        results = []
+        for i in range(feature_matrix.shape[0]):
+            # Skipped cascade members are NaN and left out of the outputs
+            model_outputs = {name: float(scores[i]) for name, scores in batch_outputs.items() if scores[i] == scores[i]}
+            results.append(self._build_verification_result(model_outputs, anomaly_flags[i], risk_factors[i]))
+        clock.lap('result_assembly')
         
-        if features['pressure_altitude_consistency'] < 0.7:
-            flags.append('inconsistent_environmental_data')
+        return results
+    
+    def _predict_batch(self, feature_matrix: np.ndarray, clock: StageClock = None) -> Dict[str, np.ndarray]:
+        """
+        Score a feature matrix with every model, calling each model exactly once
         
-        if anomaly_score < self.thresholds['anomaly_threshold']:
-            flags.append('statistical_anomaly')
+        In cascade mode, rows exited early hold NaN for the models that were skipped.
+        """
+        clock = clock if clock is not None else StageClock()
+        if self.serving_mode == 'student' and STUDENT_MODEL in self.serving_models:
+            return self._predict_student(feature_matrix, clock)
+        if self.cascade_enabled and self._model_available(self.cascade_model):
+            return self._predict_cascade(feature_matrix, clock)
         
-        if features['has_data_hash'] == 0:
-            flags.append('missing_data_integrity')
+        outputs = {}
+        for name, output in (('random_forest', 'random_forest'), ('xgboost', 'xgboost'),
+                             ('neural_network', 'neural_network'), ('isolation_forest', 'anomaly_score')):
+            # Models still loading in the background are left out of the ensemble
+            if self._model_available(name):
+                outputs[output] = self._predict_model(name, feature_matrix)
+                clock.lap(f"model.{name}")
         
-        if features['sensor_reliability'] < 0.6:
-            flags.append('unreliable_sensor')
+        return outputs
+    
+    def _predict_student(self, feature_matrix: np.ndarray, clock: StageClock) -> Dict[str, np.ndarray]:
+        """Score with the distilled student in place of the supervised ensemble"""
+        outputs = {STUDENT_MODEL: self._predict_model(STUDENT_MODEL, feature_matrix)}
+        clock.lap(f"model.{STUDENT_MODEL}")
         
-        return flags
+        # Anomaly flags still need the isolation forest score
+        outputs['anomaly_score'] = self._predict_model('isolation_forest', feature_matrix)
+        clock.lap('model.isolation_forest')
+        return outputs
     
-    def _calculate_risk_factors(self, features: Dict[str, float]) -> Dict[str, float]:
-        """Calculate risk factors based on features"""
-        risk_factors = {}
+    def configure_serving_mode(self, mode: str):
+        """
+        Select the models that produce the ensemble score
         
-        # Data quality risk
-        risk_factors['data_quality'] = 1 - features['accuracy_score']
+        Args:
+            mode: 'ensemble' for the weighted supervised models, 'student' for the
+                distilled student (the ensemble is used while no student is loaded)
+        """
+        if mode not in SERVING_MODES:
+            raise ValueError(f"Serving mode must be one of {SERVING_MODES}")
+        if mode == 'student' and self.is_trained and STUDENT_MODEL not in self.serving_models:
+            logger.warning("No distilled student loaded; serving the full ensemble")
+        self.serving_mode = mode
         
-        # Sensor reliability risk
-        risk_factors['sensor_health'] = 1 - features['sensor_reliability']
+        # Cached results were scored under the previous mode
+        self._models_changed()
+        logger.info(f"Serving mode {mode}")
+    
+    def set_student(self, student: CompiledTreeEnsemble):
+        """Install a distilled student runtime (served in 'student' mode)"""
+        self.serving_models[STUDENT_MODEL] = student
+        self._models_changed()
+    
+    def ensemble_scores(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Weighted score of the supervised ensemble for every row, ignoring the serving mode"""
+        scores = {name: self._predict_model(name, feature_matrix)
+                  for name in self.ensemble_weights if self._model_available(name)}
+        total_weight = sum(self.ensemble_weights[name] for name in scores)
+        return sum(scores[name].astype(np.float64) * self.ensemble_weights[name] for name in scores) / total_weight
+    
+    def _model_available(self, name: str) -> bool:
+        return name in self.serving_models or self._has_original_model(name)
+    
+    def _predict_model(self, name: str, feature_matrix: np.ndarray) -> np.ndarray:
+        """Score unscaled features with one model"""
+        # Prefer the framework-free runtime; it takes unscaled features
+        if name in self.serving_models:
+            return self._serving_runtime(name).predict(feature_matrix)
+        return self._predict_original(name, feature_matrix)
+    
+    def _serving_runtime(self, name: str) -> Any:
+        """Framework-free runtime of a model in the serving precision, converted on first use"""
+        runtime = self.serving_models[name]
+        if self.inference_dtype == np.float64:
+            return runtime
         
-        # Environmental consistency risk
-        risk_factors['environmental_consistency'] = 1 - features['pressure_altitude_consistency']
+        # Keyed by the full precision runtime, so reloaded models are converted again
+        cached = self._reduced_runtimes.get(name)
+        if cached is None or cached[0] is not runtime:
+            cached = self._reduced_runtimes[name] = (runtime, runtime.astype(self.inference_dtype))
+        return cached[1]
+    
+    def configure_precision(self, dtype: Union[str, type] = np.float32):
+        """
+        Select the floating point type used for serving
+        
+        float32 halves the memory traffic of feature matrices, the folded scaler and
+        network weights, and compiled tree thresholds and leaf values. Thresholds are
+        rounded so tree split decisions on the same feature rows are unchanged; the
+        full precision runtimes are kept, so saved models and bundles stay float64.
+        
+        Args:
+            dtype: np.float32 or np.float64
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError(f"Unsupported inference precision: {dtype}")
+        
+        self.inference_dtype = dtype
+        self.feature_extractor.dtype = dtype
+        self._reduced_runtimes = {}
+        
+        # Cached results were scored in the previous precision
+        self._models_changed()
+        logger.info(f"Serving in {dtype.name} precision")
+    
+    def validate_precision(self, X: np.ndarray = None, dtype: Union[str, type] = np.float32) -> Dict[str, Any]:
+        """
+        Compare reduced precision scores against float64 on a holdout set
+        
+        Args:
+            X: Unscaled holdout feature matrix (synthetic data if omitted)
+            dtype: Reduced precision to validate
+            
+        Both precisions are scored on throwaway copies of the detector, so its serving
+        precision, converted runtimes, result cache and cascade counters are untouched.
+        
+        Returns:
+            Report with the maximum and mean score deviation per model and for the
+            ensemble, prediction and anomaly flag disagreements, memory and latency
+        """
+        if X is None:
+            X, _ = self.generate_training_data(2000, seed=7)
+        
+        dtype = np.dtype(dtype)
+        reference = self._precision_probe(np.dtype(np.float64))._precision_outputs(X.astype(np.float64))
+        reduced = self._precision_probe(dtype)._precision_outputs(X.astype(dtype))
+        
+        report = {
+            'dtype': dtype.name,
+            'num_samples': int(X.shape[0]),
+            'max_score_deviation': {},
+            'mean_score_deviation': {},
+        }
+        for name in reference['scores']:
+            deviation = np.abs(reduced['scores'][name].astype(np.float64) - reference['scores'][name])
+            report['max_score_deviation'][name] = float(deviation.max(initial=0.0))
+            report['mean_score_deviation'][name] = float(deviation.mean())
+        
+        disagreements = reduced['predictions'] != reference['predictions']
+        flag_disagreements = sum(a != b for a, b in zip(reduced['anomaly_flags'], reference['anomaly_flags']))
+        report.update({
+            'prediction_disagreements': int(disagreements.sum()),
+            'prediction_disagreement_rate': float(disagreements.mean()),
+            'anomaly_flag_disagreements': int(flag_disagreements),
+            'feature_matrix_bytes': {'float64': int(X.shape[0] * X.shape[1] * 8),
+                                     dtype.name: int(X.shape[0] * X.shape[1] * dtype.itemsize)},
+            'runtime_parameter_bytes': {'float64': reference['parameter_bytes'], dtype.name: reduced['parameter_bytes']},
+            'batch_latency_ms': {'float64': reference['latency_ms'], dtype.name: reduced['latency_ms']},
+        })
+        
+        logger.info(f"{dtype.name} serving: max ensemble score deviation "
+                    f"{report['max_score_deviation'].get('ensemble_score', 0.0):.2e}, "
+                    f"{report['prediction_disagreements']} prediction changes in {report['num_samples']} samples")
+        return report
+    
+    def _precision_probe(self, dtype: np.dtype) -> 'CarbonFraudDetector':
+        """Shallow copy serving in dtype, with its own converted runtimes and cascade counters"""
+        probe = copy.copy(self)
+        probe.inference_dtype = dtype
+        # Runtimes already converted to the serving precision are reused, never replaced
+        probe._reduced_runtimes = dict(self._reduced_runtimes) if dtype == self.inference_dtype else {}
+        probe.cascade_counters = dict(self.cascade_counters)
+        probe._cascade_lock = threading.Lock()
+        return probe
+    
+    def _precision_outputs(self, X: np.ndarray) -> Dict[str, Any]:
+        """Model scores, ensemble score, categories, flags, runtime size and latency in the current precision"""
+        scores = {name: self._predict_model(name, X) for name in MODEL_BACKENDS if self._model_available(name)}
+        supervised = [name for name in self.ensemble_weights if name in scores]
+        total_weight = sum(self.ensemble_weights[name] for name in supervised)
+        scores['ensemble_score'] = sum(scores[name].astype(np.float64) * self.ensemble_weights[name]
+                                       for name in supervised) / total_weight
+        
+        start_time = time.perf_counter()
+        self._score_feature_matrix(X)
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        
+        parameter_bytes = sum(
+            array.nbytes
+            for name in self.serving_models
+            for array in self._serving_runtime(name).to_state()[0].values()
+        )
+        return {
+            'scores': scores,
+            'predictions': self._prediction_categories(scores['ensemble_score']),
+            'anomaly_flags': self._identify_anomalies(X, scores['isolation_forest']) if 'isolation_forest' in scores else [],
+            'parameter_bytes': int(parameter_bytes),
+            'latency_ms': round(latency_ms, 3),
+        }
+    
+    def _cascade_exits(self, scores: np.ndarray, margin: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Masks of rows confidently above and below the decision band"""
+        exit_legitimate = scores >= self.thresholds['high_confidence'] + margin
+        exit_fraudulent = scores <= self.thresholds['low_confidence'] - margin
+        return exit_legitimate, exit_fraudulent
+    
+    def _predict_cascade(self, feature_matrix: np.ndarray, clock: StageClock) -> Dict[str, np.ndarray]:
+        """Score with the cascade model first and the remaining models only for undecided rows"""
+        num_rows = feature_matrix.shape[0]
+        outputs = {self.cascade_model: self._predict_model(self.cascade_model, feature_matrix)}
+        clock.lap(f"model.{self.cascade_model}")
+        
+        exit_legitimate, exit_fraudulent = self._cascade_exits(outputs[self.cascade_model], self.cascade_margin)
+        escalated = np.flatnonzero(~(exit_legitimate | exit_fraudulent))
+        
+        for name in self.ensemble_weights:
+            if name == self.cascade_model or not self._model_available(name):
+                continue
+            outputs[name] = np.full(num_rows, np.nan)
+            if escalated.size:
+                outputs[name][escalated] = self._predict_model(name, feature_matrix[escalated])
+            clock.lap(f"model.{name}")
+        
+        # Anomaly flags need the isolation forest score for every row
+        outputs['anomaly_score'] = self._predict_model('isolation_forest', feature_matrix)
+        clock.lap('model.isolation_forest')
+        
+        with self._cascade_lock:
+            self.cascade_counters['evaluated'] += num_rows
+            self.cascade_counters['exit_legitimate'] += int(exit_legitimate.sum())
+            self.cascade_counters['exit_fraudulent'] += int(exit_fraudulent.sum())
+            self.cascade_counters['escalated'] += int(escalated.size)
+        
+        return outputs
+    
+    def configure_cascade(self, enabled: bool, model: str = None, margin: float = None):
+        """
+        Enable or disable early-exit cascade mode
+        
+        Args:
+            enabled: Whether to score with the cascade model first
+            model: Model scored first (should be the cheapest one)
+            margin: Distance outside the decision band required to exit early
+        """
+        if model is not None:
+            if model not in self.ensemble_weights:
+                raise ValueError(f"Cascade model must be one of {sorted(self.ensemble_weights)}")
+            self.cascade_model = model
+        if margin is not None:
+            self.cascade_margin = margin
+        self.cascade_enabled = enabled
+        
+        # Cached results were scored under the previous mode
+        self._models_changed()
+        logger.info(f"Cascade mode {'enabled' if enabled else 'disabled'} "
+                    f"(model={self.cascade_model}, margin={self.cascade_margin})")
+    
+    def cascade_stats(self) -> Dict[str, Any]:
+        """Exit counters of the live cascade"""
+        with self._cascade_lock:
+            counters = dict(self.cascade_counters)
+        
+        evaluated = max(counters['evaluated'], 1)
+        return {
+            'enabled': self.cascade_enabled,
+            'model': self.cascade_model,
+            'margin': self.cascade_margin,
+            **counters,
+            'exit_rate': round((counters['exit_legitimate'] + counters['exit_fraudulent']) / evaluated, 4)
+        }
+    
+    def _prediction_categories(self, ensemble_scores: np.ndarray) -> np.ndarray:
+        """Vectorized prediction category of each ensemble score"""
+        return np.select(
+            [ensemble_scores * 100 >= self.thresholds['high_confidence'] * 100,
+             ensemble_scores * 100 <= self.thresholds['low_confidence'] * 100],
+            ['legitimate', 'fraudulent'],
+            default='suspicious'
+        )
+    
+    def evaluate_cascade(self, X: np.ndarray = None, y: np.ndarray = None,
+                         margins: Tuple[float, ...] = (0.0, 0.025, 0.05, 0.1)) -> Dict[str, Any]:
+        """
+        Compare cascade decisions against the full ensemble on a validation set
+        
+        Args:
+            X: Unscaled validation feature matrix (synthetic data if omitted)
+            y: Optional labels (1 = legitimate) used to report early-exit errors
+            margins: Cascade margins to evaluate
+            
+        Returns:
+            Report with exit frequencies and decision disagreement for each margin
+            
+        Raises:
+            ValueError: If the cascade model is not trained or loaded
+        """
+        if not self._model_available(self.cascade_model):
+            raise ValueError(f"Cascade model '{self.cascade_model}' is not trained or loaded; "
+                             f"available models: {sorted(name for name in self.ensemble_weights if self._model_available(name))}")
+        
+        if X is None:
+            X, y = self.generate_training_data(2000)
+        
+        # Full ensemble over the supervised models
+        scores = {name: self._predict_model(name, X) for name in self.ensemble_weights if self._model_available(name)}
+        total_weight = sum(self.ensemble_weights[name] for name in scores)
+        full_scores = sum(scores[name] * self.ensemble_weights[name] for name in scores) / total_weight
+        full_predictions = self._prediction_categories(full_scores)
+        
+        cascade_scores = scores[self.cascade_model]
+        report = {'cascade_model': self.cascade_model, 'num_samples': int(X.shape[0]), 'margins': []}
+        for margin in margins:
+            exit_legitimate, exit_fraudulent = self._cascade_exits(cascade_scores, margin)
+            exited = exit_legitimate | exit_fraudulent
+            predictions = np.where(exited, self._prediction_categories(cascade_scores), full_predictions)
+            disagreements = predictions != full_predictions
+            
+            result = {
+                'margin': margin,
+                'exit_legitimate_rate': float(exit_legitimate.mean()),
+                'exit_fraudulent_rate': float(exit_fraudulent.mean()),
+                'escalation_rate': float(1 - exited.mean()),
+                'disagreement_rate': float(disagreements.mean()),
+                'disagreements_by_exit': {
+                    'legitimate': int((disagreements & exit_legitimate).sum()),
+                    'fraudulent': int((disagreements & exit_fraudulent).sum())
+                }
+            }
+            if y is not None:
+                result['early_exit_errors'] = int((exit_legitimate & (y == 0)).sum() + (exit_fraudulent & (y == 1)).sum())
+            report['margins'].append(result)
+            
+            logger.info(f"Cascade margin {margin}: {exited.mean():.1%} exited early, "
+                        f"{disagreements.mean():.2%} disagree with the full ensemble")
+        
+        return report
+    
+    def _build_verification_result(self, model_outputs: Dict[str, float], anomaly_flags: List[str],
+                                   risk_factors: Dict[str, float]) -> VerificationResult:
+        """Combine individual model outputs for one reading into a VerificationResult"""
+        # Ensemble prediction (weighted average), or the student trained to reproduce it
+        if STUDENT_MODEL in model_outputs:
+            ensemble_score = model_outputs[STUDENT_MODEL]
+        else:
+            ensemble_score = sum(model_outputs[model] * weight for model, weight in self.ensemble_weights.items()
+                                 if model in model_outputs)
+            if not self.ensemble_weights.keys() <= model_outputs.keys():
+                # Renormalise over the members available while others are still loading
+                ensemble_score /= sum(weight for model, weight in self.ensemble_weights.items() if model in model_outputs)
+        
+        # Convert to 0-100 scale
+        confidence_score = ensemble_score * 100
+        
+        # Determine prediction category
+        if confidence_score >= self.thresholds['high_confidence'] * 100:
+            prediction = 'legitimate'
+            confidence = min(ensemble_score, 0.99)
+        elif confidence_score <= self.thresholds['low_confidence'] * 100:
+            prediction = 'fraudulent'
+            confidence = 1 - ensemble_score
+        else:
+            prediction = 'suspicious'
+            confidence = 0.5 + abs(0.75 - ensemble_score)  # Higher uncertainty
+        
+        return VerificationResult(
+            score=confidence_score,
+            prediction=prediction,
+            confidence=confidence,
+            anomaly_flags=anomaly_flags,
+            model_outputs=model_outputs,
+            risk_factors=risk_factors,
+            timestamp=datetime.utcnow().isoformat(),
+            model_version=self.model_version
+        )
+    
+    def _get_error_result(self) -> VerificationResult:
+        """Conservative result returned when verification fails"""
+        return VerificationResult(
+            score=50.0,
+            prediction='suspicious',
+            confidence=0.0,
+            anomaly_flags=['verification_error'],
+            model_outputs={},
+            risk_factors={'error': 1.0},
+            timestamp=datetime.utcnow().isoformat(),
+            model_version=self.model_version
+        )
+    
+    def _identify_anomalies(self, feature_matrix: np.ndarray, anomaly_scores: np.ndarray) -> List[List[str]]:
+        """Identify specific anomalies for every row of a feature matrix"""
+        co2 = feature_matrix[:, CO2_PPM]
+        
+        # Flag masks evaluated column-wise, in reporting order
+        flag_masks = (
+            ('extreme_co2_values', (co2 < 250) | (co2 > 2000)),  # Check for extreme values
+            ('low_data_quality', feature_matrix[:, ACCURACY_SCORE] < 0.8),
+            ('high_error_rate', feature_matrix[:, ERROR_RATE] > 0.1),
+            ('inconsistent_environmental_data', feature_matrix[:, PRESSURE_ALTITUDE_CONSISTENCY] < 0.7),
+            ('statistical_anomaly', np.asarray(anomaly_scores) < self.thresholds['anomaly_threshold']),
+            ('missing_data_integrity', feature_matrix[:, HAS_DATA_HASH] == 0),
+            ('unreliable_sensor', feature_matrix[:, SENSOR_RELIABILITY] < 0.6),
+        )
+        
+        flags = [[] for _ in range(feature_matrix.shape[0])]
+        for flag, mask in flag_masks:
+            for i in np.flatnonzero(mask):
+                flags[i].append(flag)
+        
+        return flags
+    
+    def _calculate_risk_factors(self, feature_matrix: np.ndarray) -> List[Dict[str, float]]:
+        """Calculate risk factors for every row of a feature matrix"""
+        co2 = feature_matrix[:, CO2_PPM]
         
         # Extreme values risk
         normal_co2_range = (350, 500)
-        if features['co2_ppm'] < normal_co2_range[0] or features['co2_ppm'] > normal_co2_range[1]:
-            risk_factors['extreme_values'] = min(features['co2_deviation'] / 100, 1.0)
-        else:
-            risk_factors['extreme_values'] = 0.0
+        extreme_values = np.where(
+            (co2 < normal_co2_range[0]) | (co2 > normal_co2_range[1]),
+            np.minimum(feature_matrix[:, CO2_DEVIATION] / 100, 1.0),
+            0.0
+        )
         
-        # Data completeness risk
-        risk_factors['data_completeness'] = 1 - features['data_completeness']
+        risk_columns = {
+            'data_quality': 1 - feature_matrix[:, ACCURACY_SCORE],  # Data quality risk
+            'sensor_health': 1 - feature_matrix[:, SENSOR_RELIABILITY],  # Sensor reliability risk
+            'environmental_consistency': 1 - feature_matrix[:, PRESSURE_ALTITUDE_CONSISTENCY],  # Environmental consistency risk
+            'extreme_values': extreme_values,
+            'data_completeness': 1 - feature_matrix[:, DATA_COMPLETENESS],  # Data completeness risk
+        }
         
-        return risk_factors
+        names = list(risk_columns)
+        rows = np.column_stack([risk_columns[name] for name in names]).tolist()
+        return [dict(zip(names, row)) for row in rows]
     
     def save_models(self, path: str = None):
         """Save trained models to disk"""
@@ -558,14 +1020,24 @@ class CarbonFraudDetector:
             path = self.model_path
         
         try:
-            # Save scikit-learn models
-            joblib.dump(self.models['random_forest'], f"{path}/random_forest.pkl")
-            joblib.dump(self.models['xgboost'], f"{path}/xgboost.pkl")
-            joblib.dump(self.models['isolation_forest'], f"{path}/isolation_forest.pkl")
-            joblib.dump(self.scalers['standard'], f"{path}/scaler.pkl")
+            joblib = BACKENDS.get('joblib')
+            
+            # Save scikit-learn models (absent when serving from a bundle only)
+            for name in TREE_MODELS:
+                if self._has_original_model(name):
+                    joblib.dump(self._require_model(name), f"{path}/{name}.pkl")
+            if 'standard' in self.scalers or 'scaler' in self._deferred_loaders:
+                joblib.dump(self._require_scaler(), f"{path}/scaler.pkl")
+            
+            # Save neural network and its exported NumPy weights
+            if 'neural_network' in self.models:
+                self.models['neural_network'].save(f"{path}/neural_network.h5")
+            self.serving_models['neural_network'].save(f"{path}/neural_network_weights.npz")
             
-            # Save neural network
-            self.models['neural_network'].save(f"{path}/neural_network.h5")
+            # Save compiled tree ensembles beside their pickles
+            for name in TREE_MODELS + (STUDENT_MODEL,):
+                if name in self.serving_models:
+                    self.serving_models[name].save(f"{path}/{name}_compiled.npz")
             
             # Save feature importance and metadata
             with open(f"{path}/feature_importance.pkl", 'wb') as f:
@@ -573,46 +1045,164 @@ class CarbonFraudDetector:
             
             with open(f"{path}/model_metadata.pkl", 'wb') as f:
                 metadata = {
+                    'feature_schema': self.feature_schema.to_dict(),
                     'thresholds': self.thresholds,
                     'is_trained': self.is_trained,
+                    'model_version': self.model_version,
+                    'evaluation_metrics': self.evaluation_metrics,
                     'training_timestamp': datetime.utcnow().isoformat()
                 }
                 pickle.dump(metadata, f)
             
+            # Save the memory-mappable serving bundle
+            self.save_bundle(f"{path}/{BUNDLE_FILENAME}")
+            
             logger.info(f"Models saved successfully to {path}")
             
         except Exception as e:
             logger.error(f"Error saving models: {e}")
     
-    def load_models(self, path: str = None):
-        """Load trained models from disk"""
+    def save_bundle(self, path: str):
+        """Write every serving runtime and the serving metadata to one memory-mappable bundle"""
+        missing = [name for name in MODEL_BACKENDS if name not in self.serving_models]
+        if missing:
+            raise ValueError(f"Cannot bundle models without a framework-free runtime: {missing}")
+        
+        write_bundle(path, self.serving_models, {
+            'feature_schema': self.feature_schema.to_dict(),
+            'thresholds': self.thresholds,
+            'feature_importance': self.feature_importance,
+            'is_trained': self.is_trained,
+            'model_version': self.model_version,
+            'evaluation_metrics': self.evaluation_metrics,
+            'training_timestamp': datetime.utcnow().isoformat()
+        })
+    
+    def load_bundle(self, path: str):
+        """
+        Serve from a model bundle written by save_bundle
+        
+        The bundle is memory-mapped read-only, so loading is near-instant and processes
+        serving the same bundle share its pages.
+        """
+        serving_models, manifest = read_bundle(path)
+        metadata = manifest['metadata']
+        self.feature_schema.check_compatible(metadata.get('feature_schema'))
+        
+        self.serving_models = serving_models
+        self.thresholds = metadata['thresholds']
+        self.feature_importance = metadata.get('feature_importance', {})
+        self.is_trained = metadata['is_trained']
+        self.model_version = metadata.get('model_version')
+        self.evaluation_metrics = metadata.get('evaluation_metrics', {})
+        self._models_changed()
+        
+        logger.info(f"Models loaded from bundle {path}")
+    
+    def load_models(self, path: str = None, background_models: Tuple[str, ...] = (), prefer_bundle: bool = True):
+        """
+        Load trained models from disk
+        
+        A model bundle in the directory is used when present. Otherwise framework pickles
+        are only deserialized on first use when a compiled runtime exists for them, so
+        serving from saved artifacts imports no ML framework.
+        
+        Args:
+            path: Directory holding the saved artifacts
+            background_models: Models loaded on a background thread; until they are ready
+                the ensemble is computed from the remaining members
+            prefer_bundle: Serve from the bundle file when the directory has one
+        """
         if path is None:
             path = self.model_path
         
         try:
-            # Load scikit-learn models
-            self.models['random_forest'] = joblib.load(f"{path}/random_forest.pkl")
-            self.models['xgboost'] = joblib.load(f"{path}/xgboost.pkl")
-            self.models['isolation_forest'] = joblib.load(f"{path}/isolation_forest.pkl")
-            self.scalers['standard'] = joblib.load(f"{path}/scaler.pkl")
+            if prefer_bundle and os.path.exists(f"{path}/{BUNDLE_FILENAME}"):
+                self.load_bundle(f"{path}/{BUNDLE_FILENAME}")
+                self._defer_framework_artifacts(path)
+                return
             
-            # Load neural network
-            self.models['neural_network'] = keras.models.load_model(f"{path}/neural_network.h5")
+            # Check the feature layout before deserializing any model
+            with open(f"{path}/model_metadata.pkl", 'rb') as f:
+                metadata = pickle.load(f)
+            self.feature_schema.check_compatible(metadata.get('feature_schema'))
+            
+            self._defer_framework_artifacts(path)
+            
+            # Load compiled tree ensembles, compiling any that are missing
+            for name in TREE_MODELS:
+                if os.path.exists(f"{path}/{name}_compiled.npz"):
+                    self.serving_models[name] = CompiledTreeEnsemble.load(f"{path}/{name}_compiled.npz")
+                else:
+                    self.export_serving_models(names=(name,))
+            if os.path.exists(f"{path}/{STUDENT_MODEL}_compiled.npz"):
+                self.serving_models[STUDENT_MODEL] = CompiledTreeEnsemble.load(f"{path}/{STUDENT_MODEL}_compiled.npz")
+            
+            # Load neural network, optionally in the background
+            self._loading_models.add('neural_network')
+            if 'neural_network' in background_models:
+                thread = threading.Thread(
+                    target=self._load_neural_network, args=(path,), name='neural-network-loader', daemon=True
+                )
+                self._background_loads.append(thread)
+                thread.start()
+            else:
+                self._load_neural_network(path)
             
             # Load feature importance and metadata
             with open(f"{path}/feature_importance.pkl", 'rb') as f:
                 self.feature_importance = pickle.load(f)
             
-            with open(f"{path}/model_metadata.pkl", 'rb') as f:
-                metadata = pickle.load(f)
-                self.thresholds = metadata['thresholds']
-                self.is_trained = metadata['is_trained']
+            self.thresholds = metadata['thresholds']
+            self.is_trained = metadata['is_trained']
+            self.model_version = metadata.get('model_version')
+            self.evaluation_metrics = metadata.get('evaluation_metrics', {})
+            self._models_changed()
             
             logger.info(f"Models loaded successfully from {path}")
             
+        except FeatureSchemaMismatchError as e:
+            logger.error(f"Refusing to load models from {path}: {e}")
+            self.is_trained = False
+            raise
+            
         except Exception as e:
             logger.error(f"Error loading models: {e}")
             self.is_trained = False
+    
+    def _defer_framework_artifacts(self, path: str):
+        """Make saved framework pickles loadable on demand (for saving and re-export)"""
+        with self._load_lock:
+            self._deferred_loaders = {
+                name: partial(_load_pickle, f"{path}/{name}.pkl")
+                for name in ('scaler',) + TREE_MODELS if os.path.exists(f"{path}/{name}.pkl")
+            }
+            self._model_errors.clear()
+    
+    def _load_neural_network(self, path: str):
+        """Load exported neural network weights, falling back to the Keras model"""
+        try:
+            if os.path.exists(f"{path}/neural_network_weights.npz"):
+                self.serving_models['neural_network'] = NumpyDenseNetwork.load(f"{path}/neural_network_weights.npz")
+            else:
+                keras = BACKENDS.get('tensorflow', 'keras')
+                self.models['neural_network'] = keras.models.load_model(f"{path}/neural_network.h5")
+                self.export_serving_models(names=('neural_network',))
+            self._models_changed()
+            logger.info("Neural network ready")
+            
+        except Exception as e:
+            logger.error(f"Error loading neural network: {e}")
+            self._model_errors['neural_network'] = str(e)
+            
+        finally:
+            self._loading_models.discard('neural_network')
+
+
+def _load_pickle(path: str) -> Any:
+    """Deserialize a joblib artifact, importing its framework on demand"""
+    logger.info(f"Loading {path}")
+    return BACKENDS.get('joblib').load(path)
 
 def main():
     """Main function for testing fraud detection system"""
@@ -656,6 +1246,12 @@ def main():
     logger.info(f"Score: {result2.score:.1f}, Prediction: {result2.prediction}, Confidence: {result2.confidence:.3f}")
     logger.info(f"Anomaly flags: {result2.anomaly_flags}")
     
+    # Early-exit cascade against the full ensemble
+    detector.evaluate_cascade()
+    
+    # float32 serving against float64
+    detector.validate_precision()
+    
     # Save models
     detector.save_models()
     
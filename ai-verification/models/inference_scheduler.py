@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Inference Micro-Batching Scheduler
+Queues single readings from every entry point (HTTP requests, batch items, MQTT
+messages) and scores them together: a worker thread flushes the queue as one
+verify_batch call once max_batch_size items are waiting or the oldest item has
+waited max_wait_ms. Each caller blocks on a future for its own result, so
+concurrent traffic is scored at batch-path throughput with bounded added latency.
+Resolved futures carry a `timings` dict: the stage timings of their batch plus the
+time the item waited in the queue
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from models.stage_timing import StageLatencyRecorder
+
+if TYPE_CHECKING:
+    from models.fraud_detection import CarbonFraudDetector, VerificationResult
+
+logger = logging.getLogger(__name__)
+
+# Sentinel that wakes the worker on shutdown
+_STOP = object()
+
+
+class SchedulerQueueFullError(RuntimeError):
+    """Raised when the scheduler queue is at capacity"""
+
+
+class InferenceScheduler:
+    """Collects concurrent verification requests into micro-batches"""
+
+    def __init__(self, detector_provider: Callable[[], 'CarbonFraudDetector'], max_batch_size: int = 64,
+                 max_wait_ms: float = 2.0, max_queue_size: int = 10000):
+        """
+        Initialize inference scheduler
+
+        Args:
+            detector_provider: Returns the detector to score each flushed batch with
+            max_batch_size: Items that trigger an immediate flush
+            max_wait_ms: Longest time the oldest queued item waits for more items
+            max_queue_size: Queued items beyond which submissions are rejected
+        """
+        self.detector_provider = detector_provider
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue_size = max_queue_size
+
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=max_queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._deadline_flushes = 0
+        self.latency = StageLatencyRecorder()
+
+    def start(self) -> 'InferenceScheduler':
+        """Start the batching worker thread"""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='inference-scheduler', daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Flush the queued items and stop the worker"""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(_STOP)
+            self._worker.join(timeout)
+        self._worker = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and self._worker.is_alive()
+
+    def submit(self, sensor_data: Dict) -> Future:
+        """
+        Queue one reading for the next batch
+
+        Returns:
+            Future resolving to its VerificationResult
+
+        Raises:
+            SchedulerQueueFullError: If max_queue_size items are already waiting
+        """
+        future = Future()
+        try:
+            self._queue.put_nowait((sensor_data, future, time.perf_counter()))
+        except queue.Full:
+            raise SchedulerQueueFullError(f"Inference queue is full ({self.max_queue_size} items)")
+        return future
+
+    def submit_many(self, sensor_data_list: List[Dict]) -> List[Future]:
+        """
+        Queue several readings, all or none
+
+        Returns:
+            Futures resolving to their VerificationResults, in input order
+
+        Raises:
+            SchedulerQueueFullError: If the queue fills up; the readings already queued
+                are cancelled and dropped unscored
+        """
+        futures = []
+        try:
+            for sensor_data in sensor_data_list:
+                futures.append(self.submit(sensor_data))
+        except SchedulerQueueFullError:
+            for future in futures:
+                future.cancel()
+            raise
+        return futures
+
+    def verify(self, sensor_data: Dict, timeout: Optional[float] = None) -> 'VerificationResult':
+        """Verify one reading through the scheduler, blocking until its batch is scored"""
+        return self.submit(sensor_data).result(timeout)
+
+    def verify_many(self, sensor_data_list: List[Dict], timeout: Optional[float] = None,
+                    timings: Optional[List[Dict[str, float]]] = None) -> List['VerificationResult']:
+        """
+        Verify several readings through the scheduler, in input order
+
+        Args:
+            sensor_data_list: Raw sensor payloads
+            timeout: Seconds to wait for each result
+            timings: Optional list extended with the stage timings of every item
+        """
+        futures = self.submit_many(sensor_data_list)
+        results = [future.result(timeout) for future in futures]
+        if timings is not None:
+            timings.extend(getattr(future, 'timings', {}) for future in futures)
+        return results
+
+    def queue_depth(self) -> int:
+        """Items waiting for a batch"""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        """Batching counters"""
+        with self._stats_lock:
+            return {
+                'running': self.running,
+                'batches': self._batches,
+                'items': self._items,
+                'avg_batch_size': round(self._items / self._batches, 2) if self._batches else 0.0,
+                'largest_batch': self._largest_batch,
+                'deadline_flushes': self._deadline_flushes,
+                'queue_depth': self.queue_depth(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+            }
+
+    def _run(self):
+        """Worker loop: block for a first item, gather more until size or deadline, then flush"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+    def _flush(self, batch: List[tuple]):
+        """Score a batch and resolve its futures"""
+        # Items of a cancelled submit_many are dropped without scoring
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        flush_start = time.perf_counter()
+        sensor_data_list = [sensor_data for sensor_data, _, _ in batch]
+        futures = [future for _, future, _ in batch]
+        queue_waits = [(flush_start - enqueued_at) * 1000.0 for _, _, enqueued_at in batch]
+
+        with self._stats_lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            if len(batch) < self.max_batch_size:
+                self._deadline_flushes += 1
+
+        for queue_wait in queue_waits:
+            self.latency.observe('queue_wait', queue_wait)
+
+        try:
+            detector = self.detector_provider()
+            try:
+                batch_timings = {}
+                results = detector.verify_batch(sensor_data_list, raise_errors=True, timings=batch_timings)
+                item_timings = [batch_timings] * len(batch)
+            except Exception as e:
+                # One malformed reading must not fail its neighbours: score them one by one
+                logger.warning(f"Batch of {len(batch)} failed ({e}); verifying items individually")
+                item_timings = [{} for _ in batch]
+                results = [detector.verify_batch([sensor_data], timings=timings)[0]
+                           for sensor_data, timings in zip(sensor_data_list, item_timings)]
+
+            for future, result, timings, queue_wait in zip(futures, results, item_timings, queue_waits):
+                future.timings = {**timings, 'queue_wait': queue_wait}
+                future.set_result(result)
+
+        except Exception as e:
+            logger.error(f"Inference scheduler flush failed: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
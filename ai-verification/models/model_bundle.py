@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Memory-Mappable Model Bundle
+Stores every serving runtime of the fraud detector in one file: a fixed header, the
+numeric arrays at 64-byte aligned offsets, and a JSON manifest describing models,
+array locations, feature schema and thresholds. Loading maps the file read-only, so
+it is near-instant and forked workers share the array pages through the page cache.
+Includes a converter from the legacy ./models/ directory layout
+"""
+
+import argparse
+import json
+import logging
+import os
+import struct
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from models.numpy_network import NumpyDenseNetwork
+from models.tree_compiler import CompiledTreeEnsemble
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FILENAME = 'fraud_detector.bundle'
+BUNDLE_MAGIC = b'CCFDBNDL'
+BUNDLE_FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Header: magic, format version, manifest offset, manifest length
+_HEADER = struct.Struct('<8sQQQ')
+
+RUNTIME_TYPES = {
+    'CompiledTreeEnsemble': CompiledTreeEnsemble,
+    'NumpyDenseNetwork': NumpyDenseNetwork,
+}
+
+
+class ModelBundleError(ValueError):
+    """Raised when a file is not a readable model bundle"""
+
+
+def write_bundle(path: str, serving_models: Dict[str, Any], metadata: Dict[str, Any]):
+    """
+    Write serving runtimes and metadata to a bundle file
+
+    The file is written next to its destination and renamed into place, so readers
+    never observe a partially written bundle.
+
+    Args:
+        path: Destination file
+        serving_models: Runtimes by model name (CompiledTreeEnsemble or NumpyDenseNetwork)
+        metadata: JSON-serializable metadata (feature schema, thresholds, ...)
+    """
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'created_at': datetime.utcnow().isoformat(),
+        'metadata': metadata,
+        'models': {},
+    }
+
+    temp_path = f"{path}.tmp-{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(b'\0' * _HEADER.size)
+
+        for name, runtime in serving_models.items():
+            runtime_type = type(runtime).__name__
+            if runtime_type not in RUNTIME_TYPES:
+                raise TypeError(f"Cannot bundle {name}: unsupported runtime {runtime_type}")
+
+            arrays, params = runtime.to_state()
+            entries = {}
+            for array_name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                _pad_to_alignment(f)
+                entries[array_name] = {'offset': f.tell(), 'dtype': array.dtype.str, 'shape': list(array.shape)}
+                f.write(array.tobytes())
+
+            manifest['models'][name] = {'type': runtime_type, 'params': params, 'arrays': entries}
+
+        _pad_to_alignment(f)
+        manifest_offset = f.tell()
+        manifest_bytes = json.dumps(manifest).encode('utf-8')
+        f.write(manifest_bytes)
+
+        f.seek(0)
+        f.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, manifest_offset, len(manifest_bytes)))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+    logger.info(f"Wrote model bundle {path} ({os.path.getsize(path) / 1e6:.1f} MB, {len(serving_models)} models)")
+
+
+def read_bundle(path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Map a bundle file and rebuild its serving runtimes
+
+    Arrays are read-only views of the shared mapping; nothing is copied.
+
+    Returns:
+        Tuple of (runtimes by model name, manifest)
+    """
+    buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    if buffer.size < _HEADER.size:
+        raise ModelBundleError(f"{path} is too small to be a model bundle")
+
+    magic, version, manifest_offset, manifest_length = _HEADER.unpack(buffer[:_HEADER.size].tobytes())
+    if magic != BUNDLE_MAGIC:
+        raise ModelBundleError(f"{path} is not a model bundle")
+    if version != BUNDLE_FORMAT_VERSION:
+        raise ModelBundleError(f"{path} uses bundle format {version}; expected {BUNDLE_FORMAT_VERSION}")
+
+    manifest = json.loads(buffer[manifest_offset:manifest_offset + manifest_length].tobytes())
+
+    serving_models = {}
+    for name, entry in manifest['models'].items():
+        arrays = {
+            array_name: np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']),
+                                   buffer=buffer, offset=spec['offset'])
+            for array_name, spec in entry['arrays'].items()
+        }
+        serving_models[name] = RUNTIME_TYPES[entry['type']].from_state(arrays, entry['params'])
+
+    return serving_models, manifest
+
+
+def _pad_to_alignment(f):
+    padding = -f.tell() % ALIGNMENT
+    if padding:
+        f.write(b'\0' * padding)
+
+
+def convert_model_directory(source: str, destination: str = None) -> str:
+    """
+    Convert a legacy ./models/ directory (pickles, HDF5 and .npz files) into a bundle
+
+    Args:
+        source: Directory written by CarbonFraudDetector.save_models
+        destination: Bundle file (default: BUNDLE_FILENAME inside source)
+
+    Returns:
+        Path of the written bundle
+    """
+    from models.fraud_detection import CarbonFraudDetector
+
+    destination = destination or os.path.join(source, BUNDLE_FILENAME)
+
+    detector = CarbonFraudDetector(model_path=source, cache_size=0)
+    detector.load_models(source, prefer_bundle=False)
+    if not detector.is_trained:
+        raise ModelBundleError(f"Could not load trained models from {source}")
+
+    detector.save_bundle(destination)
+    return destination
+
+
+def main():
+    """Command line converter from the legacy model directory layout"""
+    parser = argparse.ArgumentParser(description="Convert a fraud detector model directory into a bundle")
+    parser.add_argument('source', help="Model directory written by save_models")
+    parser.add_argument('destination', nargs='?', help=f"Bundle file (default: <source>/{BUNDLE_FILENAME})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    convert_model_directory(args.source, args.destination)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Serving Model Manager
+Double-buffered holder of the serving CarbonFraudDetector. Retraining runs as a
+background job in a separate process, so request threads keep their CPU and GIL
+share; the finished models are registered as a new version, loaded into a complete
+new detector and swapped in with a single reference assignment. Requests that
+already hold the previous detector finish on it. Recent versions are kept loaded in
+a warm pool, so activating or rolling back to one of them is a reference swap
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from models.distillation import distill_student
+from models.fraud_detection import CarbonFraudDetector
+from models.model_bundle import BUNDLE_FILENAME
+from models.model_registry import ModelRegistry, ModelVersionNotFoundError, write_version_metadata
+
+logger = logging.getLogger(__name__)
+
+
+class RetrainInProgressError(RuntimeError):
+    """Raised when a retrain is requested while another one is running"""
+
+
+class ModelImportError(RuntimeError):
+    """Raised when a model directory in the flat layout exists but cannot be loaded"""
+
+
+class ModelManager:
+    """Atomically swappable active/standby detectors with background retraining and warm versions"""
+
+    def __init__(self, detector_factory: Callable[[], CarbonFraudDetector],
+                 registry: Optional[ModelRegistry] = None, warm_versions: int = 2):
+        """
+        Initialize model manager
+
+        Args:
+            detector_factory: Creates an empty detector configured for serving
+            registry: Versioned model store (default: registry at the detector's model path)
+            warm_versions: Versions kept loaded in memory, including the active one
+        """
+        self.detector_factory = detector_factory
+        self.registry = registry or ModelRegistry(detector_factory().model_path)
+        self.warm_versions = max(1, warm_versions)
+        self._active: Optional[CarbonFraudDetector] = None
+        self._standby: Optional[CarbonFraudDetector] = None
+        self._warm: 'OrderedDict[str, CarbonFraudDetector]' = OrderedDict()
+        self._swap_lock = threading.Lock()
+        self._activate_lock = threading.RLock()
+        self._retrain_lock = threading.Lock()
+        self.retrain_status: Dict[str, Any] = {'state': 'idle'}
+
+    @property
+    def active(self) -> Optional[CarbonFraudDetector]:
+        """Detector serving new requests; callers keep the reference for the whole request"""
+        return self._active
+
+    @property
+    def standby(self) -> Optional[CarbonFraudDetector]:
+        """Previously active detector, kept loaded"""
+        return self._standby
+
+    def swap(self, detector: CarbonFraudDetector) -> Optional[CarbonFraudDetector]:
+        """
+        Make detector the active one
+
+        Returns:
+            The detector that was active before (now the standby)
+        """
+        with self._swap_lock:
+            previous = self._active
+            self._standby, self._active = previous, detector
+
+        logger.info(f"Serving model version {detector.model_version}"
+                    + (f" (was {previous.model_version})" if previous else ""))
+        return previous
+
+    def warm_version_names(self) -> List[str]:
+        """Versions currently loaded in memory, least recently used first"""
+        return list(self._warm)
+
+    def load_version(self, version: str, background_models: Sequence[str] = ()) -> CarbonFraudDetector:
+        """
+        Get a loaded detector for a registered version, from the warm pool if possible
+
+        Args:
+            version: Registered version
+            background_models: Models loaded in a background thread (see load_models)
+
+        Raises:
+            ModelVersionNotFoundError: If the version is not registered
+            RuntimeError: If its artifacts cannot be loaded
+        """
+        with self._activate_lock:
+            detector = self._warm.get(version)
+            if detector is not None:
+                self._warm.move_to_end(version)
+                return detector
+
+            if not self.registry.has_version(version):
+                raise ModelVersionNotFoundError(version)
+
+            path = self.registry.version_path(version)
+            detector = self.detector_factory()
+            detector.model_path = path
+            detector.load_models(path, background_models=background_models)
+            if not detector.is_trained:
+                raise RuntimeError(f"Model version {version} in {path} could not be loaded")
+
+            detector.model_version = version
+            self._add_warm(version, detector)
+            return detector
+
+    def _add_warm(self, version: str, detector: CarbonFraudDetector):
+        """Keep a detector loaded, evicting the least recently used inactive versions"""
+        self._warm[version] = detector
+        self._warm.move_to_end(version)
+
+        for name in list(self._warm):
+            if len(self._warm) <= self.warm_versions:
+                break
+            if self._warm[name] is not self._active and name != version:
+                del self._warm[name]
+
+    def preload(self, count: Optional[int] = None) -> List[str]:
+        """
+        Load the newest registered versions so activating them needs no disk access
+
+        Args:
+            count: Versions to keep warm, including the active one (default: warm_versions)
+
+        Returns:
+            Versions loaded in memory afterwards
+        """
+        with self._activate_lock:
+            if count is not None:
+                self.warm_versions = max(1, count)
+
+            active_version = self._active.model_version if self._active and self._active.is_trained else None
+            candidates = [name for name in reversed(self.registry.version_names()) if name != active_version]
+            for version in reversed(candidates[:self.warm_versions - (1 if active_version else 0)]):
+                try:
+                    self.load_version(version)
+                except Exception as e:
+                    logger.warning(f"Could not preload model version {version}: {e}")
+
+            logger.info(f"Warm model versions: {self.warm_version_names()}")
+            return self.warm_version_names()
+
+    def activate(self, version: str, background_models: Sequence[str] = ()) -> Dict[str, Any]:
+        """
+        Serve a registered version and point the registry's `current` at it
+
+        Returns:
+            Activated and previous version, whether it was warm and the switch time
+
+        Raises:
+            ModelVersionNotFoundError: If the version is not registered
+        """
+        with self._activate_lock:
+            start_time = time.perf_counter()
+            was_warm = version in self._warm
+
+            detector = self.load_version(version, background_models)
+            previous = self.swap(detector)
+            self.registry.set_current(version)
+
+            return {
+                'model_version': version,
+                'previous_version': previous.model_version if previous else None,
+                'warm': was_warm,
+                'switch_ms': round((time.perf_counter() - start_time) * 1000, 3),
+            }
+
+    def rollback(self) -> Dict[str, Any]:
+        """
+        Activate the version registered before the active one
+
+        Raises:
+            ModelVersionNotFoundError: If there is no earlier version
+        """
+        with self._activate_lock:
+            active_version = self._active.model_version if self._active else None
+            target = self.registry.previous_version(active_version)
+            if target is None:
+                raise ModelVersionNotFoundError(f"No model version before {active_version}")
+
+            logger.warning(f"Rolling back model version {active_version} to {target}")
+            return self.activate(target)
+
+    def load_current(self, background_models: Sequence[str] = ()) -> bool:
+        """
+        Serve the registry's current version and preload the warm pool
+
+        A model directory in the pre-registry flat layout is imported as the first
+        version.
+
+        Returns:
+            True if a version is now served, False if there is nothing to load
+
+        Raises:
+            ModelImportError: If the model path holds flat-layout artifacts that cannot be loaded
+        """
+        version = self.registry.current_version() or self._import_flat_directory()
+        if version is None:
+            return False
+
+        self.activate(version, background_models)
+        self.preload()
+        return True
+
+    def sync_current(self) -> Optional[Dict[str, Any]]:
+        """
+        Serve the registry's current version if another process has changed it
+
+        Returns:
+            Activation record, or None if the active version is already current
+        """
+        version = self.registry.current_version()
+        if version is None or (self._active is not None and self._active.model_version == version):
+            return None
+
+        logger.info(f"Registry current version changed to {version}")
+        return self.activate(version)
+
+    def _import_flat_directory(self) -> Optional[str]:
+        """Register the artifacts saved directly in the model path, if any"""
+        root = self.registry.root
+        if not any(os.path.exists(os.path.join(root, name)) for name in (BUNDLE_FILENAME, 'model_metadata.pkl')):
+            return None
+
+        detector = self.detector_factory()
+        try:
+            detector.load_models(root)
+        except Exception as e:
+            raise ModelImportError(f"Could not import the models saved in {root}: {e}") from e
+        if not detector.is_trained:
+            raise ModelImportError(f"Could not import the models saved in {root}; see the load errors above")
+
+        version = self.registry.import_directory(root, detector)
+        self.registry.set_current(version)
+        logger.info(f"Imported models from {root} as version {version}")
+        return version
+
+    def publish(self, detector: CarbonFraudDetector, **metadata) -> str:
+        """
+        Save a detector trained in this process as a new version and serve it
+
+        Returns:
+            Registered version
+        """
+        if detector.inference_dtype != np.float64:
+            # Served in reduced precision: record how far it deviates from float64
+            metadata.setdefault('precision_validation', detector.validate_precision(dtype=detector.inference_dtype))
+
+        staging_path = self.registry.create_staging()
+        try:
+            detector.save_models(staging_path)
+            write_version_metadata(staging_path, detector, metadata)
+            version = self.registry.register(staging_path)
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+        with self._activate_lock:
+            detector.model_version = version
+            detector.model_path = self.registry.version_path(version)
+            self._add_warm(version, detector)
+            self.activate(version)
+        return version
+
+    def start_retrain(self, **train_options) -> Dict[str, Any]:
+        """
+        Start retraining in the background
+
+        Args:
+            train_options: 'shard_directory' to stream from shards, 'distill_student' to
+                distill a student from the new ensemble, otherwise keyword arguments of
+                CarbonFraudDetector.train_models (e.g. parallel)
+
+        Returns:
+            Retrain status
+
+        Raises:
+            RetrainInProgressError: If a retrain is already running
+        """
+        if not self._retrain_lock.acquire(blocking=False):
+            raise RetrainInProgressError("A retrain is already running")
+
+        self.retrain_status = {
+            'state': 'running',
+            'started_at': datetime.utcnow().isoformat(),
+            'options': train_options,
+            'serving_version': self._active.model_version if self._active else None,
+        }
+        threading.Thread(target=self._run_retrain, args=(train_options,), name='model-retrain', daemon=True).start()
+        return dict(self.retrain_status)
+
+    def train_version(self, **train_options) -> Dict[str, Any]:
+        """
+        Train in a worker process, register the new version and serve it (blocking)
+
+        Args:
+            train_options: See start_retrain
+
+        Returns:
+            Activation record of the new version
+        """
+        staging_path = self.registry.create_staging()
+        try:
+            run_training_process(staging_path, train_options)
+            version = self.registry.register(staging_path)
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+        return self.activate(version)
+
+    def _run_retrain(self, train_options: Dict[str, Any]):
+        """Train in a worker process, register the new version and swap it in"""
+        start_time = time.perf_counter()
+
+        try:
+            activation = self.train_version(**train_options)
+            self.retrain_status.update({
+                'state': 'completed',
+                'model_version': activation['model_version'],
+                'previous_version': activation['previous_version'],
+                'duration_seconds': round(time.perf_counter() - start_time, 1),
+                'finished_at': datetime.utcnow().isoformat(),
+            })
+
+        except Exception as e:
+            logger.error(f"Background retrain failed: {e}")
+            self.retrain_status.update({
+                'state': 'failed',
+                'error': str(e),
+                'finished_at': datetime.utcnow().isoformat(),
+            })
+
+        finally:
+            self._retrain_lock.release()
+
+
+def run_training_process(output_path: str, train_options: Dict[str, Any]):
+    """
+    Train in a fresh interpreter running this module
+
+    A fresh process does not re-import the serving entry point (which starts the API
+    and MQTT client) and does not inherit its framework or thread state.
+    """
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+
+    completed = subprocess.run(
+        [sys.executable, '-m', 'models.model_manager', os.path.abspath(output_path), json.dumps(train_options)],
+        cwd=package_root, env=env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Training process exited with status {completed.returncode}")
+
+
+def train_detector(output_path: str, train_options: Dict[str, Any]) -> str:
+    """
+    Train a fresh detector and save its artifacts and version record (runs in the
+    retrain worker process)
+
+    Returns:
+        Version of the trained models
+    """
+    logging.basicConfig(level=logging.INFO)
+    os.makedirs(output_path, exist_ok=True)
+
+    options = dict(train_options)
+    distill = options.pop('distill_student', False)
+    detector = CarbonFraudDetector(model_path=output_path, cache_size=0)
+    if options.get('shard_directory'):
+        detector.train_from_shards(options.pop('shard_directory'))
+    else:
+        options.pop('shard_directory', None)
+        detector.train_models(**options)
+    if distill:
+        distill_student(detector)
+    detector.save_models(output_path)
+    write_version_metadata(output_path, detector, {'training_options': train_options})
+
+    return detector.model_version
+
+
+def main():
+    """Retrain worker entry point: train and save a detector into a directory"""
+    parser = argparse.ArgumentParser(description="Train fraud detection models into a directory")
+    parser.add_argument('output_path', help="Directory to save the trained artifacts to")
+    parser.add_argument('options', nargs='?', default='{}', help="JSON training options")
+    args = parser.parse_args()
+
+    version = train_detector(args.output_path, json.loads(args.options))
+    logger.info(f"Trained model version {version} into {args.output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Model Names
+Names of the ensemble members and the distilled student, shared by the detector,
+the model registry and the API without importing the detector itself
+"""
+
+# Framework each ensemble member is trained with
+MODEL_BACKENDS = {
+    'random_forest': 'sklearn',
+    'xgboost': 'xgboost',
+    'neural_network': 'tensorflow',
+    'isolation_forest': 'sklearn',
+}
+TREE_MODELS = ('random_forest', 'xgboost', 'isolation_forest')
+
+# Compact model distilled from the weighted ensemble score (see models.distillation)
+STUDENT_MODEL = 'student'
+SERVING_MODES = ('ensemble', 'student')
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Versioned Model Registry
+Keeps every trained model set in its own directory under <root>/versions/<version>/
+together with a version.json record (training time, feature schema version, hold-out
+metrics, measured inference latency). A `current` pointer file names the version to
+serve; it is rewritten atomically, so activating or rolling back a version never
+touches the artifacts themselves
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from models.model_names import STUDENT_MODEL
+from models.synthetic_data import SyntheticDataGenerator
+
+if TYPE_CHECKING:
+    from models.fraud_detection import CarbonFraudDetector
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIRNAME = 'versions'
+CURRENT_FILENAME = 'current'
+VERSION_METADATA_FILENAME = 'version.json'
+STAGING_PREFIX = '.staging-'
+
+
+class ModelVersionNotFoundError(KeyError):
+    """Raised when a model version is not in the registry"""
+
+
+class ModelRegistry:
+    """Directory of immutable, versioned model artifact sets with a current pointer"""
+
+    def __init__(self, root: str):
+        """
+        Initialize model registry
+
+        Args:
+            root: Registry directory (the detector's model path)
+        """
+        self.root = root
+        self.versions_path = os.path.join(root, VERSIONS_DIRNAME)
+
+    def version_path(self, version: str) -> str:
+        """Directory holding the artifacts of a version"""
+        return os.path.join(self.versions_path, version)
+
+    def has_version(self, version: str) -> bool:
+        return os.path.isfile(os.path.join(self.version_path(version), VERSION_METADATA_FILENAME))
+
+    def metadata(self, version: str) -> Dict[str, Any]:
+        """
+        Read the version.json record of a version
+
+        Raises:
+            ModelVersionNotFoundError: If the version is not registered
+        """
+        if not self.has_version(version):
+            raise ModelVersionNotFoundError(version)
+
+        with open(os.path.join(self.version_path(version), VERSION_METADATA_FILENAME)) as f:
+            return json.load(f)
+
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """Metadata of every registered version, oldest first"""
+        if not os.path.isdir(self.versions_path):
+            return []
+
+        records = [
+            self.metadata(name) for name in os.listdir(self.versions_path)
+            if not name.startswith('.') and self.has_version(name)
+        ]
+        return sorted(records, key=lambda record: (record.get('registered_at', ''), record['model_version']))
+
+    def version_names(self) -> List[str]:
+        """Registered versions, oldest first"""
+        return [record['model_version'] for record in self.list_versions()]
+
+    def current_version(self) -> Optional[str]:
+        """Version named by the current pointer, or None for an empty registry"""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILENAME)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+
+        return version if version and self.has_version(version) else None
+
+    def set_current(self, version: str):
+        """
+        Point `current` at a version
+
+        The pointer is written next to its destination and renamed into place.
+
+        Raises:
+            ModelVersionNotFoundError: If the version is not registered
+        """
+        if not self.has_version(version):
+            raise ModelVersionNotFoundError(version)
+
+        pointer = os.path.join(self.root, CURRENT_FILENAME)
+        temp_path = f"{pointer}.tmp-{os.getpid()}"
+        with open(temp_path, 'w') as f:
+            f.write(version + '\n')
+        os.replace(temp_path, pointer)
+
+        logger.info(f"Current model version is now {version}")
+
+    def previous_version(self, version: Optional[str]) -> Optional[str]:
+        """Newest version registered before the given one (the rollback target)"""
+        versions = self.version_names()
+        if version not in versions:
+            return versions[-1] if versions else None
+
+        index = versions.index(version)
+        return versions[index - 1] if index > 0 else None
+
+    def create_staging(self) -> str:
+        """Create an empty directory to train a new version into"""
+        os.makedirs(self.versions_path, exist_ok=True)
+        path = os.path.join(self.versions_path, f"{STAGING_PREFIX}{os.getpid()}-{int(time.time() * 1000)}")
+        os.makedirs(path)
+        return path
+
+    def register(self, staging_path: str) -> str:
+        """
+        Publish a staged version
+
+        The staging directory must contain the saved artifacts and a version.json
+        record (see write_version_metadata). It is renamed into versions/<version>,
+        so a version directory is never observed half-written.
+
+        Returns:
+            Registered version name
+        """
+        with open(os.path.join(staging_path, VERSION_METADATA_FILENAME)) as f:
+            record = json.load(f)
+
+        version = record['model_version']
+        if os.path.exists(self.version_path(version)):
+            # Two trainings finished within the same second
+            suffix = 1
+            while os.path.exists(self.version_path(f"{version}.{suffix}")):
+                suffix += 1
+            version = f"{version}.{suffix}"
+
+        record.update({'model_version': version, 'registered_at': datetime.utcnow().isoformat()})
+        _write_json(os.path.join(staging_path, VERSION_METADATA_FILENAME), record)
+
+        os.rename(staging_path, self.version_path(version))
+        logger.info(f"Registered model version {version}")
+        return version
+
+    def import_directory(self, source: str, detector: 'CarbonFraudDetector') -> str:
+        """
+        Register the artifacts of a flat model directory (the pre-registry layout)
+
+        Args:
+            source: Directory written by CarbonFraudDetector.save_models
+            detector: Detector loaded from source, used for the version record
+
+        Returns:
+            Registered version name
+        """
+        staging_path = self.create_staging()
+        try:
+            for name in os.listdir(source):
+                path = os.path.join(source, name)
+                if os.path.isfile(path) and name != CURRENT_FILENAME:
+                    shutil.copy2(path, staging_path)
+
+            write_version_metadata(staging_path, detector, {'imported_from': os.path.abspath(source)})
+            return self.register(staging_path)
+
+        except Exception:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            raise
+
+    def remove(self, version: str):
+        """
+        Delete a version that is not current
+
+        Raises:
+            ValueError: If the version is the current one
+        """
+        if version == self.current_version():
+            raise ValueError(f"Cannot remove the current model version {version}")
+        shutil.rmtree(self.version_path(version))
+
+
+def measure_inference_latency(detector: 'CarbonFraudDetector', batch_sizes: Sequence[int] = (1, 100, 1000),
+                              repeats: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Time the scoring path of a trained detector on synthetic feature rows
+
+    The result cache and feature extraction are bypassed, so the numbers compare
+    the models themselves across versions.
+
+    Returns:
+        p50/p99 milliseconds per batch and microseconds per row, by batch size
+    """
+    rows = SyntheticDataGenerator(seed=0, schema=detector.feature_schema).generate(max(batch_sizes))[0]
+    detector._score_feature_matrix(rows[:1])  # Warm-up
+
+    latency = {}
+    for batch_size in batch_sizes:
+        batch = rows[:batch_size]
+        timings = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            detector._score_feature_matrix(batch)
+            timings.append((time.perf_counter() - start_time) * 1000)
+
+        p50, p99 = np.percentile(timings, [50, 99])
+        latency[f"batch_{batch_size}"] = {
+            'p50_ms': round(float(p50), 3),
+            'p99_ms': round(float(p99), 3),
+            'per_row_us': round(float(p50) * 1000 / batch_size, 2),
+        }
+
+    return latency
+
+
+def write_version_metadata(path: str, detector: 'CarbonFraudDetector', extra: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Write the version.json record of a trained detector saved in path
+
+    Returns:
+        The written record
+    """
+    student = detector.serving_models.get(STUDENT_MODEL)
+    record = {
+        'model_version': detector.model_version or datetime.utcnow().strftime('%Y%m%d-%H%M%S'),
+        'created_at': datetime.utcnow().isoformat(),
+        'feature_schema_version': detector.feature_schema.version,
+        'evaluation_metrics': detector.evaluation_metrics,
+        'inference_latency': measure_inference_latency(detector),
+        'models': detector.loaded_model_names(),
+        'distillation': student.metadata.get('distillation') if student is not None else None,
+        'artifacts': sorted(name for name in os.listdir(path) if name != VERSION_METADATA_FILENAME),
+        **(extra or {}),
+    }
+    _write_json(os.path.join(path, VERSION_METADATA_FILENAME), record)
+    return record
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    temp_path = f"{path}.tmp-{os.getpid()}"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
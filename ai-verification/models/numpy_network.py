@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+NumPy Inference Runtime for the Fraud Detection Neural Network
+Exports the dense layers of a trained Keras model into plain NumPy arrays and
+evaluates the forward pass without TensorFlow. Dropout is an identity at inference
+time and is dropped, and the StandardScaler is folded into the first dense layer
+so serving takes raw feature rows
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ACTIVATIONS = {
+    'linear': lambda z: z,
+    'relu': lambda z: np.maximum(z, 0, out=z),
+    'tanh': np.tanh,
+    # Numerically stable logistic function
+    'sigmoid': lambda z: np.exp(-np.logaddexp(0, -z)),
+}
+
+
+class NumpyDenseNetwork:
+    """Inference-only forward pass of a stack of dense layers"""
+
+    def __init__(self, weights: List[np.ndarray], biases: List[np.ndarray], activations: List[str]):
+        """
+        Initialize network from exported layer parameters
+
+        Args:
+            weights: Kernel matrix of each dense layer, shape (inputs, units)
+            biases: Bias vector of each dense layer, shape (units,)
+            activations: Activation name of each dense layer
+        """
+        if not (len(weights) == len(biases) == len(activations)):
+            raise ValueError("weights, biases and activations must have one entry per layer")
+
+        for activation in activations:
+            if activation not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation for NumPy inference: {activation}")
+
+        self.weights = weights
+        self.biases = biases
+        self.activations = list(activations)
+
+    @property
+    def input_dim(self) -> int:
+        return self.weights[0].shape[0]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.weights[0].dtype
+
+    def astype(self, dtype: type) -> 'NumpyDenseNetwork':
+        """Copy of the network whose parameters, and therefore forward pass, use dtype"""
+        dtype = np.dtype(dtype)
+        return NumpyDenseNetwork([kernel.astype(dtype) for kernel in self.weights],
+                                 [bias.astype(dtype) for bias in self.biases], self.activations)
+
+    @classmethod
+    def from_keras(cls, model, scaler=None) -> 'NumpyDenseNetwork':
+        """
+        Export a trained Keras Sequential model of Dense and Dropout layers
+
+        Args:
+            model: Trained Keras model
+            scaler: Optional fitted StandardScaler applied to the model inputs,
+                folded into the first dense layer
+
+        Returns:
+            NumpyDenseNetwork producing the same outputs from unscaled features
+        """
+        weights, biases, activations = [], [], []
+
+        for layer in model.layers:
+            layer_type = type(layer).__name__
+            if layer_type == 'Dropout':
+                continue  # Identity at inference time
+            if layer_type != 'Dense':
+                raise ValueError(f"Cannot export layer '{layer.name}' of type {layer_type}")
+
+            kernel, bias = layer.get_weights()
+            weights.append(kernel.astype(np.float64))
+            biases.append(bias.astype(np.float64))
+            activations.append(layer.get_config()['activation'])
+
+        if scaler is not None:
+            weights[0], biases[0] = fold_standard_scaler(weights[0], biases[0], scaler)
+
+        logger.info(f"Exported {len(weights)} dense layers for NumPy inference")
+        return cls(weights, biases, activations)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Run the forward pass
+
+        Args:
+            X: Feature matrix of shape (num_rows, input_dim)
+
+        Returns:
+            Output of the final unit for every row, shape (num_rows,)
+        """
+        activations = np.atleast_2d(X).astype(self.dtype, copy=False)
+        for kernel, bias, activation in zip(self.weights, self.biases, self.activations):
+            activations = ACTIVATIONS[activation](activations @ kernel + bias)
+        return activations[:, 0]
+
+    def to_state(self) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """Split the network into numeric arrays and JSON-serializable parameters"""
+        arrays = {}
+        for i, (kernel, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"kernel_{i}"] = kernel
+            arrays[f"bias_{i}"] = bias
+        return arrays, {'activations': self.activations}
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], params: Dict[str, Any]) -> 'NumpyDenseNetwork':
+        """Rebuild a network from to_state() output (arrays may be read-only views)"""
+        activations = params['activations']
+        weights = [arrays[f"kernel_{i}"] for i in range(len(activations))]
+        biases = [arrays[f"bias_{i}"] for i in range(len(activations))]
+        return cls(weights, biases, activations)
+
+    def save(self, path: str):
+        """Save exported layer parameters to a .npz archive"""
+        arrays, params = self.to_state()
+        np.savez(path, activations=np.array(params['activations']), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyDenseNetwork':
+        """Load exported layer parameters from a .npz archive"""
+        with np.load(path) as archive:
+            arrays = {name: archive[name] for name in archive.files if name != 'activations'}
+            activations = [str(name) for name in archive['activations']]
+        return cls.from_state(arrays, {'activations': activations})
+
+
+def fold_standard_scaler(kernel: np.ndarray, bias: np.ndarray, scaler) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fold (x - mean) / scale into a dense layer acting on scaled inputs
+
+    Returns:
+        Tuple of (kernel, bias) acting directly on unscaled inputs
+    """
+    mean = scaler.mean_ if getattr(scaler, 'with_mean', True) and scaler.mean_ is not None else 0.0
+    scale = scaler.scale_ if getattr(scaler, 'with_std', True) and scaler.scale_ is not None else 1.0
+
+    mean = np.broadcast_to(np.asarray(mean, dtype=np.float64), (kernel.shape[0],))
+    scale = np.broadcast_to(np.asarray(scale, dtype=np.float64), (kernel.shape[0],))
+
+    folded_kernel = kernel / scale[:, None]
+    folded_bias = bias - (mean / scale) @ kernel
+    return folded_kernel, folded_bias
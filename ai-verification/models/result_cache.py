@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Verification Result Cache
+Bounded LRU cache with per-entry expiry for verification results. MQTT QoS 1
+redeliveries and sensor retries submit identical readings repeatedly; entries are
+keyed by a digest of the reading's feature vector, so a verdict is only reused for
+a reading with identical features, and are dropped whenever the serving models change
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+
+class ResultCacheTotals:
+    """Counters summed over several caches, e.g. those of every detector a process serves"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def add(self, counter: str, amount: int = 1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache invalidated by model generation"""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic, totals: Optional[ResultCacheTotals] = None):
+        """
+        Initialize result cache
+
+        Args:
+            max_size: Maximum number of cached results (0 disables caching)
+            ttl_seconds: Seconds an entry stays valid after it is stored
+            clock: Monotonic time source
+            totals: Optional counters that outlive this cache, also incremented on every lookup
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.totals = totals
+        self.generation = 0
+
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._count('misses')
+                return None
+
+            expires_at, value = entry
+            if self.clock() >= expires_at:
+                del self._entries[key]
+                self._count('expirations')
+                self._count('misses')
+                return None
+
+            self._entries.move_to_end(key)
+            self._count('hits')
+            return value
+
+    def put(self, key: Hashable, value: Any, generation: int):
+        """
+        Store a value computed by the given model generation
+
+        Values computed before the most recent invalidation are discarded.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if generation != self.generation:
+                return
+
+            self._entries[key] = (self.clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._count('evictions')
+
+    def _count(self, counter: str):
+        """Increment a counter (called with the lock held)"""
+        self._counters[counter] += 1
+        if self.totals is not None:
+            self.totals.add(counter)
+
+    def invalidate(self):
+        """Drop every entry; called whenever the serving models change"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._counters['invalidations'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy"""
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hit_rate': round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+            }
+
+
+def feature_digest(feature_row: np.ndarray) -> str:
+    """Canonical digest of a feature vector"""
+    row = np.ascontiguousarray(feature_row, dtype=np.float64)
+    return hashlib.blake2b(row.tobytes(), digest_size=16).hexdigest()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Prometheus Service Metrics
+Minimal counters, gauges and histograms rendered in the Prometheus text exposition
+format (0.0.4). Recording is a dict lookup, a bisect and an addition under a lock,
+cheap enough for the request path; values that already live elsewhere (queue depth,
+cache counters, model state) are read by collectors at scrape time instead
+"""
+
+import math
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Request latency bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Metric(ABC):
+    """Base of a metric family with a fixed set of label names"""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """Header and sample lines in the text exposition format"""
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label combination"""
+
+    metric_type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                                for labels, value in values]
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label combination"""
+
+    metric_type = 'gauge'
+
+    def set(self, value: float, *labelvalues: str):
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(Metric):
+    """Cumulative bucket counts, count and sum per label combination"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                # Bucket counts (last is +Inf), then count and sum
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0, 0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+
+        lines = self.header()
+        bounds = self.buckets + (float('inf'),)
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(bounds, values[:len(bounds)]):
+                cumulative += count
+                lines.append(histogram_sample(self.name, self.labelnames, labels, bound, cumulative))
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {values[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(values[-1])}")
+        return lines
+
+
+def histogram_sample(name: str, labelnames: Sequence[str], labels: Sequence[str], bound: float, count: int) -> str:
+    """One `_bucket` line of a histogram"""
+    return f"{name}_bucket{_format_labels(tuple(labelnames) + ('le',), tuple(labels) + (_format_value(bound),))} {count}"
+
+
+class MetricsRegistry:
+    """Metric families plus scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+        self._lock = threading.Lock()
+
+    def _add(self, metric: Metric) -> Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]):
+        """Register a callable returning metrics built fresh at every scrape"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the text exposition format"""
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class StaticMetric(Metric):
+    """Scrape-time metric rendered from precomputed sample lines"""
+
+    def __init__(self, name: str, documentation: str, metric_type: str, samples: List[str]):
+        super().__init__(name, documentation)
+        self.metric_type = metric_type
+        self.samples = samples
+
+    def render(self) -> List[str]:
+        return self.header() + self.samples
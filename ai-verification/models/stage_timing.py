@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Per-Stage Latency Instrumentation
+StageClock splits one verification call into contiguous laps (cache lookup, feature
+extraction, each model, post-processing) with a single perf_counter read per lap.
+Laps feed rolling histograms that keep the most recent observations for percentiles
+plus cumulative bucket counts, so recording costs a deque append and a bisect
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Histogram bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0)
+
+DEFAULT_WINDOW_SIZE = 2048
+
+
+class StageClock:
+    """Lap timer for the stages of one call; each lap runs from the previous lap to now"""
+
+    __slots__ = ('timings', '_start', '_last')
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, stage: str):
+        """Charge the time since the previous lap to stage (in milliseconds)"""
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + (now - self._last) * 1000.0
+        self._last = now
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the clock was created"""
+        return (time.perf_counter() - self._start) * 1000.0
+
+
+class RollingHistogram:
+    """Latency histogram over a sliding window of observations with cumulative bucket counts"""
+
+    def __init__(self, window_size: int = DEFAULT_WINDOW_SIZE, buckets_ms: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        """
+        Initialize histogram
+
+        Args:
+            window_size: Recent observations kept for percentiles
+            buckets_ms: Ascending bucket upper bounds in milliseconds
+        """
+        self.buckets_ms = tuple(buckets_ms)
+        self._window: deque = deque(maxlen=window_size)
+        self._bucket_counts = [0] * (len(self.buckets_ms) + 1)  # Last bucket is +Inf
+        self._count = 0
+        self._sum_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float):
+        with self._lock:
+            self._window.append(value_ms)
+            self._bucket_counts[bisect_left(self.buckets_ms, value_ms)] += 1
+            self._count += 1
+            self._sum_ms += value_ms
+
+    def cumulative(self) -> Tuple[List[Tuple[float, int]], int, float]:
+        """
+        Counts since start in Prometheus form
+
+        Returns:
+            Tuple of ([(upper bound ms, observations <= bound)], total count, total ms);
+            the last bound is +Inf
+        """
+        with self._lock:
+            counts, count, total = list(self._bucket_counts), self._count, self._sum_ms
+
+        bounds = self.buckets_ms + (float('inf'),)
+        return list(zip(bounds, np.cumsum(counts).tolist())), count, total
+
+    def snapshot(self) -> Dict[str, object]:
+        """Percentiles and bucket counts of the window, and totals since start"""
+        with self._lock:
+            window = np.fromiter(self._window, dtype=np.float64, count=len(self._window))
+            count, total = self._count, self._sum_ms
+
+        summary: Dict[str, object] = {'count': count, 'mean_ms': round(total / count, 4) if count else 0.0,
+                                      'window': int(window.size)}
+        if window.size:
+            p50, p95, p99 = np.percentile(window, [50, 95, 99])
+            bucket_counts = np.bincount(np.searchsorted(self.buckets_ms, window, side='left'),
+                                        minlength=len(self.buckets_ms) + 1)
+            summary.update({
+                'p50_ms': round(float(p50), 4),
+                'p95_ms': round(float(p95), 4),
+                'p99_ms': round(float(p99), 4),
+                'max_ms': round(float(window.max()), 4),
+                'histogram': {
+                    (f"le_{bound:g}ms" if bound != float('inf') else 'le_inf'): int(bucket_count)
+                    for bound, bucket_count in zip(self.buckets_ms + (float('inf'),), bucket_counts)
+                },
+            })
+        return summary
+
+
+class StageLatencyRecorder:
+    """Rolling histograms keyed by stage name"""
+
+    def __init__(self, window_size: int = DEFAULT_WINDOW_SIZE, buckets_ms: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.window_size = window_size
+        self.buckets_ms = buckets_ms
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> RollingHistogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, RollingHistogram(self.window_size, self.buckets_ms))
+        return histogram
+
+    def observe(self, stage: str, value_ms: float):
+        self.histogram(stage).observe(value_ms)
+
+    def observe_many(self, timings: Dict[str, float]):
+        for stage, value_ms in timings.items():
+            self.histogram(stage).observe(value_ms)
+
+    def stages(self) -> List[str]:
+        return sorted(self._histograms)
+
+    def snapshot(self, stages: Optional[List[str]] = None) -> Dict[str, Dict[str, object]]:
+        """Summaries of the given (default: all) stages"""
+        return {stage: self._histograms[stage].snapshot()
+                for stage in (stages or self.stages()) if stage in self._histograms}
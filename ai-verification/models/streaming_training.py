@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Out-of-Core Streaming Training
+Trains the fraud detection ensemble from a directory of CSV/Parquet shards of labelled
+historical readings without loading the dataset into memory. The scaler is fitted
+incrementally, XGBoost trains from an external-memory quantile matrix, the network
+trains chunk by chunk, and the Random Forest and Isolation Forest are fitted on a
+fixed-size reservoir sample, so peak memory depends on the chunk and sample sizes only
+"""
+
+import glob
+import logging
+import os
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Sequence, Tuple
+
+import numpy as np
+
+from models.backends import BACKENDS
+from models.ensemble_training import build_neural_network, fit_member, keras_seed
+from models.feature_extraction import FeatureExtractor
+from models.feature_schema import FEATURE_SCHEMA, FeatureSchema
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SHARD_PATTERNS = ('*.csv', '*.csv.gz', '*.parquet')
+
+
+class ShardedDataset:
+    """Labelled historical readings stored as CSV/Parquet shards, read in bounded chunks"""
+
+    def __init__(self, directory: str, schema: FeatureSchema = FEATURE_SCHEMA, label_column: str = 'label',
+                 chunk_rows: int = 100_000, holdout_fraction: float = 0.2, seed: int = 42):
+        """
+        Initialize sharded dataset
+
+        Shards hold either the schema's feature columns or flattened reading payloads
+        (e.g. measurements.co2_ppm, timestamp) that are run through the FeatureExtractor,
+        plus a label column with 1 = legitimate and 0 = fraudulent.
+
+        Args:
+            directory: Directory containing the shards
+            schema: Feature schema of the produced matrices
+            label_column: Name of the label column
+            chunk_rows: Rows read per chunk
+            holdout_fraction: Share of rows set aside for validation
+            seed: Seed of the deterministic train/holdout split
+        """
+        self.shards = sorted(path for pattern in SHARD_PATTERNS for path in glob.glob(os.path.join(directory, pattern)))
+        if not self.shards:
+            raise FileNotFoundError(f"No CSV or Parquet shards found in {directory}")
+
+        self.schema = schema
+        self.extractor = FeatureExtractor(schema)
+        self.label_column = label_column
+        self.chunk_rows = chunk_rows
+        self.holdout_fraction = holdout_fraction
+        self.seed = seed
+
+    def iter_chunks(self, split: str = 'train', shard_order: Sequence[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Stream (features, labels) chunks
+
+        Args:
+            split: 'train', 'holdout' or 'all'
+            shard_order: Optional permutation of shard indices to read in
+
+        Yields:
+            Tuples of (unscaled feature matrix, labels)
+        """
+        for shard_index in (shard_order if shard_order is not None else range(len(self.shards))):
+            for chunk_index, frame in enumerate(self._read_shard(self.shards[shard_index])):
+                X, y = self._to_arrays(frame)
+
+                if split != 'all':
+                    # The split depends only on the chunk position, so every pass sees the same rows
+                    rng = np.random.default_rng([self.seed, shard_index, chunk_index])
+                    holdout = rng.random(y.shape[0]) < self.holdout_fraction
+                    keep = holdout if split == 'holdout' else ~holdout
+                    X, y = X[keep], y[keep]
+
+                if y.shape[0]:
+                    yield X, y
+
+    def _read_shard(self, path: str) -> Iterator['pd.DataFrame']:
+        """Read one shard in chunks of chunk_rows"""
+        if path.endswith('.parquet'):
+            parquet = BACKENDS.get('pyarrow', 'parquet')
+            for batch in parquet.ParquetFile(path).iter_batches(batch_size=self.chunk_rows):
+                yield batch.to_pandas()
+        else:
+            pd = BACKENDS.get('pandas')
+            yield from pd.read_csv(path, chunksize=self.chunk_rows)
+
+    def _to_arrays(self, frame: 'pd.DataFrame') -> Tuple[np.ndarray, np.ndarray]:
+        """Convert a chunk into a feature matrix and label vector"""
+        if self.label_column not in frame.columns:
+            raise ValueError(f"Shard chunk has no '{self.label_column}' column")
+
+        y = frame[self.label_column].to_numpy(dtype=int)
+        frame = frame.drop(columns=[self.label_column])
+
+        if all(name in frame.columns for name in self.schema.names):
+            # Precomputed features: missing cells take the schema default
+            X = frame[list(self.schema.names)].to_numpy(dtype=np.float64)
+            missing = np.isnan(X)
+            if missing.any():
+                X[missing] = np.broadcast_to(self.schema.defaults, X.shape)[missing]
+        else:
+            X = self.extractor.transform(frame)
+
+        return X, y
+
+
+class ReservoirSample:
+    """Fixed-size uniform sample of a stream of labelled rows (Algorithm R)"""
+
+    def __init__(self, capacity: int, num_features: int, rng: np.random.Generator):
+        self.capacity = capacity
+        self.X = np.empty((capacity, num_features))
+        self.y = np.empty(capacity, dtype=int)
+        self.rng = rng
+        self.seen = 0
+
+    def add(self, X: np.ndarray, y: np.ndarray):
+        """Offer a chunk of rows to the sample"""
+        filled = min(self.seen, self.capacity)
+
+        # Fill phase: keep rows until the reservoir is full
+        take = min(self.capacity - filled, X.shape[0])
+        self.X[filled:filled + take] = X[:take]
+        self.y[filled:filled + take] = y[:take]
+
+        # Replacement phase: row t replaces a random slot with probability capacity / (t + 1)
+        rest = np.arange(take, X.shape[0])
+        if rest.size:
+            positions = self.seen + rest
+            slots = (self.rng.random(rest.size) * (positions + 1)).astype(np.int64)
+            accepted = slots < self.capacity
+            self.X[slots[accepted]] = X[rest[accepted]]
+            self.y[slots[accepted]] = y[rest[accepted]]
+
+        self.seen += X.shape[0]
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        size = min(self.seen, self.capacity)
+        return self.X[:size], self.y[:size]
+
+
+class StreamingTrainer:
+    """Fit every ensemble member from a ShardedDataset with bounded memory"""
+
+    def __init__(self, dataset: ShardedDataset, rf_params: Dict[str, Any], xgb_params: Dict[str, Any],
+                 nn_params: Dict[str, Any], iforest_params: Dict[str, Any], sample_size: int = 200_000,
+                 holdout_size: int = 50_000, nn_epochs: int = 5):
+        """
+        Initialize streaming trainer
+
+        Args:
+            dataset: Sharded training data
+            rf_params, xgb_params, nn_params, iforest_params: Model hyperparameters
+            sample_size: Reservoir size used to fit the Random Forest and Isolation Forest
+            holdout_size: Reservoir size of the validation sample
+            nn_epochs: Passes over the shards when training the network
+        """
+        self.dataset = dataset
+        self.rf_params = rf_params
+        self.xgb_params = xgb_params
+        self.nn_params = nn_params
+        self.iforest_params = iforest_params
+        self.sample_size = sample_size
+        self.holdout_size = holdout_size
+        self.nn_epochs = nn_epochs
+
+    def train(self) -> Tuple[Dict[str, Any], Any, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Train the ensemble
+
+        Returns:
+            Tuple of (models by name, fitted StandardScaler, (holdout X, holdout y))
+        """
+        num_features = len(self.dataset.schema)
+        rng = np.random.default_rng(self.dataset.seed)
+
+        # Pass 1: incremental scaler fit and reservoir samples
+        scaler = BACKENDS.get('sklearn', 'preprocessing').StandardScaler()
+        sample = ReservoirSample(self.sample_size, num_features, rng)
+        holdout = ReservoirSample(self.holdout_size, num_features, rng)
+        for X, y in self.dataset.iter_chunks('train'):
+            scaler.partial_fit(X)
+            sample.add(X, y)
+        for X, y in self.dataset.iter_chunks('holdout'):
+            holdout.add(X, y)
+
+        if sample.seen == 0:
+            raise ValueError("Shards contain no training rows")
+        if holdout.seen == 0:
+            # The network is validated and every model evaluated on the holdout rows
+            raise ValueError(f"Shards contain no holdout rows (holdout_fraction={self.dataset.holdout_fraction}); "
+                             f"raise holdout_fraction or add data")
+        logger.info(f"Streaming {sample.seen} training rows and {holdout.seen} holdout rows "
+                    f"from {len(self.dataset.shards)} shards")
+
+        X_sample, y_sample = sample.arrays()
+        X_holdout, y_holdout = holdout.arrays()
+
+        models = {
+            # Tree ensembles fitted on the reservoir sample
+            'random_forest': fit_member('random_forest', self.rf_params, X_sample, y_sample),
+            'isolation_forest': fit_member('isolation_forest', self.iforest_params, scaler.transform(X_sample)),
+            'xgboost': self._train_xgboost(),
+            'neural_network': self._train_neural_network(scaler, (scaler.transform(X_holdout), y_holdout)),
+        }
+        return models, scaler, (X_holdout, y_holdout)
+
+    def _train_xgboost(self) -> Any:
+        """Train XGBoost from an external-memory quantile matrix over the training chunks"""
+        xgb = BACKENDS.get('xgboost')
+        dataset = self.dataset
+
+        class ShardIterator(xgb.DataIter):
+            """Feeds training chunks to XGBoost, which caches quantized pages on disk"""
+
+            def __init__(self, cache_prefix: str):
+                self._chunks = None
+                super().__init__(cache_prefix=cache_prefix)
+
+            def next(self, input_data) -> bool:
+                if self._chunks is None:
+                    self._chunks = dataset.iter_chunks('train')
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    return False
+                input_data(data=chunk[0], label=chunk[1])
+                return True
+
+            def reset(self):
+                self._chunks = None
+
+        params = dict(self.xgb_params)
+        num_boost_round = params.pop('n_estimators', 100)
+        booster_params = {
+            'objective': 'binary:logistic',
+            'tree_method': 'hist',
+            'eta': params.pop('learning_rate', 0.3),
+            'seed': params.pop('random_state', 0),
+            **params,
+        }
+
+        with tempfile.TemporaryDirectory(prefix='xgb-cache-') as cache_dir:
+            matrix = xgb.ExtMemQuantileDMatrix(ShardIterator(os.path.join(cache_dir, 'train')))
+            booster = xgb.train(booster_params, matrix, num_boost_round=num_boost_round)
+            del matrix  # Releases the cache pages before the directory is removed
+
+        # Wrap the booster so serving, compilation and importance reporting see an XGBClassifier
+        model = xgb.XGBClassifier(**self.xgb_params)
+        model.load_model(bytearray(booster.save_raw(raw_format='json')))
+        logger.info(f"Trained xgboost with {num_boost_round} rounds from external memory")
+        return model
+
+    def _train_neural_network(self, scaler: Any, validation_data: Tuple[np.ndarray, np.ndarray]) -> Any:
+        """Train the network one chunk at a time, visiting shards in a new order each epoch"""
+        rng = np.random.default_rng(self.nn_params['seed'])
+
+        with keras_seed(self.nn_params['seed']):
+            model = build_neural_network(len(self.dataset.schema))
+            for epoch in range(self.nn_epochs):
+                for X, y in self.dataset.iter_chunks('train', rng.permutation(len(self.dataset.shards))):
+                    model.fit(scaler.transform(X), y, batch_size=self.nn_params['batch_size'], epochs=1, verbose=0)
+
+                loss = model.evaluate(*validation_data, verbose=0)[0]
+                logger.info(f"Neural network epoch {epoch + 1}/{self.nn_epochs}: holdout loss {loss:.4f}")
+
+        return model
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Vectorized Synthetic Training Data Generator
+Draws every feature column for a block of rows at once from a seeded
+np.random.Generator and applies the four fraud patterns with boolean masks.
+Rows are generated in fixed-size blocks so temporaries stay small and 10M-row
+datasets fit in the memory of the output matrix alone
+"""
+
+import logging
+from typing import Iterator, Tuple, Union
+
+import numpy as np
+
+from models.feature_schema import (
+    FEATURE_SCHEMA, FeatureSchema,
+    CO2_PPM, TEMPERATURE, HUMIDITY, PRESSURE, BATTERY_LEVEL, SIGNAL_STRENGTH, ERROR_RATE,
+    TOTAL_READINGS, ACCURACY_SCORE, CONFIDENCE_INTERVAL, ANOMALY_SCORE, HOUR_OF_DAY,
+    DAY_OF_WEEK, DAY_OF_MONTH, MONTH_OF_YEAR, LATITUDE, LONGITUDE, ALTITUDE, CO2_DEVIATION,
+    TEMP_HUMIDITY_RATIO, PRESSURE_ALTITUDE_CONSISTENCY, SENSOR_RELIABILITY, HAS_DATA_HASH,
+    DATA_COMPLETENESS, READING_FREQUENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fraud patterns, drawn with equal probability for every fraudulent row
+EXTREME_VALUES, INCONSISTENT_DATA, POOR_QUALITY, FAKE_SENSOR = range(4)
+FRAUD_TYPES = ('extreme_values', 'inconsistent_data', 'poor_quality', 'fake_sensor')
+
+DEFAULT_BLOCK_SIZE = 1_000_000
+
+SeedLike = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+
+class SyntheticDataGenerator:
+    """Seeded generator of labelled synthetic sensor feature matrices"""
+
+    def __init__(self, seed: SeedLike = None, legitimate_fraction: float = 0.8,
+                 schema: FeatureSchema = FEATURE_SCHEMA, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Initialize generator
+
+        Args:
+            seed: Seed or np.random.Generator; None draws fresh entropy
+            legitimate_fraction: Share of legitimate rows (label 1); they come first
+            schema: Feature schema of the generated matrix
+            block_size: Rows drawn per vectorized block
+        """
+        self.rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self.legitimate_fraction = legitimate_fraction
+        self.schema = schema
+        self.block_size = block_size
+
+    def generate(self, num_samples: int, dtype: type = np.float64) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generate a labelled feature matrix
+
+        Args:
+            num_samples: Number of rows
+            dtype: Floating point dtype of the feature matrix
+
+        Returns:
+            Tuple of (feature matrix, labels) with 1 = legitimate and 0 = fraudulent
+        """
+        data = self.schema.empty_matrix(num_samples, dtype)
+        labels = np.empty(num_samples, dtype=int)
+
+        for start, block, block_labels in self.iter_blocks(num_samples, dtype):
+            data[start:start + block.shape[0]] = block
+            labels[start:start + block.shape[0]] = block_labels
+
+        return data, labels
+
+    def iter_blocks(self, num_samples: int, dtype: type = np.float64) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        """
+        Generate a labelled dataset block by block
+
+        Yields:
+            Tuples of (first row index, feature block, label block)
+        """
+        legitimate_samples = int(num_samples * self.legitimate_fraction)
+        logger.info(f"Generating {num_samples} training samples "
+                    f"({legitimate_samples} legitimate, {num_samples - legitimate_samples} fraudulent)...")
+
+        for start in range(0, num_samples, self.block_size):
+            stop = min(start + self.block_size, num_samples)
+            labels = (np.arange(start, stop) < legitimate_samples).astype(int)
+            yield start, self._generate_block(labels, dtype), labels
+
+    def _generate_block(self, labels: np.ndarray, dtype: type) -> np.ndarray:
+        """Draw a block of rows: legitimate readings everywhere, then fraud patterns on label 0"""
+        rng = self.rng
+        n = labels.shape[0]
+        block = self.schema.empty_matrix(n, dtype)
+
+        # Base legitimate readings with realistic variations
+        co2_base = rng.normal(420, 50, n)  # Slightly elevated CO2 with variation
+        temp = rng.normal(22, 5, n)
+        humidity = rng.normal(50, 15, n)
+        pressure = rng.normal(1013, 10, n)
+
+        block[:, CO2_PPM] = np.clip(co2_base, 300, 600)
+        block[:, TEMPERATURE] = np.clip(temp, 0, 50)
+        block[:, HUMIDITY] = np.clip(humidity, 20, 90)
+        block[:, PRESSURE] = np.clip(pressure, 900, 1100)
+        block[:, BATTERY_LEVEL] = rng.normal(90, 10, n)
+        block[:, SIGNAL_STRENGTH] = rng.normal(60, 15, n)
+        block[:, ERROR_RATE] = rng.exponential(0.02, n)  # Low error rate
+        block[:, TOTAL_READINGS] = rng.integers(100, 10000, n)
+        block[:, ACCURACY_SCORE] = rng.normal(0.95, 0.03, n)
+        block[:, CONFIDENCE_INTERVAL] = rng.normal(0.05, 0.02, n)
+        block[:, ANOMALY_SCORE] = rng.exponential(0.05, n)
+        block[:, HOUR_OF_DAY] = rng.integers(0, 24, n)
+        block[:, DAY_OF_WEEK] = rng.integers(0, 7, n)
+        block[:, DAY_OF_MONTH] = rng.integers(1, 32, n)
+        block[:, MONTH_OF_YEAR] = rng.integers(1, 13, n)
+        block[:, LATITUDE] = rng.uniform(-90, 90, n)
+        block[:, LONGITUDE] = rng.uniform(-180, 180, n)
+        block[:, ALTITUDE] = rng.exponential(100, n)
+        block[:, CO2_DEVIATION] = np.abs(co2_base - 400)
+        block[:, TEMP_HUMIDITY_RATIO] = temp / np.maximum(humidity, 1)
+        block[:, PRESSURE_ALTITUDE_CONSISTENCY] = rng.normal(0.9, 0.1, n)
+        block[:, SENSOR_RELIABILITY] = rng.normal(0.9, 0.1, n)
+        block[:, HAS_DATA_HASH] = 1
+        block[:, DATA_COMPLETENESS] = rng.normal(0.95, 0.05, n)
+        block[:, READING_FREQUENCY] = rng.exponential(10, n)
+
+        fraud_rows = np.flatnonzero(labels == 0)
+        if fraud_rows.size:
+            self._apply_fraud_patterns(block, fraud_rows)
+
+        return block
+
+    def _apply_fraud_patterns(self, block: np.ndarray, fraud_rows: np.ndarray):
+        """Overwrite fraudulent rows with one of the four suspicious patterns each"""
+        rng = self.rng
+        fraud_type = rng.integers(0, len(FRAUD_TYPES), fraud_rows.size)
+
+        # Impossible or extreme CO2 values, too low or too high with equal probability
+        rows = fraud_rows[fraud_type == EXTREME_VALUES]
+        co2 = np.where(rng.random(rows.size) < 0.5,
+                       rng.uniform(50, 200, rows.size), rng.uniform(2000, 5000, rows.size))
+        block[rows, CO2_PPM] = co2
+        block[rows, CO2_DEVIATION] = np.abs(co2 - 400)
+
+        # Inconsistent environmental readings
+        rows = fraud_rows[fraud_type == INCONSISTENT_DATA]
+        block[rows, PRESSURE_ALTITUDE_CONSISTENCY] = rng.uniform(0, 0.5, rows.size)
+        block[rows, TEMP_HUMIDITY_RATIO] = rng.uniform(0, 0.1, rows.size)  # Unrealistic
+
+        # Poor sensor quality indicators
+        rows = fraud_rows[fraud_type == POOR_QUALITY]
+        block[rows, ACCURACY_SCORE] = rng.uniform(0.3, 0.7, rows.size)
+        block[rows, ERROR_RATE] = rng.uniform(0.1, 0.5, rows.size)
+        block[rows, ANOMALY_SCORE] = rng.uniform(0.2, 0.8, rows.size)
+        block[rows, SENSOR_RELIABILITY] = rng.uniform(0.2, 0.6, rows.size)
+
+        # Fake sensor with perfect readings (suspicious)
+        rows = fraud_rows[fraud_type == FAKE_SENSOR]
+        block[rows, CO2_PPM] = 400  # Exactly atmospheric
+        block[rows, TEMPERATURE] = 20.0  # Too perfect
+        block[rows, HUMIDITY] = 50.0
+        block[rows, ACCURACY_SCORE] = 1.0  # Suspiciously perfect
+        block[rows, ANOMALY_SCORE] = 0.0
+        block[rows, HAS_DATA_HASH] = 0  # Missing integrity check
+
+
+def generate_synthetic_data(num_samples: int, seed: SeedLike = None,
+                            dtype: type = np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """Generate a labelled synthetic feature matrix (see SyntheticDataGenerator)"""
+    return SyntheticDataGenerator(seed).generate(num_samples, dtype)
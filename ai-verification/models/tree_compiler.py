@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Tree Ensemble Compiler for Fraud Detection Inference
+Flattens the RandomForest, XGBoost, IsolationForest and gradient boosted student
+ensembles into contiguous node
+arrays (feature, threshold, left, right, value) and scores them with a vectorized
+evaluator that walks every tree of the ensemble for a whole batch at once, without
+going back through scikit-learn or XGBoost
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.backends import BACKENDS
+
+logger = logging.getLogger(__name__)
+
+# Aggregation of per-tree leaf values into the model score
+MEAN_PROBABILITY = 'mean_probability'  # RandomForest predict_proba[:, 1]
+SIGMOID_MARGIN = 'sigmoid_margin'  # XGBoost binary:logistic predict_proba[:, 1]
+ISOLATION_SCORE = 'isolation_score'  # IsolationForest decision_function
+CLIPPED_SUM = 'clipped_sum'  # GradientBoostingRegressor predict, clipped to [0, 1]
+
+# Rows scored per traversal pass, bounding the (rows x trees) working arrays
+DEFAULT_CHUNK_SIZE = 256
+
+
+@dataclass
+class CompiledTreeEnsemble:
+    """Tree ensemble flattened into contiguous node arrays"""
+    aggregation: str
+    feature: np.ndarray  # int32 split feature per node (0 for leaves)
+    threshold: np.ndarray  # float64 split threshold per node (+inf for leaves)
+    left: np.ndarray  # int32 left child per node; leaves point to themselves
+    right: np.ndarray  # int32 right child per node, always left + 1 for split nodes
+    value: np.ndarray  # float64 leaf output per node
+    roots: np.ndarray  # int32 root node of every tree
+    default_left: np.ndarray  # bool direction taken by missing (NaN) values
+    max_depth: int
+    strict_split: bool = False  # True: go left on x < threshold, False: x <= threshold
+    base_score: float = 0.0  # Added to the aggregated leaf values
+    score_scale: float = 1.0  # IsolationForest path length normaliser
+    input_mean: Optional[np.ndarray] = None  # Optional input standardisation
+    input_scale: Optional[np.ndarray] = None
+    metadata: Dict = field(default_factory=dict)
+
+    @property
+    def num_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.feature)
+
+    def predict(self, X: np.ndarray, chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+        """
+        Score a batch of feature rows
+
+        Args:
+            X: Feature matrix of shape (num_rows, num_features), or a single row
+            chunk_size: Maximum rows traversed per pass
+
+        Returns:
+            Model score for every row, shape (num_rows,)
+        """
+        X = np.atleast_2d(X)
+        if X.shape[0] <= chunk_size:
+            return self._aggregate(self._leaf_sum(X))
+        return np.concatenate([
+            self._aggregate(self._leaf_sum(X[start:start + chunk_size])) for start in range(0, X.shape[0], chunk_size)
+        ])
+
+    def astype(self, dtype: type) -> 'CompiledTreeEnsemble':
+        """
+        Copy with thresholds and leaf values stored in dtype
+
+        Inputs are compared as float32 either way, and float32 thresholds are rounded
+        towards the side that keeps every such comparison exact, so split decisions on
+        the same input rows do not change. Input standardisation stays float64: a
+        rounded mean or scale would move standardised inputs across thresholds. Leaf
+        values lose precision but are still summed in float64.
+        """
+        dtype = np.dtype(dtype)
+        return replace(
+            self,
+            threshold=cast_thresholds(self.threshold, dtype, self.strict_split),
+            value=self.value.astype(dtype),
+        )
+
+    def _leaf_sum(self, X: np.ndarray) -> np.ndarray:
+        """Walk every tree for every row and sum the reached leaf values"""
+        if self.input_mean is not None:
+            X = (X - self.input_mean) / self.input_scale
+
+        # Both scikit-learn and XGBoost evaluate splits on float32 inputs
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        num_rows, num_features = X.shape
+        num_trees = self.num_trees
+        flat_X = X.ravel()
+        check_missing = bool(np.isnan(flat_X).any())
+
+        # One (row, tree) pair per walk; pairs are dropped from the active set once they reach a leaf
+        leaf_values = np.empty(num_rows * num_trees, dtype=np.float64)
+        positions = np.arange(num_rows * num_trees, dtype=np.int32)
+        offsets = np.repeat(np.arange(num_rows, dtype=np.int32) * num_features, num_trees)
+        node = np.tile(self.roots, num_rows)
+
+        while node.size:
+            threshold = self.threshold.take(node)
+            at_leaf = threshold == np.inf
+            # Leaves loop onto themselves, so finished pairs are only compacted away in bulk
+            if np.count_nonzero(at_leaf) * 4 >= node.size:
+                finished = np.flatnonzero(at_leaf)
+                leaf_values[positions.take(finished)] = self.value.take(node.take(finished))
+                active = np.flatnonzero(~at_leaf)
+                node, positions, offsets, threshold = (
+                    node.take(active), positions.take(active), offsets.take(active), threshold.take(active)
+                )
+
+            x = flat_X.take(offsets + self.feature.take(node))
+            go_right = x >= threshold if self.strict_split else x > threshold
+            if check_missing:
+                go_right = np.where(np.isnan(x), ~self.default_left.take(node), go_right)
+            # Sibling nodes are stored next to each other, so the next node is left + (went right)
+            node = self.left.take(node) + go_right
+
+        return leaf_values.reshape(num_rows, num_trees).sum(axis=1)
+
+    def _aggregate(self, leaf_sum: np.ndarray) -> np.ndarray:
+        """Turn summed leaf values into the model score"""
+        if self.aggregation == MEAN_PROBABILITY:
+            return leaf_sum / self.num_trees
+        if self.aggregation == SIGMOID_MARGIN:
+            return np.exp(-np.logaddexp(0, -(leaf_sum + self.base_score)))
+        if self.aggregation == ISOLATION_SCORE:
+            return -(2 ** (-leaf_sum / self.score_scale)) - self.base_score
+        if self.aggregation == CLIPPED_SUM:
+            return np.clip(leaf_sum + self.base_score, 0.0, 1.0)
+        raise ValueError(f"Unknown aggregation: {self.aggregation}")
+
+    def to_state(self) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """Split the ensemble into numeric arrays and JSON-serializable parameters"""
+        arrays = {name: getattr(self, name) for name in _ARRAY_FIELDS}
+        if self.input_mean is not None:
+            arrays['input_mean'] = self.input_mean
+            arrays['input_scale'] = self.input_scale
+        params = {name: getattr(self, name) for name in _PARAM_FIELDS}
+        return arrays, params
+
+    @classmethod
+    def from_state(cls, arrays: Dict[str, np.ndarray], params: Dict[str, Any]) -> 'CompiledTreeEnsemble':
+        """Rebuild an ensemble from to_state() output (arrays may be read-only views)"""
+        return cls(**arrays, **params)
+
+    def save(self, path: str):
+        """Save node arrays and parameters to a .npz archive"""
+        arrays, params = self.to_state()
+        np.savez(path, params=np.array(json.dumps(params)), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> 'CompiledTreeEnsemble':
+        """Load a compiled ensemble saved with save()"""
+        with np.load(path) as archive:
+            arrays = {name: archive[name] for name in archive.files if name != 'params'}
+            params = json.loads(str(archive['params']))
+        return cls.from_state(arrays, params)
+
+
+_ARRAY_FIELDS = ('feature', 'threshold', 'left', 'right', 'value', 'roots', 'default_left')
+_PARAM_FIELDS = ('aggregation', 'max_depth', 'strict_split', 'base_score', 'score_scale', 'metadata')
+
+
+class _NodeArrayBuilder:
+    """Accumulates trees into shared node arrays"""
+
+    def __init__(self):
+        self.feature: List[np.ndarray] = []
+        self.threshold: List[np.ndarray] = []
+        self.left: List[np.ndarray] = []
+        self.right: List[np.ndarray] = []
+        self.value: List[np.ndarray] = []
+        self.default_left: List[np.ndarray] = []
+        self.roots: List[int] = []
+        self.num_nodes = 0
+        self.max_depth = 0
+
+    def add_tree(self, left: np.ndarray, right: np.ndarray, feature: np.ndarray, threshold: np.ndarray,
+                 value: np.ndarray, default_left: np.ndarray):
+        """Append one tree given per-node arrays where leaves have left == right == -1"""
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+
+        # Renumber breadth-first so the two children of every split are adjacent
+        order = [0]
+        new_ids = np.empty(len(left), dtype=np.int64)
+        new_ids[0] = 0
+        for old_id in order:
+            if left[old_id] >= 0:
+                new_ids[left[old_id]] = len(order)
+                new_ids[right[old_id]] = len(order) + 1
+                order.extend((left[old_id], right[old_id]))
+        order = np.asarray(order, dtype=np.int64)
+
+        is_leaf = left[order] < 0
+        local_ids = np.arange(len(order), dtype=np.int64)
+        # Leaves loop back onto themselves so traversal can run a fixed number of steps
+        local_left = np.where(is_leaf, local_ids, new_ids[np.maximum(left[order], 0)])
+        local_right = np.where(is_leaf, local_ids, local_left + 1)
+
+        self.feature.append(np.where(is_leaf, 0, np.asarray(feature)[order]))
+        self.threshold.append(np.where(is_leaf, np.inf, np.asarray(threshold, dtype=np.float64)[order]))
+        self.left.append(local_left + self.num_nodes)
+        self.right.append(local_right + self.num_nodes)
+        self.value.append(np.where(is_leaf, np.asarray(value, dtype=np.float64)[order], 0.0))
+        self.default_left.append(is_leaf | np.asarray(default_left, dtype=bool)[order])
+        self.roots.append(self.num_nodes)
+        self.num_nodes += len(order)
+        self.max_depth = max(self.max_depth, int(node_depths(local_left, local_right).max()))
+
+    def build(self, aggregation: str, **params) -> CompiledTreeEnsemble:
+        return CompiledTreeEnsemble(
+            aggregation=aggregation,
+            feature=np.concatenate(self.feature).astype(np.int32),
+            threshold=np.concatenate(self.threshold).astype(np.float64),
+            left=np.concatenate(self.left).astype(np.int32),
+            right=np.concatenate(self.right).astype(np.int32),
+            value=np.concatenate(self.value).astype(np.float64),
+            roots=np.asarray(self.roots, dtype=np.int32),
+            default_left=np.concatenate(self.default_left),
+            max_depth=self.max_depth,
+            **params
+        )
+
+
+def node_depths(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Depth of every node of a single tree whose leaves point to themselves"""
+    depths = np.zeros(len(left), dtype=np.int64)
+    frontier = np.array([0])
+    depth = 0
+    while frontier.size:
+        depths[frontier] = depth
+        children = np.concatenate([left[frontier], right[frontier]])
+        frontier = np.unique(children[children != np.concatenate([frontier, frontier])])
+        depth += 1
+    return depths
+
+
+def _sklearn_tree_arrays(tree, feature_map: Optional[np.ndarray] = None):
+    """Extract per-node arrays from a fitted scikit-learn tree_"""
+    feature = tree.feature.astype(np.int64)
+    if feature_map is not None:
+        feature = np.where(tree.children_left < 0, 0, np.asarray(feature_map)[np.maximum(feature, 0)])
+    missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8))
+    return tree.children_left, tree.children_right, feature, tree.threshold, np.asarray(missing_left, dtype=bool)
+
+
+def compile_random_forest(model, positive_class_index: int = 1) -> CompiledTreeEnsemble:
+    """Compile a fitted RandomForestClassifier scoring predict_proba[:, positive_class_index]"""
+    builder = _NodeArrayBuilder()
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        left, right, feature, threshold, default_left = _sklearn_tree_arrays(tree)
+        class_weights = tree.value[:, 0, :]
+        totals = class_weights.sum(axis=1)
+        probability = np.divide(class_weights[:, positive_class_index], totals,
+                                out=np.zeros_like(totals), where=totals > 0)
+        builder.add_tree(left, right, feature, threshold, probability, default_left)
+
+    logger.info(f"Compiled RandomForest: {builder.num_nodes} nodes, max depth {builder.max_depth}")
+    return builder.build(MEAN_PROBABILITY)
+
+
+def compile_xgboost(model) -> CompiledTreeEnsemble:
+    """Compile a fitted binary:logistic XGBClassifier (or Booster) scoring predict_proba[:, 1]"""
+    xgb = BACKENDS.get('xgboost')
+
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    dump = json.loads(booster.save_raw(raw_format='json'))
+    learner = dump['learner']
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Only binary:logistic boosters can be compiled, got {objective}")
+
+    builder = _NodeArrayBuilder()
+    for tree in learner['gradient_booster']['model']['trees']:
+        if any(tree.get('split_type', [])):
+            raise ValueError("Categorical splits are not supported by the compiled evaluator")
+        left = np.asarray(tree['left_children'])
+        # Split conditions are float32 values; leaves store their output in split_conditions
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32).astype(np.float64)
+        builder.add_tree(
+            left, np.asarray(tree['right_children']), np.asarray(tree['split_indices']),
+            conditions, conditions, np.asarray(tree['default_left'], dtype=bool)
+        )
+
+    compiled = builder.build(SIGMOID_MARGIN, strict_split=True)
+
+    # Recover the base margin from the booster itself rather than its serialised form
+    probe = np.zeros((1, int(learner['learner_model_param']['num_feature'])), dtype=np.float32)
+    margin = float(booster.predict(xgb.DMatrix(probe), output_margin=True)[0])
+    compiled.base_score = margin - float(compiled._leaf_sum(probe)[0])
+
+    logger.info(f"Compiled XGBoost: {builder.num_nodes} nodes, max depth {builder.max_depth}")
+    return compiled
+
+
+def compile_gradient_boosting(model) -> CompiledTreeEnsemble:
+    """Compile a fitted squared error GradientBoostingRegressor, clipping predict to [0, 1]"""
+    init = getattr(model.init_, 'constant_', None)
+    if init is None:
+        raise ValueError("Only gradient boosting with the default mean initial estimator can be compiled")
+
+    builder = _NodeArrayBuilder()
+    for estimator in model.estimators_[:, 0]:
+        tree = estimator.tree_
+        left, right, feature, threshold, default_left = _sklearn_tree_arrays(tree)
+        # Shrinkage is folded into the leaf values
+        builder.add_tree(left, right, feature, threshold, tree.value[:, 0, 0] * model.learning_rate, default_left)
+
+    logger.info(f"Compiled GradientBoosting: {builder.num_nodes} nodes, max depth {builder.max_depth}")
+    return builder.build(CLIPPED_SUM, base_score=float(np.ravel(init)[0]))
+
+
+def average_path_length(num_samples: np.ndarray) -> np.ndarray:
+    """Average path length of an unsuccessful BST search over num_samples points"""
+    num_samples = np.asarray(num_samples, dtype=np.float64)
+    lengths = np.zeros_like(num_samples)
+    lengths[num_samples == 2] = 1.0
+    large = num_samples > 2
+    n = num_samples[large]
+    lengths[large] = 2.0 * (np.log(n - 1.0) + np.euler_gamma) - 2.0 * (n - 1.0) / n
+    return lengths
+
+
+def compile_isolation_forest(model, scaler=None) -> CompiledTreeEnsemble:
+    """
+    Compile a fitted IsolationForest scoring decision_function
+
+    Args:
+        model: Fitted IsolationForest
+        scaler: Optional fitted StandardScaler applied to the model inputs;
+            the compiled evaluator then takes unscaled features
+    """
+    builder = _NodeArrayBuilder()
+    for estimator, features in zip(model.estimators_, model.estimators_features_):
+        tree = estimator.tree_
+        left, right, feature, threshold, default_left = _sklearn_tree_arrays(tree, feature_map=features)
+        leaf_left = np.where(left < 0, np.arange(len(left)), left)
+        leaf_right = np.where(right < 0, np.arange(len(right)), right)
+        # Path length to each leaf plus the expected depth of its unresolved samples
+        path_length = node_depths(leaf_left, leaf_right) + average_path_length(tree.n_node_samples)
+        builder.add_tree(left, right, feature, threshold, path_length, default_left)
+
+    score_scale = float(len(model.estimators_) * average_path_length([model.max_samples_])[0])
+    input_mean = input_scale = None
+    if scaler is not None:
+        input_mean = np.asarray(scaler.mean_, dtype=np.float64)
+        input_scale = np.asarray(scaler.scale_, dtype=np.float64)
+
+    logger.info(f"Compiled IsolationForest: {builder.num_nodes} nodes, max depth {builder.max_depth}")
+    return builder.build(
+        ISOLATION_SCORE, base_score=float(model.offset_), score_scale=score_scale,
+        input_mean=input_mean, input_scale=input_scale
+    )
+
+
+def cast_thresholds(threshold: np.ndarray, dtype: np.dtype, strict_split: bool) -> np.ndarray:
+    """
+    Cast split thresholds without changing any decision on float32 inputs
+
+    For x <= t the threshold is rounded down to the largest representable value not
+    above t, for x < t up to the smallest value not below t.
+    """
+    cast = threshold.astype(dtype)
+    if np.dtype(dtype).itemsize >= threshold.dtype.itemsize:
+        return cast
+
+    if strict_split:
+        return np.where(cast < threshold, np.nextafter(cast, dtype.type(np.inf)), cast)
+    return np.where(cast > threshold, np.nextafter(cast, dtype.type(-np.inf)), cast)
+
+
+def max_deviation(compiled: CompiledTreeEnsemble, reference_scores: np.ndarray, X: np.ndarray) -> float:
+    """Largest absolute difference between compiled and reference scores on X"""
+    return float(np.max(np.abs(compiled.predict(X) - np.asarray(reference_scores, dtype=np.float64)), initial=0.0))
@@ -0,0 +1,108 @@
+"""Shared fixtures: a small detector trained once per session on synthetic data"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.fraud_detection import CarbonFraudDetector  # noqa: E402
+
+# Small ensemble so the session trains in seconds
+SMALL_PARAMS = {
+    'rf_params': {'n_estimators': 20, 'max_depth': 8},
+    'xgb_params': {'n_estimators': 20, 'max_depth': 4},
+    'nn_params': {'epochs': 2},
+    'iforest_params': {'n_estimators': 20},
+}
+
+
+def make_detector(model_path: str, **kwargs) -> CarbonFraudDetector:
+    """Detector with the small test ensemble parameters"""
+    detector = CarbonFraudDetector(model_path=model_path, **kwargs)
+    for name, params in SMALL_PARAMS.items():
+        getattr(detector, name).update(params)
+    return detector
+
+
+@pytest.fixture(scope='session')
+def training_data():
+    return make_detector('unused').generate_training_data(1200, seed=7)
+
+
+@pytest.fixture(scope='session')
+def trained_detector(tmp_path_factory, training_data):
+    """Trained detector with the result cache disabled"""
+    detector = make_detector(str(tmp_path_factory.mktemp('models')), cache_size=0)
+    detector.train_models(*training_data)
+    return detector
+
+
+@pytest.fixture
+def untrained_detector(tmp_path):
+    """Fresh detector with the small ensemble parameters and no result cache"""
+    return make_detector(str(tmp_path / 'models'), cache_size=0)
+
+
+@pytest.fixture
+def readings():
+    """Sensor payloads covering normal, extreme, incomplete and malformed readings"""
+    base = {
+        'sensor_id': 'sensor-1',
+        'timestamp': '2024-05-01T10:00:00Z',
+        'measurements': {'co2_ppm': 410, 'temperature': 21, 'humidity': 48, 'pressure': 1012},
+        'sensor_status': {'battery_level': 90, 'signal_strength': -60, 'error_rate': 0.01, 'total_readings': 500},
+        'data_quality': {'accuracy_score': 0.96, 'confidence_interval': 0.04, 'anomaly_score': 0.02},
+        'location': {'lat': 40.7, 'lon': -74.0, 'altitude': 10},
+        'data_hash': 'abc123',
+    }
+    return [
+        base,
+        {**base, 'sensor_id': 'sensor-2', 'timestamp': '2024-02-29T23:59:59+02:00',
+         'measurements': {'co2_ppm': 5200, 'temperature': 75, 'humidity': 3, 'pressure': 640}},
+        {**base, 'sensor_id': 'sensor-3', 'data_hash': None,
+         'sensor_status': {'battery_level': 5, 'error_rate': 0.4}},
+        {'sensor_id': 'sensor-4'},
+        {**base, 'sensor_id': 'sensor-5', 'timestamp': 'not a timestamp'},
+    ]
+
+
+@pytest.fixture(scope='session')
+def legacy_model_dir(tmp_path_factory, trained_detector):
+    """Model directory in the layout written by the original save_models: framework
+    pickles, the Keras HDF5 file and metadata without a feature schema"""
+    import pickle
+
+    import joblib
+
+    path = tmp_path_factory.mktemp('legacy_models')
+    for name in ('random_forest', 'xgboost', 'isolation_forest'):
+        joblib.dump(trained_detector._require_model(name), path / f"{name}.pkl")
+    joblib.dump(trained_detector._require_scaler(), path / 'scaler.pkl')
+    trained_detector.models['neural_network'].save(str(path / 'neural_network.h5'))
+
+    with open(path / 'feature_importance.pkl', 'wb') as f:
+        pickle.dump(trained_detector.feature_importance, f)
+    with open(path / 'model_metadata.pkl', 'wb') as f:
+        pickle.dump({
+            'thresholds': trained_detector.thresholds,
+            'is_trained': True,
+            'training_timestamp': '2024-01-01T00:00:00',
+        }, f)
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def api(trained_detector):
+    """verification_api module serving the trained detector, without its background services"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api'))
+    os.environ['PREFORK_PARENT'] = 'true'
+    try:
+        import verification_api
+    finally:
+        del os.environ['PREFORK_PARENT']
+
+    verification_api.model_manager.swap(trained_detector)
+    verification_api.verification_api.models_ready.set()
+    return verification_api
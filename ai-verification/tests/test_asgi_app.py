@@ -0,0 +1,157 @@
+"""ASGI serving mode: parity with the Flask endpoints"""
+
+import asyncio
+import json
+from typing import List, Sequence, Tuple
+
+import pytest
+
+VOLATILE_FIELDS = ('timestamp', 'processing_time_ms', 'processing_time_seconds', 'throughput_per_second')
+
+
+@pytest.fixture(scope='module')
+def asgi(api):
+    import asgi_app
+
+    app = asgi_app.AsyncVerificationApp(wsgi_workers=2, inference_workers=2, max_body_bytes=64 * 1024)
+    yield app
+    app.wsgi_executor.shutdown()
+    app.inference_executor.shutdown()
+
+
+def call_asgi(app, method: str, path: str, body_chunks: Sequence[bytes] = (b'',),
+              query: bytes = b'', headers: List[Tuple[bytes, bytes]] = None) -> Tuple[int, bytes]:
+    """Run one HTTP request through an ASGI app and return the status and full body"""
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query, 'http_version': '1.1',
+        'headers': [(b'content-type', b'application/json')] + (headers or []),
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80), 'scheme': 'http', 'root_path': '',
+    }
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(body_chunks) - 1}
+                for i, chunk in enumerate(body_chunks)]
+    response = {'body': b''}
+
+    async def run():
+        finished = asyncio.Event()
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await finished.wait()  # The client stays connected until the response is complete
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            else:
+                response['body'] += message.get('body', b'')
+                if not message.get('more_body', False):
+                    finished.set()
+
+        await asyncio.wait_for(app(scope, receive, send), timeout=60)
+
+    asyncio.run(run())
+    return response['status'], response['body']
+
+
+def without_volatile(value):
+    """Response body without timing-dependent fields"""
+    if isinstance(value, dict):
+        return {key: without_volatile(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [without_volatile(item) for item in value]
+    return value
+
+
+@pytest.mark.parametrize('query', ['', 'detailed=true'])
+def test_verify_matches_flask(api, asgi, readings, query):
+    client = api.app.test_client()
+
+    for reading in readings[:3] + readings[4:]:
+        flask_response = client.post(f'/verify?{query}', json=reading)
+        status, body = call_asgi(asgi, 'POST', '/verify', [json.dumps(reading).encode()], query=query.encode())
+        asgi_body = json.loads(body)
+
+        flask_body = flask_response.get_json()
+
+        assert status == flask_response.status_code == 200
+        assert set(asgi_body) == set(flask_body)
+        # Stage timings differ per call; only their stages must match
+        assert set(asgi_body.pop('timings_ms', {})) == set(flask_body.pop('timings_ms', {}))
+        assert without_volatile(asgi_body) == without_volatile(flask_body)
+
+
+@pytest.mark.parametrize('body', [
+    b'',
+    b'not json',
+    b'[1, 2]',
+    json.dumps({'sensor_id': 'sensor-1', 'timestamp': '2024-05-01T10:00:00Z'}).encode(),
+])
+def test_invalid_verify_requests_match_flask(api, asgi, body):
+    flask_response = api.app.test_client().post('/verify', data=body, content_type='application/json')
+
+    status, asgi_body = call_asgi(asgi, 'POST', '/verify', [body])
+
+    assert status == flask_response.status_code == 400
+    assert json.loads(asgi_body) == flask_response.get_json()
+
+
+def test_batch_verify_matches_flask(api, asgi, readings):
+    batch = {'sensor_data_list': readings + ['not an object']}
+
+    flask_body = api.app.test_client().post('/batch-verify', json=batch).get_json()
+    status, body = call_asgi(asgi, 'POST', '/batch-verify', [json.dumps(batch).encode()])
+
+    assert status == 200
+    assert without_volatile(json.loads(body)) == without_volatile(flask_body)
+
+
+def test_malformed_batch_matches_flask(api, asgi):
+    body = b'{"sensor_data_list": ['
+    flask_response = api.app.test_client().post('/batch-verify', data=body, content_type='application/json')
+
+    status, asgi_body = call_asgi(asgi, 'POST', '/batch-verify', [body])
+
+    assert status == flask_response.status_code == 400
+    assert json.loads(asgi_body) == flask_response.get_json()
+
+
+def test_body_split_across_messages(api, asgi, readings):
+    payload = json.dumps(readings[0]).encode()
+
+    status, body = call_asgi(asgi, 'POST', '/verify', [payload[:10], payload[10:40], payload[40:]])
+
+    expected = api.app.test_client().post('/verify', json=readings[0]).get_json()
+    assert status == 200
+    assert json.loads(body)['verification_result']['score'] == expected['verification_result']['score']
+
+
+def test_oversized_body_is_rejected(asgi):
+    status, body = call_asgi(asgi, 'POST', '/verify', [b'{"sensor_id": "' + b'x' * (64 * 1024) + b'"}'])
+
+    assert status == 413
+    assert 'too large' in json.loads(body)['error']
+
+
+def test_other_endpoints_are_served_by_flask(api, asgi):
+    status, body = call_asgi(asgi, 'GET', '/health')
+
+    assert status == 200
+    assert set(json.loads(body)) == set(api.app.test_client().get('/health').get_json())
+    assert call_asgi(asgi, 'GET', '/no-such-endpoint')[0] == 404
+
+
+def test_stream_upload_in_arbitrary_chunks(asgi, readings):
+    upload = b''.join(json.dumps(reading).encode() + b'\n' for reading in readings[:3])
+    upload += b'{broken\n' + json.dumps(readings[3]).encode()  # Unterminated last line
+
+    status, body = call_asgi(asgi, 'POST', '/verify-stream', [upload[i:i + 37] for i in range(0, len(upload), 37)])
+
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert status == 200
+    assert [entry['index'] for entry in lines[:-1]] == [0, 1, 2, 3, 4]
+    assert 'Invalid JSON' in lines[3]['error']
+    assert lines[4]['sensor_id'] == 'sensor-4'
+    assert lines[-1]['batch_statistics']['total_items'] == 5
+    assert lines[-1]['batch_statistics']['failed'] == 1
+
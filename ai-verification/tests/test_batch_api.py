@@ -0,0 +1,28 @@
+"""/batch-verify and /verify request handling"""
+
+import json
+
+
+def test_non_object_items_are_errors_in_both_batch_formats(api, readings):
+    items = ['bad', readings[0], None, 42, readings[1]]
+    client = api.app.test_client()
+
+    response = client.post('/batch-verify', json={'sensor_data_list': items})
+    assert response.status_code == 200
+    json_entries = response.get_json()['batch_results']
+
+    response = client.post('/batch-verify?stream=true', json={'sensor_data_list': items})
+    assert response.mimetype == api.NDJSON_CONTENT_TYPE
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    ndjson_entries = [line for line in lines if 'index' in line]
+
+    assert ndjson_entries == json_entries
+    for i in (0, 2, 3):
+        assert json_entries[i] == {'index': i, 'sensor_id': None, 'error': api.NOT_AN_OBJECT_ERROR}
+    assert [entry['sensor_id'] for entry in json_entries if 'error' not in entry] == ['sensor-1', 'sensor-2']
+    assert lines[-1]['batch_statistics']['failed'] == 3
+
+
+def test_verify_rejects_non_object_body(api):
+    response = api.app.test_client().post('/verify', json=['sensor_id', 'timestamp', 'measurements'])
+    assert response.status_code == 400
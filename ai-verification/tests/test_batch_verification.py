@@ -0,0 +1,33 @@
+"""Batch verification against the per-reading path"""
+
+import pytest
+
+# BLAS picks its matrix kernel by batch shape, so the network output of a reading may
+# differ in the last bits between batch sizes; everything derived from it must agree
+SCORE_TOLERANCE = 1e-9
+
+
+def assert_same_results(actual, expected):
+    assert len(actual) == len(expected)
+    for result, reference in zip(actual, expected):
+        assert result.prediction == reference.prediction
+        assert result.anomaly_flags == reference.anomaly_flags
+        assert result.model_version == reference.model_version
+        assert result.score == pytest.approx(reference.score, rel=0, abs=SCORE_TOLERANCE * 100)
+        assert result.confidence == pytest.approx(reference.confidence, rel=0, abs=SCORE_TOLERANCE)
+        assert result.model_outputs == pytest.approx(reference.model_outputs, rel=0, abs=SCORE_TOLERANCE)
+        assert result.risk_factors == pytest.approx(reference.risk_factors, rel=0, abs=SCORE_TOLERANCE)
+
+
+def test_batch_matches_per_reading_results(trained_detector, readings):
+    batch = trained_detector.verify_batch(readings)
+    single = [trained_detector.verify_sensor_data(sensor_data) for sensor_data in readings]
+
+    assert_same_results(batch, single)
+
+
+def test_batch_results_do_not_depend_on_batch_neighbours(trained_detector, readings):
+    forward = trained_detector.verify_batch(readings)
+    backward = trained_detector.verify_batch(readings[::-1])[::-1]
+
+    assert_same_results(forward, backward)
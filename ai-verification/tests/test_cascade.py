@@ -0,0 +1,19 @@
+"""Early-exit cascade evaluation"""
+
+import pytest
+
+from models.fraud_detection import CarbonFraudDetector
+
+
+def test_evaluate_cascade_without_cascade_model(training_data, tmp_path):
+    detector = CarbonFraudDetector(model_path=str(tmp_path), cache_size=0)
+
+    with pytest.raises(ValueError, match="Cascade model 'neural_network' is not trained or loaded"):
+        detector.evaluate_cascade(*training_data)
+
+
+def test_evaluate_cascade_reports_every_margin(trained_detector, training_data):
+    report = trained_detector.evaluate_cascade(*training_data, margins=(0.0, 0.1))
+
+    assert report['cascade_model'] == trained_detector.cascade_model
+    assert [result['margin'] for result in report['margins']] == [0.0, 0.1]
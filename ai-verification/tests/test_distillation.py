@@ -0,0 +1,80 @@
+"""Ensemble distillation and student serving mode"""
+
+import numpy as np
+import pytest
+
+from models.distillation import MAX_STUDENT_DEPTH, MAX_STUDENT_TREES, distill_student
+from models.fraud_detection import CarbonFraudDetector
+from models.model_names import STUDENT_MODEL
+from models.model_registry import write_version_metadata
+
+
+@pytest.fixture(scope='module')
+def teacher(trained_detector, tmp_path_factory):
+    """Copy of the trained detector, since distillation installs a student on it"""
+    path = str(tmp_path_factory.mktemp('teacher'))
+    trained_detector.save_models(path)
+    detector = CarbonFraudDetector(model_path=path, cache_size=0)
+    detector.load_models(path)
+    return detector
+
+
+@pytest.fixture(scope='module')
+def report(teacher, training_data):
+    return distill_student(teacher, *training_data, params={'n_estimators': 30})
+
+
+def test_student_reproduces_the_ensemble(teacher, report, training_data):
+    X = training_data[0]
+    student = teacher.serving_models[STUDENT_MODEL]
+
+    assert report['holdout_rows'] == 240 and report['transfer_rows'] == 960
+    assert report['fidelity']['prediction_agreement'] >= 0.8
+    assert report['fidelity']['mean_abs_error'] < 0.1
+    assert np.abs(student.predict(X) - teacher.ensemble_scores(X)).mean() < 0.1
+    assert report['memory']['student_bytes'] < report['memory']['ensemble_bytes']
+    assert student.metadata['distillation'] is report
+
+
+def test_student_size_is_capped(teacher, training_data):
+    X, y = training_data[0][:300], training_data[1][:300]
+    probe = CarbonFraudDetector(model_path=teacher.model_path, cache_size=0)
+    probe.load_models()
+
+    capped = distill_student(probe, X, y, params={'n_estimators': 500, 'max_depth': 10})
+
+    assert (capped['params']['n_estimators'], capped['params']['max_depth']) == (MAX_STUDENT_TREES, MAX_STUDENT_DEPTH)
+    assert capped['memory']['student_trees'] == MAX_STUDENT_TREES
+
+
+def test_student_mode_scores_with_the_student(teacher, report, readings):
+    features = teacher.create_feature_matrix(readings)
+    ensemble = teacher.verify_batch(readings)
+
+    teacher.configure_serving_mode('student')
+    try:
+        served = teacher.verify_batch(readings)
+    finally:
+        teacher.configure_serving_mode('ensemble')
+
+    student_scores = teacher.serving_models[STUDENT_MODEL].predict(features)
+    assert [result.score for result in served] == pytest.approx((student_scores * 100).tolist())
+    assert all(set(result.model_outputs) == {STUDENT_MODEL, 'anomaly_score'} for result in served)
+    assert [result.score for result in teacher.verify_batch(readings)] == [result.score for result in ensemble]
+
+
+def test_unknown_serving_mode_is_rejected(teacher):
+    with pytest.raises(ValueError, match='Serving mode'):
+        teacher.configure_serving_mode('fastest')
+
+
+def test_saved_versions_keep_the_student(teacher, report, tmp_path):
+    teacher.save_models(str(tmp_path))
+    record = write_version_metadata(str(tmp_path), teacher)
+
+    loaded = CarbonFraudDetector(model_path=str(tmp_path), cache_size=0)
+    loaded.load_models()
+
+    assert STUDENT_MODEL in loaded.serving_models
+    assert STUDENT_MODEL in record['models']
+    assert record['distillation']['fidelity'] == report['fidelity']
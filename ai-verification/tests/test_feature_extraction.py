@@ -0,0 +1,108 @@
+"""Columnar feature extraction and bulk timestamp parsing"""
+
+import numpy as np
+import pytest
+
+from models.feature_extraction import FeatureExtractor
+from models.feature_schema import (
+    CO2_DEVIATION, CO2_PPM, DATA_COMPLETENESS, DAY_OF_MONTH, DAY_OF_WEEK, FEATURE_SCHEMA, HAS_DATA_HASH,
+    HOUR_OF_DAY, MONTH_OF_YEAR, PRESSURE_ALTITUDE_CONSISTENCY, READING_FREQUENCY, SENSOR_RELIABILITY,
+    SIGNAL_STRENGTH, TEMP_HUMIDITY_RATIO,
+)
+from models.timestamps import fixed_clock, parse_iso_timestamps
+
+NOW = '2024-03-10T12:00:00'
+
+
+def reading(**overrides):
+    base = {
+        'timestamp': '2024-02-29T21:59:59',
+        'measurements': {'co2_ppm': 410, 'temperature': 21, 'humidity': 48, 'pressure': 1012},
+        'sensor_status': {'battery_level': 90, 'signal_strength': -60, 'error_rate': 0.01, 'total_readings': 500},
+    }
+    return {**base, **overrides}
+
+
+def extract(readings):
+    return FeatureExtractor(clock=fixed_clock(NOW)).transform(readings)
+
+
+def test_offset_timestamps_are_converted_to_utc():
+    features = extract([
+        reading(),
+        reading(timestamp='2024-02-29T21:59:59Z'),
+        reading(timestamp='2024-02-29T23:59:59+02:00'),
+        reading(timestamp='2024-03-01T03:29:59+05:30'),
+    ])
+
+    for row in features:
+        np.testing.assert_array_equal(row, features[0])
+    assert features[0, HOUR_OF_DAY] == 21
+    assert features[0, DAY_OF_WEEK] == 3  # Thursday
+    assert (features[0, DAY_OF_MONTH], features[0, MONTH_OF_YEAR]) == (29, 2)
+    assert features[0, READING_FREQUENCY] == 500 / 9  # Whole days before NOW
+
+
+def test_numeric_strings_are_coerced_and_other_strings_use_defaults():
+    features = extract([
+        reading(),
+        reading(measurements={'co2_ppm': '410', 'temperature': '21', 'humidity': 48, 'pressure': 1012}),
+        reading(measurements={'co2_ppm': 'high', 'temperature': 21, 'humidity': 48, 'pressure': 1012}),
+    ])
+
+    np.testing.assert_array_equal(features[1], features[0])
+    assert features[1, CO2_PPM] == 410 and features[1, CO2_DEVIATION] == 10
+    np.testing.assert_array_equal(features[2], FEATURE_SCHEMA.default_row())
+
+
+def test_unparseable_timestamp_only_affects_its_own_row():
+    good = [reading(), reading(timestamp='2023-12-31T23:00:00'), reading(timestamp='2024-02-29T23:59:59+02:00')]
+    mixed = good[:1] + [reading(timestamp='not a timestamp')] + good[1:]
+
+    features = extract(mixed)
+
+    np.testing.assert_array_equal(features[[0, 2, 3]], extract(good))
+    np.testing.assert_array_equal(features[1], FEATURE_SCHEMA.default_row())
+
+
+def test_parse_iso_timestamps_falls_back_to_per_value_parsing():
+    values = ['2024-02-29T21:59:59', 'garbage', '2024-02-29T21:59:59Z', '2024-02-29T23:59:59+02:00', None, 42]
+
+    timestamps, valid = parse_iso_timestamps(values)
+
+    assert valid.tolist() == [True, False, True, True, False, False]
+    assert set(timestamps[valid].tolist()) == {np.datetime64('2024-02-29T21:59:59', 'us').item()}
+    assert np.isnat(timestamps[~valid]).all()
+
+
+def test_batch_rows_match_single_reading_extraction(readings):
+    features = extract(readings)
+
+    assert features.shape == (len(readings), len(FEATURE_SCHEMA))
+    for i, payload in enumerate(readings):
+        np.testing.assert_array_equal(features[i], extract([payload])[0])
+
+
+def test_derived_features():
+    row = extract([reading(location={'lat': 1, 'lon': 2, 'altitude': 0}, data_hash='abc')])[0]
+
+    assert row[SIGNAL_STRENGTH] == 60
+    assert row[TEMP_HUMIDITY_RATIO] == 21 / 48
+    assert row[SENSOR_RELIABILITY] == 0.9 * 0.99
+    assert row[PRESSURE_ALTITUDE_CONSISTENCY] == 1 - abs(1012 - 1013.25) / 1013.25
+    assert row[HAS_DATA_HASH] == 1
+    assert row[DATA_COMPLETENESS] == 21 / 22  # Altitude is the only zero raw field
+
+
+def test_flattened_dataframe_matches_record_path(readings):
+    pd = pytest.importorskip('pandas')
+    records = readings[:3] + [reading(data_hash=None, location={'lat': 5})]
+
+    np.testing.assert_array_equal(extract(pd.json_normalize(records)), extract(records))
+
+
+def test_create_features_returns_named_columns(trained_detector, readings):
+    features = trained_detector.create_features(readings[0])
+
+    assert tuple(features) == FEATURE_SCHEMA.names
+    assert features['co2_ppm'] == 410
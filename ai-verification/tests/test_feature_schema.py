@@ -0,0 +1,62 @@
+"""Feature schema layout and compatibility checks on stored artifacts"""
+
+import pickle
+import shutil
+
+import pytest
+
+from models.feature_schema import (
+    CO2_PPM, FEATURE_SCHEMA, LEGACY_SCHEMA, READING_FREQUENCY, FeatureSchema, FeatureSchemaMismatchError,
+    FeatureSpec,
+)
+
+
+def test_column_constants_match_schema_order():
+    assert len(FEATURE_SCHEMA) == 25
+    assert FEATURE_SCHEMA.names[CO2_PPM] == 'co2_ppm'
+    assert FEATURE_SCHEMA.names[READING_FREQUENCY] == 'reading_frequency'
+    assert FEATURE_SCHEMA.default_row().tolist() == [spec.default for spec in FEATURE_SCHEMA.features]
+
+
+def test_misplaced_feature_index_is_rejected():
+    with pytest.raises(ValueError, match="declared at index 1 but listed at 0"):
+        FeatureSchema('test', (FeatureSpec('co2_ppm', 1, 'float', 400),))
+
+
+def test_stored_schema_round_trips():
+    FEATURE_SCHEMA.check_compatible(FEATURE_SCHEMA.to_dict())
+
+
+def test_artifacts_without_schema_use_legacy_layout():
+    FEATURE_SCHEMA.check_compatible(None)
+    assert [feature['name'] for feature in LEGACY_SCHEMA['features']] == list(FEATURE_SCHEMA.names)
+
+
+@pytest.mark.parametrize('stored', [
+    {**FEATURE_SCHEMA.to_dict(), 'version': '2.0'},
+    {**FEATURE_SCHEMA.to_dict(), 'features': FEATURE_SCHEMA.to_dict()['features'][::-1]},
+    {**FEATURE_SCHEMA.to_dict(), 'features': FEATURE_SCHEMA.to_dict()['features'][:-1]},
+    {},
+])
+def test_incompatible_stored_schema_raises(stored):
+    with pytest.raises(FeatureSchemaMismatchError):
+        FEATURE_SCHEMA.check_compatible(stored)
+
+
+def test_feature_importance_is_keyed_by_schema_names(trained_detector):
+    for model_name in ('random_forest', 'xgboost'):
+        assert tuple(trained_detector.feature_importance[model_name]) == FEATURE_SCHEMA.names
+
+
+def test_loading_artifacts_for_another_schema_is_refused(legacy_model_dir, untrained_detector, tmp_path):
+    path = tmp_path / 'models'
+    shutil.copytree(legacy_model_dir, path)
+    with open(path / 'model_metadata.pkl', 'rb') as f:
+        metadata = pickle.load(f)
+    metadata['feature_schema'] = {**FEATURE_SCHEMA.to_dict(), 'version': '2.0'}
+    with open(path / 'model_metadata.pkl', 'wb') as f:
+        pickle.dump(metadata, f)
+
+    with pytest.raises(FeatureSchemaMismatchError, match="version 2.0"):
+        untrained_detector.load_models()
+    assert not untrained_detector.is_trained
@@ -0,0 +1,29 @@
+"""Hot path benchmark report"""
+
+import json
+
+from benchmarks import hot_path
+
+
+def test_report_is_strict_json_and_compares_cleanly(trained_detector):
+    report = hot_path.run_benchmark(trained_detector, batch_sizes=(1, 16), repeats=3, max_seconds=0.1)
+
+    restored = json.loads(json.dumps(report, allow_nan=False))
+    assert {'feature_extraction', 'verify_batch', 'verify_sensor_data'} <= set(restored['results'])
+    assert set(restored['results']['verify_batch']) == {'1', '16'}
+    assert hot_path.compare_results(restored, restored) == []
+
+    slower = json.loads(json.dumps(restored))
+    slower['results']['verify_batch']['16']['p50_ms'] = restored['results']['verify_batch']['16']['p50_ms'] * 2
+    regressions = hot_path.compare_results(slower, restored, threshold=0.5)
+    assert [(regression['stage'], regression['batch_size']) for regression in regressions] == [('verify_batch', 16)]
+
+
+def test_sub_resolution_timings_report_no_throughput(monkeypatch):
+    monkeypatch.setattr(hot_path.time, 'perf_counter', lambda: 1.0)
+
+    timing = hot_path.time_stage(lambda: None, rows=100, repeats=5, max_seconds=1.0)
+
+    assert timing['p50_ms'] == 0
+    assert timing['throughput_rows_per_s'] is None
+    json.dumps(timing, allow_nan=False)
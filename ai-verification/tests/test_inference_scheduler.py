@@ -0,0 +1,31 @@
+"""Inference scheduler queueing"""
+
+import time
+
+import pytest
+
+from models.inference_scheduler import InferenceScheduler, SchedulerQueueFullError
+
+
+def test_verify_many_cancels_queued_items_when_queue_fills(trained_detector, readings):
+    scheduler = InferenceScheduler(lambda: trained_detector, max_wait_ms=1.0, max_queue_size=3)
+
+    with pytest.raises(SchedulerQueueFullError):
+        scheduler.verify_many(readings)
+
+    queued = list(scheduler._queue.queue)
+    assert len(queued) == 3
+    assert all(future.cancelled() for _, future, _ in queued)
+
+    # The worker drops the abandoned items and the queue accepts a full list again
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 10
+        while scheduler.queue_depth() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        results = scheduler.verify_many(readings[:3], timeout=30)
+    finally:
+        scheduler.stop()
+
+    assert len(results) == 3
+    assert scheduler.stats()['items'] == 3
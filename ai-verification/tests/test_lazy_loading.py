@@ -0,0 +1,68 @@
+"""Lazy framework imports and serving while models load"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from models.model_names import TREE_MODELS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVE_SCRIPT = """
+import json, sys
+from models.fraud_detection import CarbonFraudDetector
+detector = CarbonFraudDetector(model_path=sys.argv[1], cache_size=0)
+detector.load_models(prefer_bundle=sys.argv[2] == 'bundle')
+result = detector.verify_sensor_data(json.loads(sys.argv[3]))
+print(json.dumps({
+    'score': result.score,
+    'frameworks': sorted(name for name in ('tensorflow', 'xgboost', 'sklearn', 'joblib') if name in sys.modules),
+}))
+"""
+
+
+@pytest.fixture(scope='module')
+def saved_model_dir(trained_detector, tmp_path_factory):
+    path = tmp_path_factory.mktemp('saved_models')
+    trained_detector.save_models(str(path))
+    return str(path)
+
+
+@pytest.mark.parametrize('layout', ['bundle', 'artifacts'])
+def test_serving_saved_models_imports_no_framework(saved_model_dir, trained_detector, readings, layout):
+    output = subprocess.run([sys.executable, '-c', SERVE_SCRIPT, saved_model_dir, layout, json.dumps(readings[1])],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True, timeout=300).stdout
+
+    served = json.loads(output.strip().splitlines()[-1])
+    assert served['frameworks'] == []
+    assert served['score'] == pytest.approx(trained_detector.verify_sensor_data(readings[1]).score, abs=1e-6)
+
+
+def test_network_loads_in_background(saved_model_dir, untrained_detector, readings):
+    untrained_detector.load_models(saved_model_dir, background_models=('neural_network',), prefer_bundle=False)
+
+    assert untrained_detector.models_ready()
+    assert untrained_detector.verify_batch(readings)  # Served with or without the network
+    untrained_detector.wait_for_models()
+
+    readiness = untrained_detector.model_readiness()
+    assert readiness['neural_network'] == {'status': 'ready', 'runtime': 'NumpyDenseNetwork'}
+    assert all(readiness[name]['status'] == 'ready' for name in TREE_MODELS)
+
+
+def test_verify_returns_503_while_models_load(api, readings):
+    client = api.app.test_client()
+    api.verification_api.models_ready.clear()
+    try:
+        response = client.post('/verify', json=readings[0])
+        health = client.get('/health').get_json()
+    finally:
+        api.verification_api.models_ready.set()
+
+    assert response.status_code == 503
+    assert set(response.get_json()['models']) == set(health['models'])
+    assert (health['status'], health['ready']) == ('starting', False)
+    assert client.get('/health').get_json()['ready']
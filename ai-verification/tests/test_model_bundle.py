@@ -0,0 +1,45 @@
+"""Model bundle format and the converter from the legacy directory layout"""
+
+import os
+
+import numpy as np
+
+from models.fraud_detection import CarbonFraudDetector
+from models.model_bundle import BUNDLE_FILENAME, convert_model_directory
+
+
+def test_converts_legacy_directory_without_feature_schema(legacy_model_dir, trained_detector, readings, tmp_path):
+    bundle_path = convert_model_directory(legacy_model_dir, str(tmp_path / BUNDLE_FILENAME))
+    assert os.path.exists(bundle_path)
+
+    detector = CarbonFraudDetector(model_path=str(tmp_path), cache_size=0)
+    detector.load_bundle(bundle_path)
+    assert detector.is_trained
+
+    expected = [result.score for result in trained_detector.verify_batch(readings)]
+    actual = [result.score for result in detector.verify_batch(readings)]
+    np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+
+def test_bundle_round_trip_is_lossless(trained_detector, readings, tmp_path):
+    bundle_path = str(tmp_path / BUNDLE_FILENAME)
+    trained_detector.save_bundle(bundle_path)
+
+    detector = CarbonFraudDetector(model_path=str(tmp_path), cache_size=0)
+    detector.load_bundle(bundle_path)
+
+    assert detector.serving_models.keys() == trained_detector.serving_models.keys()
+    for name, runtime in trained_detector.serving_models.items():
+        arrays, params = runtime.to_state()
+        loaded_arrays, loaded_params = detector.serving_models[name].to_state()
+        assert loaded_params == params, name
+        assert loaded_arrays.keys() == arrays.keys(), name
+        for key, array in arrays.items():
+            assert loaded_arrays[key].dtype == array.dtype, f"{name}.{key}"
+            np.testing.assert_array_equal(loaded_arrays[key], array, err_msg=f"{name}.{key}")
+
+    assert detector.thresholds == trained_detector.thresholds
+    assert detector.model_version == trained_detector.model_version
+    expected = [(result.score, result.prediction) for result in trained_detector.verify_batch(readings)]
+    actual = [(result.score, result.prediction) for result in detector.verify_batch(readings)]
+    assert actual == expected
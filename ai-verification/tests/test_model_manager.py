@@ -0,0 +1,101 @@
+"""Importing a model directory in the flat pre-registry layout and background retraining"""
+
+import shutil
+import threading
+import time
+
+import pytest
+
+from models import model_manager
+from models.fraud_detection import CarbonFraudDetector
+from models.model_manager import ModelImportError, ModelManager, RetrainInProgressError
+from models.model_registry import write_version_metadata
+
+
+def make_manager(path) -> ModelManager:
+    return ModelManager(lambda: CarbonFraudDetector(model_path=str(path), cache_size=0))
+
+
+def wait_for_retrain(manager: ModelManager, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while manager.retrain_status['state'] == 'running' and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_imports_legacy_flat_directory(legacy_model_dir, trained_detector, readings, tmp_path):
+    root = tmp_path / 'models'
+    shutil.copytree(legacy_model_dir, root)
+
+    manager = make_manager(root)
+    assert manager.load_current()
+    assert manager.registry.current_version() == manager.active.model_version
+
+    expected = [result.score for result in trained_detector.verify_batch(readings)]
+    actual = [result.score for result in manager.active.verify_batch(readings)]
+    assert actual == pytest.approx(expected, abs=1e-6)
+
+
+def test_unloadable_flat_directory_raises(legacy_model_dir, tmp_path):
+    root = tmp_path / 'models'
+    shutil.copytree(legacy_model_dir, root)
+    (root / 'feature_importance.pkl').write_bytes(b'not a pickle')
+
+    with pytest.raises(ModelImportError):
+        make_manager(root).load_current()
+
+
+def test_empty_directory_has_nothing_to_load(tmp_path):
+    assert not make_manager(tmp_path).load_current()
+
+
+def test_background_retrain_swaps_in_new_version(trained_detector, readings, tmp_path, monkeypatch):
+    release = threading.Event()
+    received = {}
+
+    def train_in_process(output_path, train_options):
+        received.update(train_options)
+        release.wait(10)
+        trained_detector.save_models(output_path)
+        write_version_metadata(output_path, trained_detector, {'training_options': train_options})
+
+    monkeypatch.setattr(model_manager, 'run_training_process', train_in_process)
+    manager = make_manager(tmp_path / 'models')
+    manager.swap(trained_detector)
+
+    status = manager.start_retrain(parallel=False)
+    with pytest.raises(RetrainInProgressError):
+        manager.start_retrain()
+    assert status['state'] == 'running'
+    assert manager.active is trained_detector
+    assert manager.active.verify_batch(readings)  # Serving continues during the retrain
+
+    release.set()
+    wait_for_retrain(manager)
+
+    assert received == {'parallel': False}
+    assert manager.retrain_status['state'] == 'completed'
+    assert manager.active is not trained_detector
+    assert manager.standby is trained_detector
+    assert manager.active.model_version == manager.retrain_status['model_version']
+    assert manager.registry.current_version() == manager.active.model_version
+    assert [r.model_version for r in manager.active.verify_batch(readings)] == [manager.active.model_version] * 5
+
+
+def test_failed_retrain_keeps_serving_and_allows_another(trained_detector, tmp_path, monkeypatch):
+    def fail(output_path, train_options):
+        raise RuntimeError("Training process exited with status 1")
+
+    monkeypatch.setattr(model_manager, 'run_training_process', fail)
+    manager = make_manager(tmp_path / 'models')
+    manager.swap(trained_detector)
+
+    manager.start_retrain()
+    wait_for_retrain(manager)
+
+    assert manager.retrain_status['state'] == 'failed'
+    assert 'status 1' in manager.retrain_status['error']
+    assert manager.active is trained_detector
+
+    # The lock is released, so the next retrain can start
+    assert manager.start_retrain()['state'] == 'running'
+    wait_for_retrain(manager)
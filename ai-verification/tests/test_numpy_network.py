@@ -0,0 +1,53 @@
+"""NumPy forward pass of the fraud detection network"""
+
+import numpy as np
+import pytest
+
+from models.numpy_network import NumpyDenseNetwork, fold_standard_scaler
+
+
+def test_matches_keras_on_unscaled_features(trained_detector, training_data):
+    X = training_data[0][:300]
+    scaler = trained_detector._require_scaler()
+    keras_outputs = trained_detector.models['neural_network'].predict(scaler.transform(X), verbose=0)[:, 0]
+
+    network = trained_detector.serving_models['neural_network']
+
+    assert network.input_dim == X.shape[1]
+    np.testing.assert_allclose(network.predict(X), keras_outputs, rtol=0, atol=1e-5)
+
+
+def test_folded_scaler_matches_scaling_first(trained_detector, training_data):
+    X = training_data[0][:50]
+    scaler = trained_detector._require_scaler()
+    rng = np.random.default_rng(0)
+    kernel, bias = rng.normal(size=(X.shape[1], 4)), rng.normal(size=4)
+
+    folded_kernel, folded_bias = fold_standard_scaler(kernel, bias, scaler)
+
+    np.testing.assert_allclose(X @ folded_kernel + folded_bias, scaler.transform(X) @ kernel + bias)
+
+
+def test_save_load_round_trip(trained_detector, training_data, tmp_path):
+    X = training_data[0][:50]
+    network = trained_detector.serving_models['neural_network']
+
+    network.save(str(tmp_path / 'network.npz'))
+    loaded = NumpyDenseNetwork.load(str(tmp_path / 'network.npz'))
+
+    assert loaded.activations == network.activations
+    np.testing.assert_array_equal(loaded.predict(X), network.predict(X))
+
+
+def test_single_row_and_sigmoid_range():
+    network = NumpyDenseNetwork([np.array([[1000.0], [-1000.0]])], [np.zeros(1)], ['sigmoid'])
+
+    outputs = network.predict(np.array([[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]]))
+
+    np.testing.assert_allclose(outputs, [1.0, 0.0, 0.5])
+    assert network.predict(np.array([1.0, 0.0])).shape == (1,)
+
+
+def test_unsupported_activation_is_rejected():
+    with pytest.raises(ValueError, match="softmax"):
+        NumpyDenseNetwork([np.ones((2, 1))], [np.zeros(1)], ['softmax'])
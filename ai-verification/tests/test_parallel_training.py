@@ -0,0 +1,19 @@
+"""Parallel ensemble training"""
+
+import numpy as np
+
+from models.model_names import MODEL_BACKENDS
+
+
+def test_parallel_training_matches_sequential(trained_detector, untrained_detector, training_data, readings):
+    detector = untrained_detector
+    detector.train_models(*training_data, parallel=True)
+
+    X = training_data[0]
+    for name in MODEL_BACKENDS:
+        np.testing.assert_array_equal(detector._predict_original(name, X),
+                                      trained_detector._predict_original(name, X), err_msg=name)
+
+    expected = [(result.score, result.prediction) for result in trained_detector.verify_batch(readings)]
+    actual = [(result.score, result.prediction) for result in detector.verify_batch(readings)]
+    assert actual == expected
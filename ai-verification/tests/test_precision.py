@@ -0,0 +1,40 @@
+"""Reduced precision serving"""
+
+import logging
+
+import numpy as np
+
+from models.model_registry import VERSION_METADATA_FILENAME, write_version_metadata
+from models.result_cache import ResultCache
+
+
+def test_validate_precision_leaves_detector_untouched(trained_detector, training_data, readings, caplog):
+    trained_detector.result_cache = ResultCache(max_size=100)
+    try:
+        trained_detector.verify_batch(readings)
+        with caplog.at_level(logging.INFO, logger='models.fraud_detection'):
+            report = trained_detector.validate_precision(training_data[0][:200])
+        trained_detector.verify_batch(readings)
+        stats = trained_detector.result_cache.stats()
+    finally:
+        trained_detector.result_cache = ResultCache(max_size=0)
+
+    assert trained_detector.inference_dtype == np.float64
+    assert trained_detector._reduced_runtimes == {}
+    assert stats['hits'] == len(readings)
+    assert not any('Serving in' in record.message for record in caplog.records)
+
+    assert report['dtype'] == 'float32' and report['num_samples'] == 200
+    assert report['prediction_disagreements'] == 0
+    assert max(report['max_score_deviation'].values()) < 1e-3
+
+
+def test_version_metadata_does_not_validate_precision(trained_detector, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("validate_precision called while writing version metadata")
+
+    monkeypatch.setattr(trained_detector, 'validate_precision', fail)
+    record = write_version_metadata(str(tmp_path), trained_detector)
+
+    assert 'precision_validation' not in record
+    assert (tmp_path / VERSION_METADATA_FILENAME).exists()
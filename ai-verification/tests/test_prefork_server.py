@@ -0,0 +1,98 @@
+"""Fork-safe model preloading and per-worker service setup"""
+
+import json
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRELOAD_SCRIPT = """
+import json, sys, threading
+import prefork_server
+prefork_server.api.verification_api.preload_models()
+print(json.dumps({
+    'ready': prefork_server.api.verification_api.models_ready.is_set(),
+    'version': prefork_server.api.model_manager.active.model_version,
+    'threads': [thread.name for thread in threading.enumerate() if thread is not threading.main_thread()],
+    'tensorflow': 'tensorflow' in sys.modules,
+    'scheduler': prefork_server.api.inference_scheduler is not None,
+}))
+"""
+
+
+@pytest.fixture(scope='module')
+def prefork(api):
+    environ = dict(os.environ)
+    try:
+        import prefork_server
+    finally:
+        # Importing pins the BLAS thread variables for forked workers only
+        os.environ.clear()
+        os.environ.update(environ)
+    return prefork_server
+
+
+@pytest.fixture
+def service(api, monkeypatch):
+    """API service object with its worker threads replaced by no-ops"""
+    service = api.verification_api
+    for name, value in (('mqtt_enabled', True), ('mqtt_client_id', 'ai_verification_service'),
+                        ('mqtt_shared_group', None)):
+        monkeypatch.setattr(service, name, value)
+    monkeypatch.setattr(service, 'start_services', lambda: None)
+    monkeypatch.setattr(service, 'follow_registry', lambda interval: None)
+    return service
+
+
+def test_parent_preloads_models_without_threads_or_tensorflow(trained_detector, tmp_path):
+    # The API serves from ./models/ relative to its working directory
+    os.makedirs(tmp_path / 'models')
+    trained_detector.save_models(str(tmp_path / 'models'))
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([PROJECT_ROOT, os.path.join(PROJECT_ROOT, 'api')])
+    output = subprocess.run([sys.executable, '-c', PRELOAD_SCRIPT], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, check=True, timeout=300).stdout
+
+    parent = json.loads(output.strip().splitlines()[-1])
+    assert parent['ready'] and parent['version']
+    assert parent['threads'] == []
+    assert not parent['tensorflow']
+    assert not parent['scheduler']
+
+
+def test_new_workers_take_the_lowest_free_index(prefork):
+    server = SimpleNamespace(WORKERS={101: SimpleNamespace(worker_index=0), 103: SimpleNamespace(worker_index=2),
+                                      104: SimpleNamespace()})
+    worker = SimpleNamespace()
+
+    prefork.pre_fork(server, worker)
+
+    assert worker.worker_index == 1
+
+
+@pytest.mark.parametrize('index, owns_mqtt', [(0, True), (1, False)])
+def test_one_worker_owns_mqtt_by_default(prefork, service, monkeypatch, index, owns_mqtt):
+    monkeypatch.delenv('MQTT_WORKERS', raising=False)
+
+    prefork.post_fork(None, SimpleNamespace(worker_index=index, pid=1000 + index))
+
+    assert service.mqtt_enabled is owns_mqtt
+    assert service.mqtt_client_id == 'ai_verification_service'
+
+
+def test_every_worker_joins_a_shared_subscription(prefork, service, monkeypatch):
+    monkeypatch.setenv('MQTT_WORKERS', 'all')
+    subscriptions = []
+
+    prefork.post_fork(None, SimpleNamespace(worker_index=3, pid=1003))
+    service.on_mqtt_connect(SimpleNamespace(subscribe=subscriptions.append), None, None, 0)
+
+    assert service.mqtt_enabled
+    assert service.mqtt_client_id == 'ai_verification_service-3'
+    assert subscriptions == [f"$share/{prefork.MQTT_SHARED_GROUP}/carbon-credits/emissions/+",
+                             f"$share/{prefork.MQTT_SHARED_GROUP}/carbon-credits/ai-verification/request"]
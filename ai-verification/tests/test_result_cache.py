@@ -0,0 +1,55 @@
+"""Result cache keying"""
+
+from models.result_cache import ResultCache
+
+
+def test_reused_data_hash_does_not_return_cached_verdict(trained_detector, readings):
+    legitimate = readings[0]
+    tampered = {**legitimate, 'measurements': {'co2_ppm': 5200, 'temperature': 75, 'humidity': 3, 'pressure': 640}}
+
+    trained_detector.result_cache = ResultCache(max_size=100)
+    try:
+        cached = trained_detector.verify_batch([legitimate])[0]
+        rescored = trained_detector.verify_batch([tampered])[0]
+        trained_detector.result_cache = ResultCache(max_size=0)
+        fresh = trained_detector.verify_batch([tampered])[0]
+    finally:
+        trained_detector.result_cache = ResultCache(max_size=0)
+
+    assert rescored.score == fresh.score
+    assert rescored.score != cached.score
+
+
+def test_identical_reading_hits_cache(trained_detector, readings):
+    trained_detector.result_cache = ResultCache(max_size=100)
+    try:
+        first = trained_detector.verify_batch(readings)
+        second = trained_detector.verify_batch(readings)
+        stats = trained_detector.result_cache.stats()
+    finally:
+        trained_detector.result_cache = ResultCache(max_size=0)
+
+    assert [r.score for r in first] == [r.score for r in second]
+    assert stats['hits'] == len(readings)
+
+
+def test_cache_hits_are_private_and_freshly_timestamped(trained_detector, readings):
+    trained_detector.result_cache = ResultCache(max_size=100)
+    try:
+        first = trained_detector.verify_batch([readings[1]])[0]
+        first.anomaly_flags.append('mutated by caller')
+        first.model_outputs['random_forest'] = -1.0
+        second = trained_detector.verify_batch([readings[1]])[0]
+        second.risk_factors.clear()
+        third = trained_detector.verify_batch([readings[1]])[0]
+        stats = trained_detector.result_cache.stats()
+    finally:
+        trained_detector.result_cache = ResultCache(max_size=0)
+
+    assert stats['hits'] == 2
+    assert second is not third
+    assert 'mutated by caller' not in third.anomaly_flags
+    assert third.model_outputs['random_forest'] != -1.0
+    assert third.risk_factors
+    assert first.timestamp < second.timestamp < third.timestamp
+    assert third.score == first.score
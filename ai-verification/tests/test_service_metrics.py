@@ -0,0 +1,92 @@
+"""Prometheus metrics rendering and the /metrics endpoint"""
+
+import copy
+import re
+
+import pytest
+
+from models.result_cache import ResultCache
+from models.service_metrics import CONTENT_TYPE, Metric, MetricsRegistry
+
+SAMPLE_LINE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? \S+$')
+
+
+def samples(text: str) -> dict:
+    """Sample lines of an exposition by series name and labels"""
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            series, value = line.rsplit(' ', 1)
+            values[series] = float(value)
+    return values
+
+
+def test_renders_text_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests by path', ('path',))
+    requests.inc('/verify')
+    requests.inc('/verify', amount=2)
+    requests.inc('/a "quoted"\\path')
+    registry.gauge('queue_depth', 'Queued readings').set(7)
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = registry.render()
+    lines = text.splitlines()
+
+    assert text.endswith('\n')
+    assert lines[:2] == ['# HELP requests_total Requests by path', '# TYPE requests_total counter']
+    assert '# TYPE queue_depth gauge' in lines and '# TYPE latency_seconds histogram' in lines
+    assert all(SAMPLE_LINE.match(line) for line in lines if not line.startswith('#')), lines
+
+    values = samples(text)
+    assert values['requests_total{path="/verify"}'] == 3
+    assert values[r'requests_total{path="/a \"quoted\"\\path"}'] == 1
+    assert values['queue_depth'] == 7
+    assert [values[f'latency_seconds_bucket{{le="{bound}"}}'] for bound in ('0.1', '1', '+Inf')] == [1, 2, 3]
+    assert values['latency_seconds_count'] == 3
+    assert values['latency_seconds_sum'] == pytest.approx(5.55)
+
+
+def test_metric_base_requires_render():
+    with pytest.raises(TypeError):
+        Metric('incomplete', 'Metric without a render method')
+
+
+def test_metrics_endpoint(api, readings):
+    client = api.app.test_client()
+    client.post('/verify', json=readings[0])
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == CONTENT_TYPE
+
+    text = response.get_data(as_text=True)
+    assert all(SAMPLE_LINE.match(line) for line in text.splitlines() if line and not line.startswith('#'))
+    values = samples(text)
+    assert values['models_ready'] == 1
+    assert any(series.startswith('http_requests_total{') and 'verify' in series for series in values)
+    assert '# TYPE verification_stage_duration_seconds histogram' in text.splitlines()
+
+
+def test_result_cache_counters_survive_model_swap(api, trained_detector, readings):
+    client = api.app.test_client()
+    trained_detector.result_cache = ResultCache(max_size=100, totals=api.result_cache_totals)
+    replacement = copy.copy(trained_detector)
+    replacement.result_cache = ResultCache(max_size=100, totals=api.result_cache_totals)
+    try:
+        client.post('/verify', json=readings[0])
+        client.post('/verify', json=readings[0])
+        before = samples(client.get('/metrics').get_data(as_text=True))
+
+        api.model_manager.swap(replacement)
+        after = samples(client.get('/metrics').get_data(as_text=True))
+    finally:
+        api.model_manager.swap(trained_detector)
+        trained_detector.result_cache = ResultCache(max_size=0)
+
+    assert before['result_cache_hits_total'] >= 1
+    for counter in ('hits', 'misses', 'evictions'):
+        assert after[f'result_cache_{counter}_total'] == before[f'result_cache_{counter}_total']
+    assert after['result_cache_size'] == 0
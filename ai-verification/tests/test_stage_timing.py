@@ -0,0 +1,84 @@
+"""Per-stage latency timers and rolling histograms"""
+
+import time
+
+import pytest
+
+from models.stage_timing import RollingHistogram, StageClock, StageLatencyRecorder
+
+MODEL_STAGES = {'model.random_forest', 'model.xgboost', 'model.neural_network', 'model.isolation_forest'}
+
+
+def test_laps_are_contiguous_and_accumulate():
+    clock = StageClock()
+    time.sleep(0.002)
+    clock.lap('parse')
+    clock.lap('score')
+    time.sleep(0.002)
+    clock.lap('parse')
+
+    assert set(clock.timings) == {'parse', 'score'}
+    assert clock.timings['parse'] >= 4
+    assert sum(clock.timings.values()) <= clock.elapsed_ms()
+
+
+def test_histogram_buckets_are_cumulative_and_window_is_bounded():
+    histogram = RollingHistogram(window_size=3, buckets_ms=(1.0, 10.0))
+    for value in (0.5, 1.0, 5.0, 20.0, 30.0):
+        histogram.observe(value)
+
+    buckets, count, total = histogram.cumulative()
+    snapshot = histogram.snapshot()
+
+    # Bounds are inclusive upper limits, as in Prometheus
+    assert buckets == [(1.0, 2), (10.0, 3), (float('inf'), 5)]
+    assert (count, total) == (5, 56.5)
+    assert (snapshot['count'], snapshot['window']) == (5, 3)
+    assert snapshot['p50_ms'] == 20.0 and snapshot['max_ms'] == 30.0
+    assert snapshot['histogram'] == {'le_1ms': 0, 'le_10ms': 1, 'le_inf': 2}
+
+
+def test_empty_histogram_snapshot():
+    assert RollingHistogram().snapshot() == {'count': 0, 'mean_ms': 0.0, 'window': 0}
+
+
+def test_verify_batch_reports_every_stage(trained_detector, readings):
+    recorder = StageLatencyRecorder()
+    shared, trained_detector.stage_latency = trained_detector.stage_latency, recorder
+    timings = {}
+    try:
+        trained_detector.verify_batch(readings, timings=timings)
+    finally:
+        trained_detector.stage_latency = shared
+
+    assert {'feature_extraction', 'total', 'identify_anomalies', 'result_assembly'} <= set(timings)
+    assert MODEL_STAGES <= set(timings)
+    assert sum(value for stage, value in timings.items() if stage != 'total') <= timings['total']
+    assert recorder.stages() == sorted(timings)
+    assert all(summary['count'] == 1 for summary in recorder.snapshot().values())
+
+
+def test_detailed_verify_response_includes_stage_timings(api, readings):
+    client = api.app.test_client()
+
+    detailed = client.post('/verify?detailed=true', json=readings[0]).get_json()
+    plain = client.post('/verify', json=readings[0]).get_json()
+
+    assert MODEL_STAGES <= set(detailed['timings_ms'])
+    assert detailed['timings_ms']['total'] >= detailed['timings_ms']['feature_extraction']
+    assert 'timings_ms' not in plain
+
+
+@pytest.mark.parametrize('stage', ['feature_extraction', 'total'])
+def test_stats_endpoint_reports_stage_percentiles(api, trained_detector, readings, stage):
+    client = api.app.test_client()
+    # Detectors built by the API record into its shared histograms
+    own, trained_detector.stage_latency = trained_detector.stage_latency, api.stage_latency
+    try:
+        client.post('/verify', json=readings[0])
+        latency = client.get('/stats').get_json()['stage_latency']
+    finally:
+        trained_detector.stage_latency = own
+
+    assert latency[stage]['count'] >= 1
+    assert latency[stage]['p50_ms'] <= latency[stage]['p99_ms']
@@ -0,0 +1,138 @@
+"""/verify-stream upload handling"""
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+from werkzeug.serving import make_server
+
+
+@pytest.fixture
+def server(api):
+    server = make_server('127.0.0.1', 0, api.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        thread.join(5)
+
+
+def read_line(connection: socket.socket, received: bytearray) -> bytes:
+    """Read from the connection until received holds a complete line and pop it"""
+    while b'\n' not in received:
+        data = connection.recv(65536)
+        if not data:
+            raise ConnectionError("Connection closed before a full line arrived")
+        received.extend(data)
+    line, _, rest = bytes(received).partition(b'\n')
+    received[:] = rest
+    return line
+
+
+def read_entry(connection: socket.socket, received: bytearray) -> dict:
+    """Next NDJSON line of the chunked response body"""
+    while True:
+        line = read_line(connection, received).strip()
+        if line.startswith(b'{'):
+            return json.loads(line)
+
+
+def test_pending_reading_is_scored_while_upload_pauses(api, server, readings):
+    first = json.dumps(readings[0]).encode() + b'\n'
+    second = json.dumps(readings[1]).encode() + b'\n'
+
+    with socket.create_connection(('127.0.0.1', server.server_port), timeout=10) as connection:
+        connection.sendall(b'POST /verify-stream HTTP/1.0\r\nHost: test\r\n'
+                           b'Content-Type: application/x-ndjson\r\n'
+                           b'Content-Length: ' + str(len(first) + len(second)).encode() + b'\r\n\r\n' + first)
+
+        received = bytearray()
+        while read_line(connection, received).strip():
+            pass  # Status line and headers
+
+        # Only the first line was sent: it is scored once STREAM_MAX_WAIT_MS has passed,
+        # well before the socket timeout
+        time.sleep(api.STREAM_MAX_WAIT_MS / 1000.0 * 2)
+        entry = read_entry(connection, received)
+        assert entry['index'] == 0 and entry['sensor_id'] == 'sensor-1'
+
+        connection.sendall(second)
+        entry = read_entry(connection, received)
+        assert entry['index'] == 1 and entry['sensor_id'] == 'sensor-2'
+        summary = read_entry(connection, received)
+        assert summary['batch_statistics']['total_items'] == 2
+
+
+def ndjson(readings) -> bytes:
+    return b''.join(json.dumps(reading).encode() + b'\n' for reading in readings)
+
+
+def entries(part: str) -> list:
+    return [json.loads(line) for line in part.splitlines()]
+
+
+def test_lines_split_across_chunks_are_scored_in_micro_batches(api, trained_detector, readings):
+    verifier = api.StreamVerifier(trained_detector, time.time(), batch_size=2, max_wait_ms=60_000)
+    upload = ndjson(readings[:3])
+    first_line_end = upload.index(b'\n') + 1
+
+    assert verifier.flush_due_in is None
+    assert verifier.feed(upload[:first_line_end - 5]) == ''
+    assert verifier.feed(upload[first_line_end - 5:first_line_end]) == ''
+    assert verifier.flush_due_in > 0
+
+    # The second line completes the micro-batch; the third stays pending
+    part = verifier.feed(upload[first_line_end:])
+    assert [(entry['index'], entry['sensor_id']) for entry in entries(part)] == [(0, 'sensor-1'), (1, 'sensor-2')]
+    assert verifier.pending == [readings[2]]
+
+    closing = entries(verifier.close())
+    assert [entry['index'] for entry in closing[:-1]] == [2]
+    assert closing[-1]['batch_statistics']['total_items'] == 3
+    assert closing[-1]['batch_statistics']['successful'] == 3
+
+
+def test_stream_scores_match_batch_verification(api, trained_detector, readings):
+    verifier = api.StreamVerifier(trained_detector, time.time(), batch_size=3)
+
+    streamed = entries(verifier.feed(ndjson(readings)) + verifier.close())[:-1]
+
+    expected = trained_detector.verify_batch(readings)
+    assert [entry['score'] for entry in streamed] == [result.score for result in expected]
+
+
+def test_bad_lines_get_error_entries_and_blank_lines_are_skipped(api, trained_detector, readings):
+    verifier = api.StreamVerifier(trained_detector, time.time(), batch_size=10)
+    upload = ndjson(readings[:1]) + b'\n  \n{not json\n[1, 2]\n' + json.dumps(readings[1]).encode()
+
+    results = entries(verifier.feed(upload) + verifier.close())
+
+    assert [entry['index'] for entry in results[:-1]] == [0, 1, 2, 3]
+    assert results[1]['error'].startswith('Invalid JSON')
+    assert results[2]['error'] == api.NOT_AN_OBJECT_ERROR
+    assert results[3]['sensor_id'] == 'sensor-2'  # Unterminated last line
+    assert (results[-1]['batch_statistics']['successful'], results[-1]['batch_statistics']['failed']) == (2, 2)
+
+
+def test_due_micro_batch_is_flushed_on_the_next_feed(api, trained_detector, readings):
+    verifier = api.StreamVerifier(trained_detector, time.time(), batch_size=100, max_wait_ms=0)
+
+    assert [entry['index'] for entry in entries(verifier.feed(ndjson(readings[:1])))] == [0]
+    assert verifier.flush_due_in is None
+
+
+def test_overlong_line_aborts_without_scoring_it(api, trained_detector, readings):
+    verifier = api.StreamVerifier(trained_detector, time.time(), batch_size=10)
+    verifier.feed(ndjson(readings[:1]))
+
+    with pytest.raises(api.StreamLineTooLongError, match='Line 1'):
+        verifier.feed(b'{"sensor_id": "' + b'x' * api.MAX_STREAM_LINE_BYTES)
+
+    results = entries(verifier.close('Line 1 too long; upload aborted'))
+    assert [entry['index'] for entry in results[:-1]] == [0]
+    assert results[-1]['error'] == 'Line 1 too long; upload aborted'
+    assert results[-1]['batch_statistics']['total_items'] == 1
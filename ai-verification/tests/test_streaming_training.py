@@ -0,0 +1,72 @@
+"""Out-of-core training from shards"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.feature_schema import FEATURE_SCHEMA
+from models.model_names import MODEL_BACKENDS
+from models.streaming_training import ReservoirSample, ShardedDataset, StreamingTrainer
+
+
+@pytest.fixture
+def shard_directory(tmp_path, training_data):
+    """The training data split into three CSV shards of precomputed features"""
+    X, y = training_data
+    frame = pd.DataFrame(X, columns=FEATURE_SCHEMA.names)
+    frame['label'] = y
+    frame = frame.sample(frac=1.0, random_state=0)
+    for i, start in enumerate(range(0, len(frame), 400)):
+        frame.iloc[start:start + 400].to_csv(tmp_path / f"shard-{i}.csv", index=False)
+    return str(tmp_path)
+
+
+def test_trains_every_model_from_shards(untrained_detector, shard_directory, training_data, readings):
+    untrained_detector.train_from_shards(shard_directory, chunk_rows=150, sample_size=500,
+                                         holdout_size=200, nn_epochs=1)
+
+    assert untrained_detector.is_trained
+    assert set(MODEL_BACKENDS) <= set(untrained_detector.serving_models)
+
+    X, y = training_data
+    predictions = untrained_detector.verify_batch(readings)
+    assert all(0 <= result.score <= 100 for result in predictions)
+    forest = untrained_detector._predict_model('random_forest', X)
+    assert ((forest >= 0.5) == (y == 1)).mean() > 0.9
+
+
+def test_holdout_split_is_stable_across_passes(shard_directory):
+    dataset = ShardedDataset(shard_directory, chunk_rows=100)
+
+    first = np.concatenate([y for _, y in dataset.iter_chunks('holdout')])
+    second = np.concatenate([y for _, y in dataset.iter_chunks('holdout')])
+    train = sum(y.size for _, y in dataset.iter_chunks('train'))
+
+    np.testing.assert_array_equal(first, second)
+    assert train + first.size == 1200
+    assert 0.1 < first.size / 1200 < 0.3
+
+
+def test_empty_holdout_is_rejected_before_fitting(untrained_detector, shard_directory):
+    dataset = ShardedDataset(shard_directory, holdout_fraction=0)
+    trainer = StreamingTrainer(dataset, untrained_detector.rf_params, untrained_detector.xgb_params,
+                               untrained_detector.nn_params, untrained_detector.iforest_params,
+                               sample_size=100, holdout_size=100, nn_epochs=1)
+
+    with pytest.raises(ValueError, match='no holdout rows'):
+        trainer.train()
+
+
+def test_reservoir_keeps_capacity_rows_from_the_stream():
+    rng = np.random.default_rng(0)
+    sample = ReservoirSample(50, 1, rng)
+    for start in range(0, 1000, 64):
+        values = np.arange(start, min(start + 64, 1000))
+        sample.add(values[:, None].astype(float), values)
+
+    X, y = sample.arrays()
+    assert sample.seen == 1000
+    assert X.shape == (50, 1) and len(set(y)) == 50
+    np.testing.assert_array_equal(X[:, 0], y)
+    # A uniform sample is not stuck on the first rows of the stream
+    assert y.max() > 500
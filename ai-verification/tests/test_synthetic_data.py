@@ -0,0 +1,73 @@
+"""Synthetic training data distributions"""
+
+import numpy as np
+import pytest
+
+from models.feature_schema import (
+    ACCURACY_SCORE, CO2_PPM, DAY_OF_MONTH, FEATURE_SCHEMA, HAS_DATA_HASH, HOUR_OF_DAY, HUMIDITY, MONTH_OF_YEAR,
+    PRESSURE, TEMPERATURE,
+)
+from models.synthetic_data import SyntheticDataGenerator
+
+NUM_SAMPLES = 20_000
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return SyntheticDataGenerator(seed=3).generate(NUM_SAMPLES)
+
+
+def test_label_split_puts_legitimate_rows_first(dataset):
+    X, y = dataset
+
+    assert X.shape == (NUM_SAMPLES, len(FEATURE_SCHEMA))
+    assert y.tolist() == [1] * 16_000 + [0] * 4_000
+    assert np.isfinite(X).all()
+
+
+def test_same_seed_gives_same_data(dataset):
+    X, y = SyntheticDataGenerator(seed=3).generate(NUM_SAMPLES)
+
+    np.testing.assert_array_equal(X, dataset[0])
+    np.testing.assert_array_equal(y, dataset[1])
+    assert not np.array_equal(SyntheticDataGenerator(seed=4).generate(NUM_SAMPLES)[0], X)
+
+
+def test_legitimate_readings_are_plausible(dataset):
+    X, y = dataset
+    legitimate = X[y == 1]
+
+    assert legitimate[:, CO2_PPM].min() >= 300 and legitimate[:, CO2_PPM].max() <= 600
+    assert legitimate[:, CO2_PPM].mean() == pytest.approx(420, abs=2)
+    assert legitimate[:, TEMPERATURE].mean() == pytest.approx(22, abs=0.5)
+    assert legitimate[:, PRESSURE].std() == pytest.approx(10, rel=0.05)
+    assert (legitimate[:, HAS_DATA_HASH] == 1).all()
+    assert set(np.unique(legitimate[:, HOUR_OF_DAY])) == set(range(24))
+    assert legitimate[:, DAY_OF_MONTH].min() == 1 and legitimate[:, MONTH_OF_YEAR].max() == 12
+
+
+def test_fraud_patterns_are_drawn_evenly(dataset):
+    X, y = dataset
+    fraud = X[y == 0]
+
+    extreme = (fraud[:, CO2_PPM] < 200) | (fraud[:, CO2_PPM] > 2000)
+    fake_sensor = fraud[:, HAS_DATA_HASH] == 0
+    poor_quality = (fraud[:, ACCURACY_SCORE] >= 0.3) & (fraud[:, ACCURACY_SCORE] <= 0.7)
+
+    for pattern in (extreme, fake_sensor, poor_quality):
+        assert pattern.mean() == pytest.approx(0.25, abs=0.03)
+
+    # Fake sensors report suspiciously perfect values
+    np.testing.assert_array_equal(fraud[fake_sensor][:, [CO2_PPM, TEMPERATURE, HUMIDITY, ACCURACY_SCORE]],
+                                  np.broadcast_to([400, 20, 50, 1], (fake_sensor.sum(), 4)))
+
+
+def test_blocks_cover_every_row_with_their_labels():
+    generator = SyntheticDataGenerator(seed=0, legitimate_fraction=0.5, block_size=300)
+
+    blocks = list(generator.iter_blocks(1000, dtype=np.float32))
+
+    assert [start for start, _, _ in blocks] == [0, 300, 600, 900]
+    assert [block.shape[0] for _, block, _ in blocks] == [300, 300, 300, 100]
+    assert all(block.dtype == np.float32 for _, block, _ in blocks)
+    assert np.concatenate([labels for _, _, labels in blocks]).sum() == 500
@@ -0,0 +1,31 @@
+"""Compiled tree ensembles"""
+
+import numpy as np
+
+from models.model_names import TREE_MODELS
+from models.tree_compiler import max_deviation
+
+
+def test_float32_copy_keeps_split_decisions(trained_detector, training_data):
+    X = training_data[0][:300]
+
+    for name in TREE_MODELS:
+        compiled = trained_detector.serving_models[name]
+        reduced = compiled.astype(np.float32)
+
+        if compiled.input_mean is not None:
+            assert reduced.input_mean.dtype == np.float64
+            assert reduced.input_scale.dtype == np.float64
+        assert reduced.threshold.dtype == np.float32
+
+        # Only the rounding of the float32 leaf values separates the scores
+        np.testing.assert_allclose(reduced.predict(X), compiled.predict(X), rtol=0, atol=1e-5, err_msg=name)
+
+
+def test_compiled_trees_match_original_models(trained_detector, training_data):
+    X = training_data[0]
+
+    for name in TREE_MODELS:
+        deviation = max_deviation(trained_detector.serving_models[name],
+                                  trained_detector._predict_original(name, X), X)
+        assert deviation <= trained_detector.compiled_tolerance, name